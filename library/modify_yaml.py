@@ -23,6 +23,13 @@ EXAMPLES = '''
     dest: /etc/origin/master/master-config.yaml
     yaml_key: 'kubernetesMasterConfig.masterCount'
     yaml_value: 2
+
+- modify_yaml:
+    dest: /etc/origin/master/master-config.yaml
+    yaml_keys:
+      kubernetesMasterConfig.masterCount: 2
+      kubernetesMasterConfig.apiServerArguments.max-requests-inflight: ["1000"]
+      servingInfo.maxRequestsInFlight: 1000
 '''
 
 
@@ -60,6 +67,56 @@ def set_key(yaml_data, yaml_key, yaml_value):
     return changes
 
 
+def set_keys(yaml_data, yaml_keys):
+    ''' Updates a parsed yaml structure setting many keys at once.
+
+        Keys are grouped by their shared prefixes, so every section of
+        yaml_data is looked up once however many keys live under it.
+        Values are compared as they are, without safe_eval.
+
+        :param yaml_data: yaml structure to modify.
+        :type yaml_data: dict
+        :param yaml_keys: Keys to modify mapped to the values to use.
+        :type yaml_keys: dict
+        :returns: Changes to the yaml_data structure
+        :rtype: list(tuple())
+        :raises ValueError: when one key is a prefix of another
+    '''
+    # Prefix tree of the keys: {key part: [full key or None, {key part: ...}]}
+    tree = {}
+    for yaml_key in sorted(yaml_keys):
+        children = tree
+        parts = yaml_key.split('.')
+        for key in parts[:-1]:
+            node = children.setdefault(key, [None, {}])
+            if node[0] is not None:
+                raise ValueError('yaml_keys %s and %s overlap' % (node[0], yaml_key))
+            children = node[1]
+        node = children.setdefault(parts[-1], [None, {}])
+        if node[1]:
+            raise ValueError('yaml_keys %s and %s.* overlap' % (yaml_key, yaml_key))
+        node[0] = yaml_key
+
+    changes = []
+    pending = [(yaml_data, tree)]
+    while pending:
+        ptr, children = pending.pop()
+        for key, (yaml_key, subtree) in children.items():
+            if yaml_key is not None:
+                yaml_value = yaml_keys[yaml_key]
+                if key not in ptr or ptr[key] != yaml_value:
+                    ptr[key] = yaml_value
+                    changes.append((yaml_key, yaml_value))
+
+            if subtree:
+                # Missing or null sections become empty dictionaries.
+                if ptr.get(key) is None:
+                    ptr[key] = {}
+                pending.append((ptr[key], subtree))
+
+    return changes
+
+
 def main():
     ''' Modify key (supplied in jinja2 dot notation) in yaml file, setting
         the key to the desired value.
@@ -74,16 +131,20 @@ def main():
     module = AnsibleModule(  # noqa: F405
         argument_spec=dict(
             dest=dict(required=True),
-            yaml_key=dict(required=True),
-            yaml_value=dict(required=True),
+            yaml_key=dict(required=False),
+            yaml_value=dict(required=False),
+            yaml_keys=dict(required=False, type='dict'),
             backup=dict(required=False, default=True, type='bool'),
         ),
+        required_one_of=[['yaml_key', 'yaml_keys']],
+        required_together=[['yaml_key', 'yaml_value']],
+        mutually_exclusive=[['yaml_key', 'yaml_keys']],
         supports_check_mode=True,
     )
 
     dest = module.params['dest']
     yaml_key = module.params['yaml_key']
-    yaml_value = module.safe_eval(module.params['yaml_value'])
+    yaml_keys = module.params['yaml_keys']
     backup = module.params['backup']
 
     # Represent null values as an empty string.
@@ -97,7 +158,12 @@ def main():
         with open(dest) as yaml_file:
             yaml_data = yaml.safe_load(yaml_file.read())
 
-        changes = set_key(yaml_data, yaml_key, yaml_value)
+        if yaml_keys is not None:
+            if not yaml_keys:
+                return module.fail_json(msg='yaml_keys must name at least one key')
+            changes = set_keys(yaml_data, yaml_keys)
+        else:
+            changes = set_key(yaml_data, yaml_key, module.safe_eval(module.params['yaml_value']))
 
         if len(changes) > 0:
             if backup:
@@ -33,14 +33,31 @@
 
 from __future__ import print_function
 import atexit
+import base64
+import collections
+import contextlib
 import copy
+import hashlib
 import json
 import os
+import random
 import re
 import shutil
+import socket
+import ssl
 import subprocess
 import tempfile
+import threading
+import time
+from multiprocessing.pool import ThreadPool
 # pylint: disable=import-error
+try:
+    import http.client as httplib
+    from urllib.parse import urlencode, urlparse
+except ImportError:
+    import httplib
+    from urllib import urlencode
+    from urlparse import urlparse
 try:
     import ruamel.yaml as yaml
 except ImportError:
@@ -136,26 +153,99 @@ class YeditException(Exception):
     pass
 
 
-# pylint: disable=too-many-public-methods
-class Yedit(object):
-    ''' Class to modify yaml files '''
+class YeditPath(object):
+    ''' A Yedit key that is validated and split into its parts once
+
+        Paths used over and over can be held as constants, e.g.
+        DeploymentConfig.env_path, and passed anywhere Yedit takes a key.
+        YeditPath.get() keeps the most recently used paths around.
+    '''
     re_valid_key = r"(((\[-?\d+\])|([0-9a-zA-Z%s/_-]+)).?)+$"
     re_key = r"(?:\[(-?\d+)\])|([0-9a-zA-Z%s/_-]+)"
     com_sep = set(['.', '#', '|', ':'])
 
+    # the number of parsed paths YeditPath.get() keeps
+    cache_size = 1024
+
+    # compiled (valid key, key part) regexes by separator
+    _regexes = {}
+    # parsed paths by (key, separator), least recently used first
+    _cache = collections.OrderedDict()
+
+    def __init__(self, key, sep='.'):
+        valid_re, key_re = YeditPath.regexes(sep)
+        self.key = key
+        self.sep = sep
+        self.valid = bool(key) and valid_re.match(key) is not None
+        # (list index, dict key) string pairs as re.findall returns them
+        self.tokens = tuple(key_re.findall(key)) if key else ()
+
+    def __str__(self):
+        return self.key
+
+    def __repr__(self):
+        return 'YeditPath(%r, sep=%r)' % (self.key, self.sep)
+
+    @staticmethod
+    def regexes(sep='.'):
+        ''' return the compiled valid key and key part regexes for a separator '''
+        if sep not in YeditPath._regexes:
+            common_separators = ''.join(YeditPath.com_sep - set([sep]))
+            YeditPath._regexes[sep] = (re.compile(YeditPath.re_valid_key % common_separators),
+                                       re.compile(YeditPath.re_key % common_separators))
+        return YeditPath._regexes[sep]
+
+    @staticmethod
+    def get(key, sep='.'):
+        ''' return the parsed path for key; YeditPath keys are returned as is '''
+        if isinstance(key, YeditPath):
+            return key
+
+        try:
+            path = YeditPath._cache.pop((key, sep))
+        except KeyError:
+            path = YeditPath(key, sep)
+            while len(YeditPath._cache) >= YeditPath.cache_size:
+                YeditPath._cache.popitem(last=False)
+
+        YeditPath._cache[(key, sep)] = path
+        return path
+
+
+# pylint: disable=too-many-public-methods
+class Yedit(object):
+    ''' Class to modify yaml files '''
+    re_valid_key = YeditPath.re_valid_key
+    re_key = YeditPath.re_key
+    com_sep = YeditPath.com_sep
+
     # pylint: disable=too-many-arguments
     def __init__(self,
                  filename=None,
                  content=None,
                  content_type='yaml',
                  separator='.',
-                 backup=False):
+                 backup=False,
+                 round_trip=None):
+        ''' Constructor for Yedit
+
+            round_trip: load and dump with ruamel's round trip loader and
+                        dumper so comments and formatting survive.  When
+                        False libyaml's C loader is used where available.
+                        Defaults to False for python objects and json and
+                        True for yaml text and files.
+        '''
+        if round_trip is None:
+            round_trip = content_type == 'yaml' and type(content) not in (dict, list)
+        self.round_trip = round_trip
         self.content = content
         self._separator = separator
         self.filename = filename
         self.__yaml_dict = content
         self.content_type = content_type
         self.backup = backup
+        self._transaction = None
+        self._disk = None
         self.load(content_type=self.content_type)
         if self.__yaml_dict is None:
             self.__yaml_dict = {}
@@ -183,33 +273,28 @@ class Yedit(object):
     @staticmethod
     def parse_key(key, sep='.'):
         '''parse the key allowing the appropriate separator'''
-        common_separators = list(Yedit.com_sep - set([sep]))
-        return re.findall(Yedit.re_key % ''.join(common_separators), key)
+        return list(YeditPath.get(key, sep).tokens)
 
     @staticmethod
     def valid_key(key, sep='.'):
         '''validate the incoming key'''
-        common_separators = list(Yedit.com_sep - set([sep]))
-        if not re.match(Yedit.re_valid_key % ''.join(common_separators), key):
-            return False
-
-        return True
+        return YeditPath.get(key, sep).valid
 
     @staticmethod
     def remove_entry(data, key, sep='.'):
         ''' remove data at location key '''
-        if key == '' and isinstance(data, dict):
+        path = YeditPath.get(key, sep)
+        if path.key == '' and isinstance(data, dict):
             data.clear()
             return True
-        elif key == '' and isinstance(data, list):
+        elif path.key == '' and isinstance(data, list):
             del data[:]
             return True
 
-        if not (key and Yedit.valid_key(key, sep)) and \
-           isinstance(data, (list, dict)):
+        if not path.valid and isinstance(data, (list, dict)):
             return None
 
-        key_indexes = Yedit.parse_key(key, sep)
+        key_indexes = path.tokens
         for arr_ind, dict_key in key_indexes[:-1]:
             if dict_key and isinstance(data, dict):
                 data = data.get(dict_key, None)
@@ -239,13 +324,13 @@ class Yedit(object):
             key = a#b
             return c
         '''
-        if key == '':
+        path = YeditPath.get(key, sep)
+        if path.key == '':
             pass
-        elif (not (key and Yedit.valid_key(key, sep)) and
-              isinstance(data, (list, dict))):
+        elif not path.valid and isinstance(data, (list, dict)):
             return None
 
-        key_indexes = Yedit.parse_key(key, sep)
+        key_indexes = path.tokens
         for arr_ind, dict_key in key_indexes[:-1]:
             if dict_key:
                 if isinstance(data, dict) and dict_key in data and data[dict_key]:  # noqa: E501
@@ -265,7 +350,7 @@ class Yedit(object):
             else:
                 raise YeditException("Unexpected item type found while going through key path: {}".format(key))
 
-        if key == '':
+        if path.key == '':
             data = item
 
         # process last index for add
@@ -292,13 +377,13 @@ class Yedit(object):
             key = a.b
             return c
         '''
-        if key == '':
+        path = YeditPath.get(key, sep)
+        if path.key == '':
             pass
-        elif (not (key and Yedit.valid_key(key, sep)) and
-              isinstance(data, (list, dict))):
+        elif not path.valid and isinstance(data, (list, dict)):
             return None
 
-        key_indexes = Yedit.parse_key(key, sep)
+        key_indexes = path.tokens
         for arr_ind, dict_key in key_indexes:
             if dict_key and isinstance(data, dict):
                 data = data.get(dict_key, None)
@@ -310,6 +395,144 @@ class Yedit(object):
 
         return data
 
+    @staticmethod
+    def _shallow_copy(node):
+        ''' copy a single dict or list, keeping ruamel formatting attributes '''
+        new_node = type(node)()
+        if isinstance(node, dict):
+            new_node.update(node)
+        else:
+            new_node.extend(node)
+
+        try:
+            node.copy_attributes(new_node)
+        except AttributeError:
+            pass
+
+        return new_node
+
+    def begin(self):
+        ''' start a transaction
+
+            Edits made until commit() or rollback() copy only the dicts and
+            lists along the paths they touch, so the document is never
+            serialized to make a safe copy.  The structure from before
+            begin() is left untouched.
+        '''
+        if self._transaction is not None:
+            raise YeditException('A transaction is already in progress.')
+
+        self._transaction = {'original': self.yaml_dict, 'copies': {}}
+
+    def commit(self):
+        ''' end the transaction keeping its edits; returns (changed, yaml_dict) '''
+        if self._transaction is None:
+            raise YeditException('No transaction in progress.')
+
+        # untouched subtrees are shared with the original, so this is cheap
+        changed = self.yaml_dict != self._transaction['original']
+        self._transaction = None
+        return (changed, self.yaml_dict)
+
+    def rollback(self):
+        ''' end the transaction discarding its edits '''
+        if self._transaction is None:
+            raise YeditException('No transaction in progress.')
+
+        self.yaml_dict = self._transaction['original']
+        self._transaction = None
+
+    @contextlib.contextmanager
+    def transaction(self):
+        ''' run the edits of a with block as a transaction
+
+            The transaction is committed when the block finishes and rolled
+            back when it raises.
+        '''
+        self.begin()
+        try:
+            yield self
+        except Exception:
+            self.rollback()
+            raise
+        self.commit()
+
+    def _copy_path(self, path):
+        ''' copy the containers along path that this transaction has not copied yet '''
+        # keep the copies alive so their ids are not reused
+        copies = self._transaction['copies']
+        if id(self.yaml_dict) not in copies:
+            self.yaml_dict = Yedit._shallow_copy(self.yaml_dict)
+            copies[id(self.yaml_dict)] = self.yaml_dict
+
+        path = YeditPath.get(path, self.separator)
+        if not path.valid:
+            return
+
+        data = self.yaml_dict
+        for arr_ind, dict_key in path.tokens:
+            if dict_key and isinstance(data, dict):
+                index = dict_key
+                if not isinstance(data.get(dict_key), (dict, list)):
+                    return
+            elif arr_ind and isinstance(data, list) and int(arr_ind) <= len(data) - 1:
+                index = int(arr_ind)
+                if not isinstance(data[index], (dict, list)):
+                    return
+            else:
+                return
+
+            if id(data[index]) not in copies:
+                data[index] = Yedit._shallow_copy(data[index])
+                copies[id(data[index])] = data[index]
+            data = data[index]
+
+    def _edit_copy(self, path):
+        ''' return a copy of the document that path may be edited in
+
+            Inside a transaction only the containers along path are copied.
+            Otherwise the whole document is.
+        '''
+        if self._transaction is not None:
+            self._copy_path(path)
+            return self.yaml_dict
+
+        # nothing to preserve
+        if not self.round_trip:
+            return copy.deepcopy(self.yaml_dict)
+
+        # deepcopy didn't work
+        # Try to use ruamel.yaml and fallback to pyyaml
+        try:
+            tmp_copy = yaml.load(yaml.round_trip_dump(self.yaml_dict,
+                                                      default_flow_style=False),
+                                 yaml.RoundTripLoader)
+        except AttributeError:
+            tmp_copy = copy.deepcopy(self.yaml_dict)
+
+        # set the format attributes if available
+        try:
+            tmp_copy.fa.set_block_style()
+        except AttributeError:
+            pass
+
+        return tmp_copy
+
+    def _prepare_edit(self, path):
+        ''' make the containers along path safe to edit in place '''
+        if self._transaction is not None:
+            self._copy_path(path)
+
+    @staticmethod
+    def fast_loader():
+        ''' return libyaml's safe loader, or the pure python one without libyaml '''
+        return getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    @staticmethod
+    def fast_dumper():
+        ''' return libyaml's safe dumper, or the pure python one without libyaml '''
+        return getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
     @staticmethod
     def _write(filename, contents):
         ''' Actually write the file contents to disk. This helps with mocking. '''
@@ -321,13 +544,10 @@ class Yedit(object):
 
         os.rename(tmp_filename, filename)
 
-    def write(self):
-        ''' write to file '''
-        if not self.filename:
-            raise YeditException('Please specify a filename.')
-
-        if self.backup and self.file_exists():
-            shutil.copy(self.filename, self.filename + '.orig')
+    def dump(self):
+        ''' return the document serialized the way write() stores it '''
+        if not self.round_trip:
+            return yaml.dump(self.yaml_dict, Dumper=Yedit.fast_dumper(), default_flow_style=False)
 
         # Try to set format attributes if supported
         try:
@@ -337,9 +557,55 @@ class Yedit(object):
 
         # Try to use RoundTripDumper if supported.
         try:
-            Yedit._write(self.filename, yaml.dump(self.yaml_dict, Dumper=yaml.RoundTripDumper))
+            return yaml.dump(self.yaml_dict, Dumper=yaml.RoundTripDumper)
         except AttributeError:
-            Yedit._write(self.filename, yaml.safe_dump(self.yaml_dict, default_flow_style=False))
+            return yaml.safe_dump(self.yaml_dict, default_flow_style=False)
+
+    @staticmethod
+    def _digest(contents):
+        ''' return the sha256 hex digest of text or bytes '''
+        if not isinstance(contents, bytes):
+            contents = contents.encode('utf-8')
+        return hashlib.sha256(contents).hexdigest()
+
+    def _same_as_file(self, contents):
+        ''' return whether the file already holds exactly contents '''
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return False
+
+        if not isinstance(contents, bytes):
+            contents = contents.encode('utf-8')
+        if stat.st_size != len(contents):
+            return False
+
+        # the file has not been touched since we read it
+        if self._disk is not None and self._disk[:2] == (stat.st_mtime, stat.st_size):
+            digest = self._disk[2]
+        else:
+            with open(self.filename, 'rb') as yfd:
+                digest = Yedit._digest(yfd.read())
+
+        return digest == Yedit._digest(contents)
+
+    def write(self):
+        ''' write to file
+
+            Returns (False, yaml_dict) without touching the file, or its
+            backup, when the file already holds the serialized document.
+        '''
+        if not self.filename:
+            raise YeditException('Please specify a filename.')
+
+        contents = self.dump()
+        if self._same_as_file(contents):
+            return (False, self.yaml_dict)
+
+        if self.backup and self.file_exists():
+            shutil.copy(self.filename, self.filename + '.orig')
+
+        Yedit._write(self.filename, contents)
 
         return (True, self.yaml_dict)
 
@@ -353,6 +619,10 @@ class Yedit(object):
         with open(self.filename) as yfd:
             contents = yfd.read()
 
+        # remember what was read so write() can skip rewriting it
+        stat = os.stat(self.filename)
+        self._disk = (stat.st_mtime, stat.st_size, Yedit._digest(contents))
+
         return contents
 
     def file_exists(self):
@@ -378,7 +648,10 @@ class Yedit(object):
 
         # check if it is yaml
         try:
-            if content_type == 'yaml' and contents:
+            if content_type == 'yaml' and contents and not self.round_trip:
+                self.yaml_dict = yaml.load(contents, Loader=Yedit.fast_loader())
+
+            elif content_type == 'yaml' and contents:
                 # Try to set format attributes if supported
                 try:
                     self.yaml_dict.fa.set_block_style()
@@ -416,6 +689,7 @@ class Yedit(object):
 
     def pop(self, path, key_or_item):
         ''' remove a key, value pair from a dict or an item for a list'''
+        self._prepare_edit(path)
         try:
             entry = Yedit.get_entry(self.yaml_dict, path, self.separator)
         except KeyError:
@@ -448,6 +722,7 @@ class Yedit(object):
 
     def delete(self, path):
         ''' remove path from a dict'''
+        self._prepare_edit(path)
         try:
             entry = Yedit.get_entry(self.yaml_dict, path, self.separator)
         except KeyError:
@@ -491,6 +766,7 @@ class Yedit(object):
 
     def append(self, path, value):
         '''append value to a list'''
+        self._prepare_edit(path)
         try:
             entry = Yedit.get_entry(self.yaml_dict, path, self.separator)
         except KeyError:
@@ -511,6 +787,7 @@ class Yedit(object):
     # pylint: disable=too-many-arguments
     def update(self, path, value, index=None, curr_value=None):
         ''' put path, value into a dict '''
+        self._prepare_edit(path)
         try:
             entry = Yedit.get_entry(self.yaml_dict, path, self.separator)
         except KeyError:
@@ -566,21 +843,7 @@ class Yedit(object):
         if entry == value:
             return (False, self.yaml_dict)
 
-        # deepcopy didn't work
-        # Try to use ruamel.yaml and fallback to pyyaml
-        try:
-            tmp_copy = yaml.load(yaml.round_trip_dump(self.yaml_dict,
-                                                      default_flow_style=False),
-                                 yaml.RoundTripLoader)
-        except AttributeError:
-            tmp_copy = copy.deepcopy(self.yaml_dict)
-
-        # set the format attributes if available
-        try:
-            tmp_copy.fa.set_block_style()
-        except AttributeError:
-            pass
-
+        tmp_copy = self._edit_copy(path)
         result = Yedit.add_entry(tmp_copy, path, value, self.separator)
         if not result:
             return (False, self.yaml_dict)
@@ -592,21 +855,7 @@ class Yedit(object):
     def create(self, path, value):
         ''' create a yaml file '''
         if not self.file_exists():
-            # deepcopy didn't work
-            # Try to use ruamel.yaml and fallback to pyyaml
-            try:
-                tmp_copy = yaml.load(yaml.round_trip_dump(self.yaml_dict,
-                                                          default_flow_style=False),
-                                     yaml.RoundTripLoader)
-            except AttributeError:
-                tmp_copy = copy.deepcopy(self.yaml_dict)
-
-            # set the format attributes if available
-            try:
-                tmp_copy.fa.set_block_style()
-            except AttributeError:
-                pass
-
+            tmp_copy = self._edit_copy(path)
             result = Yedit.add_entry(tmp_copy, path, value, self.separator)
             if result:
                 self.yaml_dict = tmp_copy
@@ -656,13 +905,210 @@ class Yedit(object):
 
         return inc_value
 
+    def process_edit(self, edit):
+        ''' apply one edit described by the module parameters
+
+            edit holds key, state, value, value_type, update, append, index,
+            curr_value and curr_value_format, with the module defaults for
+            any that are missing.  Returns (changed, yaml_dict).
+        '''
+        key = edit.get('key', '')
+
+        if edit.get('state', 'present') == 'absent':
+            if edit.get('update'):
+                return self.pop(key, edit.get('value'))
+            return self.delete(key)
+
+        value = Yedit.parse_value(edit.get('value'), edit.get('value_type', ''))
+        if edit.get('update'):
+            # pylint: disable=line-too-long
+            curr_value = Yedit.get_curr_value(Yedit.parse_value(edit.get('curr_value')),  # noqa: E501
+                                              edit.get('curr_value_format', 'yaml'))  # noqa: E501
+
+            return self.update(key, value, edit.get('index'), curr_value)  # noqa: E501
+
+        elif edit.get('append'):
+            return self.append(key, value)
+
+        return self.put(key, value)
+
+    def process_edits(self, edits):
+        ''' apply many edits in a single transaction
+
+            Either every edit is applied or, when one raises, none is.
+            Returns (changed, [{'key': ..., 'changed': ...}] per edit).
+        '''
+        results = []
+        with self.transaction():
+            for edit in edits:
+                results.append({'key': edit.get('key', ''), 'changed': self.process_edit(edit)[0]})
+
+        return (any([result['changed'] for result in results]), results)
+
+    @staticmethod
+    def load_documents(stream, round_trip=False):
+        ''' yield the documents of a yaml stream one at a time '''
+        loader = Yedit.fast_loader()
+        if round_trip:
+            loader = getattr(yaml, 'RoundTripLoader', loader)
+
+        try:
+            for document in yaml.load_all(stream, Loader=loader):
+                yield document
+        except yaml.YAMLError as err:
+            raise YeditException('Problem with loading yaml file. %s' % err)
+
+    @staticmethod
+    def dump_document(document, stream, round_trip=False):
+        ''' write a single document to a yaml stream '''
+        if round_trip and hasattr(yaml, 'RoundTripDumper'):
+            yaml.dump(document, stream, Dumper=yaml.RoundTripDumper, explicit_start=True)
+        else:
+            yaml.dump(document, stream, Dumper=Yedit.fast_dumper(), explicit_start=True,
+                      default_flow_style=False)
+
+    # selector fields that are shorthands for object metadata
+    selector_paths = {'kind': YeditPath('kind'),
+                      'name': YeditPath('metadata.name'),
+                      'namespace': YeditPath('metadata.namespace')}
+
+    @staticmethod
+    def document_matches(document, selector, sep='.'):
+        ''' return whether a document has every value in selector
+
+            selector maps kind, name, namespace or any key to the value the
+            document must have there.  An empty selector matches every
+            object.
+        '''
+        if not isinstance(document, dict):
+            return False
+
+        for key, value in (selector or {}).items():
+            if Yedit.get_entry(document, Yedit.selector_paths.get(key, key), sep) != value:
+                return False
+
+        return True
+
+    # pylint: disable=too-many-arguments
+    @staticmethod
+    def edit_documents(filename, edits, selector=None, separator='.', round_trip=True, backup=False):
+        ''' apply edits to the documents of a multi-document file that match selector
+
+            Documents are read, edited and written to a temporary file one
+            at a time, so memory use does not grow with the file.  The file
+            is replaced, atomically, only when a document changed.  Empty
+            documents are written back as a bare '---' so the file keeps its
+            number of documents.
+            Returns (changed, [{'index', 'kind', 'name', 'changed', 'edits'}])
+            for the matching documents.
+        '''
+        tmp_filename = filename + '.yedit'
+        results = []
+        try:
+            with open(filename) as src, open(tmp_filename, 'w') as dest:
+                for idx, document in enumerate(Yedit.load_documents(src, round_trip)):
+                    if Yedit.document_matches(document, selector, separator):
+                        yed = Yedit(content=document, separator=separator, round_trip=round_trip)
+                        changed, edit_results = yed.process_edits(edits)
+                        document = yed.yaml_dict
+                        results.append({'index': idx,
+                                        'kind': Yedit.get_entry(document, Yedit.selector_paths['kind']),
+                                        'name': Yedit.get_entry(document, Yedit.selector_paths['name']),
+                                        'changed': changed,
+                                        'edits': edit_results})
+
+                    if document is None:
+                        dest.write('---\n')
+                    else:
+                        Yedit.dump_document(document, dest, round_trip)
+        except Exception:
+            # never let the cleanup hide the error that got us here
+            Yedit.remove_file(tmp_filename)
+            raise
+
+        changed = any([result['changed'] for result in results])
+        if not changed:
+            Yedit.remove_file(tmp_filename)
+            return (False, results)
+
+        if backup:
+            shutil.copy(filename, filename + '.orig')
+
+        os.rename(tmp_filename, filename)
+        return (True, results)
+
+    @staticmethod
+    def remove_file(filename):
+        ''' remove a file if it exists, ignoring failures '''
+        try:
+            if os.path.exists(filename):
+                os.unlink(filename)
+        except OSError:
+            pass
+
+    @staticmethod
+    def module_edits(module):
+        ''' return the edits a task asks for, or a failure result '''
+        if not module.params['edits']:
+            return [module.params]
+
+        edits = []
+        for edit in module.params['edits']:
+            if not isinstance(edit, dict) or 'key' not in edit:
+                return {'failed': True,
+                        'msg': 'Every entry in edits needs a key. edit=[%s]' % edit}
+            edits.append(dict({'state': module.params['state']}, **edit))
+
+        return edits
+
+    @staticmethod
+    def run_ansible_documents(module):
+        '''perform the crud operations on the documents matching the selector'''
+        params = module.params
+        if not params['src'] or not os.path.exists(params['src']):
+            return {'failed': True,
+                    'msg': 'A selector needs an existing src file. src=[%s]' % params['src']}
+
+        try:
+            if params['state'] == 'list':
+                results = []
+                with open(params['src']) as yfd:
+                    for document in Yedit.load_documents(yfd):
+                        if Yedit.document_matches(document, params['selector'], params['separator']):
+                            results.append(Yedit.get_entry(document, params['key'], params['separator']))
+
+                return {'changed': False, 'result': results, 'state': 'list'}
+
+            if params['state'] == 'present' and params['value'] is None and not params['edits']:
+                return {'changed': False, 'result': [], 'state': 'present'}
+
+            edits = Yedit.module_edits(module)
+            if isinstance(edits, dict):
+                return edits
+
+            changed, results = Yedit.edit_documents(params['src'],
+                                                    edits,
+                                                    selector=params['selector'],
+                                                    separator=params['separator'],
+                                                    backup=params['backup'])
+        except YeditException as err:
+            return {'failed': True, 'msg': str(err)}
+
+        return {'changed': changed, 'result': results, 'state': params['state']}
+
     # pylint: disable=too-many-return-statements,too-many-branches
     @staticmethod
     def run_ansible(module):
         '''perform the idempotent crud operations'''
+        # multi-document files are streamed rather than loaded whole
+        if module.params['selector'] is not None:
+            return Yedit.run_ansible_documents(module)
+
+        # listing never writes, so there is nothing to preserve
         yamlfile = Yedit(filename=module.params['src'],
                          backup=module.params['backup'],
-                         separator=module.params['separator'])
+                         separator=module.params['separator'],
+                         round_trip=module.params['state'] != 'list')
 
         if module.params['src']:
             rval = yamlfile.load()
@@ -674,6 +1120,29 @@ class Yedit(object):
                                'file exists, that it is has correct' +
                                ' permissions, and is valid yaml.'}
 
+        if module.params['edits'] and module.params['state'] != 'list':
+            if module.params['content']:
+                yamlfile.yaml_dict = Yedit.parse_value(module.params['content'],
+                                                       module.params['content_type'])
+
+            edits = Yedit.module_edits(module)
+            if isinstance(edits, dict):
+                return edits
+
+            try:
+                changed, results = yamlfile.process_edits(edits)
+            except YeditException as err:
+                return {'failed': True, 'msg': str(err)}
+
+            # a single write for the whole batch
+            if changed and module.params['src']:
+                yamlfile.write()
+
+            return {'changed': changed,
+                    'result': yamlfile.yaml_dict,
+                    'edits': results,
+                    'state': module.params['state']}
+
         if module.params['state'] == 'list':
             if module.params['content']:
                 content = Yedit.parse_value(module.params['content'],
@@ -691,11 +1160,7 @@ class Yedit(object):
                                             module.params['content_type'])
                 yamlfile.yaml_dict = content
 
-            if module.params['update']:
-                rval = yamlfile.pop(module.params['key'],
-                                    module.params['value'])
-            else:
-                rval = yamlfile.delete(module.params['key'])
+            rval = yamlfile.process_edit(module.params)
 
             if rval[0] and module.params['src']:
                 yamlfile.write()
@@ -719,20 +1184,7 @@ class Yedit(object):
 
             # we were passed a value; parse it
             if module.params['value']:
-                value = Yedit.parse_value(module.params['value'],
-                                          module.params['value_type'])
-                key = module.params['key']
-                if module.params['update']:
-                    # pylint: disable=line-too-long
-                    curr_value = Yedit.get_curr_value(Yedit.parse_value(module.params['curr_value']),  # noqa: E501
-                                                      module.params['curr_value_format'])  # noqa: E501
-
-                    rval = yamlfile.update(key, value, module.params['index'], curr_value)  # noqa: E501
-
-                elif module.params['append']:
-                    rval = yamlfile.append(key, value)
-                else:
-                    rval = yamlfile.put(key, value)
+                rval = yamlfile.process_edit(module.params)
 
                 if rval[0] and module.params['src']:
                     yamlfile.write()
@@ -752,6 +1204,114 @@ class Yedit(object):
 
 # -*- -*- -*- End included fragment: ../../lib_utils/src/class/yedit.py -*- -*- -*-
 
+# -*- -*- -*- Begin included fragment: lib/diff.py -*- -*- -*-
+
+
+class ObjectDiff(object):
+    ''' Compute the JSON-patch operations that turn one definition into another
+
+        skip_keys: keys ignored at every level of the objects
+        strict: when False, keys that only the desired definition has are
+                ignored at the top level and at the top level of list items.
+                This is how user definitions have always been compared with
+                what the API server returns.
+
+        Lists are always compared in order: the order of containers, ports
+        and env entries matters, e.g. for $(VAR) expansion.
+    '''
+    def __init__(self, skip_keys=None, strict=True):
+        self.skip = set(skip_keys or [])
+        self.strict = strict
+
+    @staticmethod
+    def pointer(path, key):
+        ''' append a key to a JSON pointer '''
+        return '%s/%s' % (path, str(key).replace('~', '~0').replace('/', '~1'))
+
+    def diff(self, current, desired):
+        ''' return the operations that turn current into desired '''
+        changes = []
+        if isinstance(current, dict) and isinstance(desired, dict):
+            self._diff_dict(current, desired, '', self.strict, changes)
+        elif current != desired:
+            changes.append({'op': 'replace', 'path': '', 'value': desired})
+        return changes
+
+    def _diff_value(self, current, desired, path, changes):
+        ''' compare two values found under the same key '''
+        if isinstance(current, dict) and isinstance(desired, dict):
+            self._diff_dict(current, desired, path, True, changes)
+        elif isinstance(current, list) and isinstance(desired, list):
+            self._diff_list(current, desired, path, changes)
+        elif current != desired:
+            changes.append({'op': 'replace', 'path': path, 'value': desired})
+
+    def _diff_dict(self, current, desired, path, additions, changes):
+        ''' compare two dicts; additions reports keys only desired has '''
+        for key, value in current.items():
+            if key in self.skip:
+                continue
+            if key not in desired:
+                changes.append({'op': 'remove', 'path': ObjectDiff.pointer(path, key)})
+            else:
+                self._diff_value(value, desired[key], ObjectDiff.pointer(path, key), changes)
+
+        if additions:
+            for key, value in desired.items():
+                if key not in current and key not in self.skip:
+                    changes.append({'op': 'add', 'path': ObjectDiff.pointer(path, key), 'value': value})
+
+    @staticmethod
+    def _names(items):
+        ''' return the names of a list of dicts when every item has a unique one '''
+        names = []
+        for item in items:
+            name = item.get('name')
+            if name is None or isinstance(name, (dict, list)) or name in names:
+                return None
+            names.append(name)
+        return names
+
+    def _diff_list(self, current, desired, path, changes):
+        ''' compare two lists; lists of named dicts are matched by name '''
+        if not all([isinstance(item, dict) for item in current + desired]):
+            if current != desired:
+                changes.append({'op': 'replace', 'path': path, 'value': desired})
+            return
+
+        current_names = ObjectDiff._names(current)
+        desired_names = ObjectDiff._names(desired)
+        if current_names is None or desired_names is None:
+            if len(current) != len(desired):
+                changes.append({'op': 'replace', 'path': path, 'value': desired})
+                return
+            for idx, (cur, des) in enumerate(zip(current, desired)):
+                self._diff_dict(cur, des, ObjectDiff.pointer(path, idx), self.strict, changes)
+            return
+
+        kept = [name for name in current_names if name in desired_names]
+        added = [name for name in desired_names if name not in current_names]
+        # a patch cannot reorder items, so send the whole list instead
+        if kept + added != desired_names:
+            changes.append({'op': 'replace', 'path': path, 'value': desired})
+            return
+
+        for idx, name in enumerate(current_names):
+            if name in desired_names:
+                self._diff_dict(current[idx], desired[desired_names.index(name)],
+                                ObjectDiff.pointer(path, idx), self.strict, changes)
+
+        # remove from the back so the indexes above stay valid
+        for idx in reversed(range(len(current_names))):
+            if current_names[idx] not in desired_names:
+                changes.append({'op': 'remove', 'path': ObjectDiff.pointer(path, idx)})
+
+        for name in added:
+            changes.append({'op': 'add', 'path': ObjectDiff.pointer(path, '-'),
+                            'value': desired[desired_names.index(name)]})
+
+# -*- -*- -*- End included fragment: lib/diff.py -*- -*- -*-
+
 # -*- -*- -*- Begin included fragment: lib/base.py -*- -*- -*-
 # pylint: disable=too-many-lines
 # noqa: E301,E302,E303,T001
@@ -762,6 +1322,11 @@ class OpenShiftCLIError(Exception):
     pass
 
 
+class OpenShiftRestConnectError(OpenShiftCLIError):
+    '''The API server could not be reached, so no request was sent'''
+    pass
+
+
 ADDITIONAL_PATH_LOOKUPS = ['/usr/local/bin', os.path.expanduser('~/bin')]
 
 
@@ -788,68 +1353,647 @@ def locate_oc_binary():
     return oc_binary
 
 
+class OpenShiftRestClient(object):
+    ''' Talk to the API server directly over a keep-alive connection.
+
+        The client understands the subset of oc commands issued by
+        OpenShiftCLI (get, create, replace and delete) and answers them with
+        the same returncode, stdout and stderr oc would have produced.
+        Anything else is left to the oc binary.
+    '''
+    # resource name => (api root, plural, namespaced)
+    resources = {
+        'buildconfig': ('/oapi/v1', 'buildconfigs', True),
+        'clusternetwork': ('/oapi/v1', 'clusternetworks', False),
+        'clusterpolicy': ('/oapi/v1', 'clusterpolicies', False),
+        'clusterpolicybinding': ('/oapi/v1', 'clusterpolicybindings', False),
+        'clusterrole': ('/oapi/v1', 'clusterroles', False),
+        'clusterrolebinding': ('/oapi/v1', 'clusterrolebindings', False),
+        'configmap': ('/api/v1', 'configmaps', True),
+        'deploymentconfig': ('/oapi/v1', 'deploymentconfigs', True),
+        'endpoints': ('/api/v1', 'endpoints', True),
+        'group': ('/oapi/v1', 'groups', False),
+        'hostsubnet': ('/oapi/v1', 'hostsubnets', False),
+        'identity': ('/oapi/v1', 'identities', False),
+        'imagestream': ('/oapi/v1', 'imagestreams', True),
+        'namespace': ('/api/v1', 'namespaces', False),
+        'netnamespace': ('/oapi/v1', 'netnamespaces', False),
+        'node': ('/api/v1', 'nodes', False),
+        'persistentvolume': ('/api/v1', 'persistentvolumes', False),
+        'persistentvolumeclaim': ('/api/v1', 'persistentvolumeclaims', True),
+        'pod': ('/api/v1', 'pods', True),
+        'policy': ('/oapi/v1', 'policies', True),
+        'policybinding': ('/oapi/v1', 'policybindings', True),
+        'project': ('/oapi/v1', 'projects', False),
+        'replicationcontroller': ('/api/v1', 'replicationcontrollers', True),
+        'role': ('/oapi/v1', 'roles', True),
+        'rolebinding': ('/oapi/v1', 'rolebindings', True),
+        'route': ('/oapi/v1', 'routes', True),
+        'secret': ('/api/v1', 'secrets', True),
+        'securitycontextconstraints': ('/api/v1', 'securitycontextconstraints', False),
+        'service': ('/api/v1', 'services', True),
+        'serviceaccount': ('/api/v1', 'serviceaccounts', True),
+        'template': ('/oapi/v1', 'templates', True),
+        'user': ('/oapi/v1', 'users', False),
+    }
+
+    aliases = {
+        'cm': 'configmap',
+        'dc': 'deploymentconfig',
+        'ep': 'endpoints',
+        'is': 'imagestream',
+        'no': 'node',
+        'ns': 'namespace',
+        'po': 'pod',
+        'pv': 'persistentvolume',
+        'pvc': 'persistentvolumeclaim',
+        'rc': 'replicationcontroller',
+        'sa': 'serviceaccount',
+        'scc': 'securitycontextconstraints',
+        'svc': 'service',
+    }
+
+    # oc patch --type to request content type
+    patch_types = {
+        'json': 'application/json-patch+json',
+        'merge': 'application/merge-patch+json',
+        'strategic': 'application/strategic-merge-patch+json',
+    }
+
+    # one client per kubeconfig path and mtime, shared by every OpenShiftCLI in the process
+    _clients = {}
+
+    def __init__(self, kubeconfig, source=None, timeout=60):
+        ''' Constructor for OpenShiftRestClient
+
+            kubeconfig: the kubeconfig file to read
+            source: the original kubeconfig path, used to resolve relative file references
+        '''
+        self.timeout = timeout
+        self._conn = None
+        # the keep-alive connection serves one request at a time
+        self._lock = threading.Lock()
+        self._base_dir = os.path.dirname(os.path.abspath(source or kubeconfig))
+
+        config = Utils.get_resource_file(kubeconfig)
+        context = OpenShiftRestClient._named(config.get('contexts'), config.get('current-context'))
+        cluster = OpenShiftRestClient._named(config.get('clusters'), context.get('cluster'))
+        user = OpenShiftRestClient._named(config.get('users'), context.get('user'))
+
+        self.namespace = context.get('namespace') or 'default'
+        self.server = urlparse(cluster['server'])
+        self.headers = {'Accept': 'application/json'}
+
+        if user.get('token'):
+            self.headers['Authorization'] = 'Bearer %s' % user['token']
+        elif user.get('username'):
+            creds = '%s:%s' % (user['username'], user.get('password', ''))
+            self.headers['Authorization'] = 'Basic %s' % base64.b64encode(creds.encode()).decode()
+
+        self.ssl_context = None
+        if self.server.scheme == 'https':
+            self.ssl_context = self._ssl_context(cluster, user)
+
+    @staticmethod
+    def get_client(kubeconfig, source=None):
+        ''' return the shared client for a kubeconfig
+
+            Clients are reused while the kubeconfig path and mtime are unchanged,
+            so a rewritten kubeconfig (a new token or certificate) gets a new client.
+        '''
+        path = os.path.abspath(source or kubeconfig)
+        key = (path, os.path.abspath(kubeconfig), os.stat(kubeconfig).st_mtime)
+        if key not in OpenShiftRestClient._clients:
+            # callers still holding the old client finish with it
+            for old in [old for old in OpenShiftRestClient._clients if old[0] == path]:
+                del OpenShiftRestClient._clients[old]
+            OpenShiftRestClient._clients[key] = OpenShiftRestClient(kubeconfig, source=source)
+
+        return OpenShiftRestClient._clients[key]
+
+    @staticmethod
+    def _named(entries, name):
+        ''' return the body of the kubeconfig entry called name '''
+        for entry in entries or []:
+            if entry.get('name') == name:
+                for value in entry.values():
+                    if isinstance(value, dict):
+                        return value
+        return {}
+
+    def _path(self, fname):
+        ''' resolve a kubeconfig file reference '''
+        return os.path.join(self._base_dir, fname)
+
+    def _ssl_context(self, cluster, user):
+        ''' build the ssl context from the cluster and user entries '''
+        if cluster.get('insecure-skip-tls-verify'):
+            # pylint: disable=protected-access
+            context = ssl._create_unverified_context()
+        else:
+            cadata = None
+            cafile = None
+            if cluster.get('certificate-authority-data'):
+                cadata = base64.b64decode(cluster['certificate-authority-data']).decode()
+            elif cluster.get('certificate-authority'):
+                cafile = self._path(cluster['certificate-authority'])
+            context = ssl.create_default_context(cafile=cafile, cadata=cadata)
+
+        certfile = None
+        keyfile = None
+        if user.get('client-certificate-data'):
+            certfile = Utils.create_tmp_file_from_contents('lib_openshift-cert-',
+                                                           base64.b64decode(user['client-certificate-data']).decode(),
+                                                           ftype='raw')
+        elif user.get('client-certificate'):
+            certfile = self._path(user['client-certificate'])
+
+        if user.get('client-key-data'):
+            keyfile = Utils.create_tmp_file_from_contents('lib_openshift-key-',
+                                                          base64.b64decode(user['client-key-data']).decode(),
+                                                          ftype='raw')
+        elif user.get('client-key'):
+            keyfile = self._path(user['client-key'])
+
+        if certfile:
+            context.load_cert_chain(certfile, keyfile)
+
+        return context
+
+    def _connection(self):
+        ''' return the keep-alive connection, opening it if needed '''
+        if self._conn is None:
+            if self.server.scheme == 'https':
+                self._conn = httplib.HTTPSConnection(self.server.hostname,
+                                                     self.server.port or 443,
+                                                     timeout=self.timeout,
+                                                     context=self.ssl_context)
+            else:
+                self._conn = httplib.HTTPConnection(self.server.hostname,
+                                                    self.server.port or 80,
+                                                    timeout=self.timeout)
+        return self._conn
+
+    def request(self, method, path, body=None, query=None, content_type='application/json'):
+        ''' perform a request and return the status and the decoded body '''
+        path = self.server.path.rstrip('/') + path
+        if query:
+            path += '?' + urlencode(query)
+
+        headers = dict(self.headers)
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = content_type
+
+        # an idle keep-alive connection may have been dropped by the server.
+        # Resend once when the request could not be written to it, or when
+        # it was a GET; anything else may already have reached the server.
+        with self._lock:
+            for attempt in range(2):
+                conn = self._connection()
+                stale = conn.sock is not None
+                if not stale:
+                    try:
+                        conn.connect()
+                    except (httplib.HTTPException, socket.error) as err:
+                        conn.close()
+                        self._conn = None
+                        raise OpenShiftRestConnectError(str(err))
+                written = False
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    written = True
+                    resp = conn.getresponse()
+                    return resp.status, resp.read().decode('utf-8')
+                except (httplib.HTTPException, socket.error):
+                    conn.close()
+                    self._conn = None
+                    if attempt or not stale or (written and method != 'GET'):
+                        raise
+
+    @staticmethod
+    def canonical(resource):
+        ''' return the canonical resource name for an oc resource name '''
+        name = resource.lower()
+        name = OpenShiftRestClient.aliases.get(name, name)
+        if name in OpenShiftRestClient.resources:
+            return name
+        if name.endswith('s') and name[:-1] in OpenShiftRestClient.resources:
+            return name[:-1]
+        return None
+
+    def lookup(self, resource):
+        ''' return (api root, plural, namespaced) for an oc resource name '''
+        return OpenShiftRestClient.resources.get(OpenShiftRestClient.canonical(resource))
+
+    def resource_path(self, resource, namespace=None, name=None):
+        ''' return the api path of a resource collection or item '''
+        api, plural, namespaced = self.lookup(resource)
+        parts = [api]
+        if namespaced and namespace:
+            parts.extend(['namespaces', namespace])
+        parts.append(plural)
+        if name:
+            parts.append(name)
+        return '/'.join(parts)
+
+    @staticmethod
+    def _error(status, data):
+        ''' format a failed response the way oc reports it '''
+        try:
+            result = json.loads(data)
+            return 'Error from server (%s): %s' % (result.get('reason', status), result.get('message', data))
+        except ValueError:
+            return 'Error from server (%s): %s' % (status, data)
+
+    @staticmethod
+    def _load(fname, input_data):
+        ''' load the objects passed with -f '''
+        if fname == '-':
+            try:
+                return json.loads(input_data)
+            except ValueError:
+                return yaml.safe_load(input_data)
+        return Utils.get_resource_file(fname)
+
+    @staticmethod
+    def _as_list(data):
+        ''' report typed lists such as NodeList as a plain List the way oc does '''
+        result = json.loads(data)
+        kind = result.get('kind', '')
+        if kind == 'List' or not kind.endswith('List'):
+            return data
+
+        for item in result.get('items', []):
+            item.setdefault('kind', kind[:-len('List')])
+            item.setdefault('apiVersion', result.get('apiVersion'))
+
+        return json.dumps({'kind': 'List',
+                           'apiVersion': 'v1',
+                           'metadata': {},
+                           'items': result.get('items', [])})
+
+    # pylint: disable=too-many-return-statements
+    def run(self, cmd, namespace=None, all_namespaces=False, input_data=None):
+        ''' serve an oc command natively
+
+            Returns (returncode, stdout, stderr) or None when the command
+            has to go through the oc binary.
+        '''
+        if not cmd:
+            return None
+
+        verb, args = cmd[0], cmd[1:]
+        if namespace is None and not all_namespaces:
+            namespace = self.namespace
+
+        if verb == 'get':
+            if args[-2:] != ['-o', 'json'] or not self.lookup(args[0]):
+                return None
+            query = {}
+            name = None
+            for arg in args[1:-2]:
+                if arg.startswith('--selector='):
+                    query['labelSelector'] = arg[len('--selector='):]
+                elif arg.startswith('--field-selector='):
+                    query['fieldSelector'] = arg[len('--field-selector='):]
+                elif arg == '--all-namespaces':
+                    all_namespaces = True
+                elif arg.startswith('-'):
+                    return None
+                else:
+                    name = arg
+            status, data = self.request('GET',
+                                        self.resource_path(args[0], None if all_namespaces else namespace, name),
+                                        query=query)
+            if status >= 400:
+                return 1, '', self._error(status, data)
+            return 0, self._as_list(data), ''
+
+        elif verb == 'delete':
+            if len(args) != 2 or not self.lookup(args[0]):
+                return None
+            status, data = self.request('DELETE', self.resource_path(args[0], namespace, args[1]))
+            if status >= 400:
+                return 1, '', self._error(status, data)
+            return 0, '%s "%s" deleted\n' % (OpenShiftRestClient.canonical(args[0]), args[1]), ''
+
+        elif verb == 'patch':
+            if len(args) != 5 or not self.lookup(args[0]) or args[3] != '-p' or \
+               not args[2].startswith('--type=') or args[2][len('--type='):] not in OpenShiftRestClient.patch_types:
+                return None
+            status, data = self.request('PATCH', self.resource_path(args[0], namespace, args[1]),
+                                        body=json.loads(args[4]),
+                                        content_type=OpenShiftRestClient.patch_types[args[2][len('--type='):]])
+            if status >= 400:
+                return 1, '', self._error(status, data)
+            return 0, '%s "%s" patched\n' % (OpenShiftRestClient.canonical(args[0]), args[1]), ''
+
+        elif verb in ['create', 'replace']:
+            if len(args) != 2 or args[0] != '-f':
+                return None
+
+            content = OpenShiftRestClient._load(args[1], input_data)
+            items = content.get('items', []) if content.get('kind') == 'List' else [content]
+            if not all([self.lookup(item.get('kind', '')) for item in items]):
+                return None
+
+            stdout = []
+            for item in items:
+                name = item['metadata']['name']
+                item_ns = item['metadata'].get('namespace') or namespace or self.namespace
+                if verb == 'create':
+                    status, data = self.request('POST', self.resource_path(item['kind'], item_ns), body=item)
+                else:
+                    status, data = self.request('PUT', self.resource_path(item['kind'], item_ns, name), body=item)
+                if status >= 400:
+                    return 1, '\n'.join(stdout), self._error(status, data)
+                stdout.append('%s "%s" %sd' % (item['kind'].lower(), name, verb))
+
+            return 0, '\n'.join(stdout) + '\n', ''
+
+        return None
+
+
 # pylint: disable=too-few-public-methods
 class OpenShiftCLI(object):
     ''' Class to wrap the command line tools '''
+    # commands that never modify the cluster and so keep the get cache valid
+    read_only_cmds = ['get', 'process', 'version']
+
+    # get cache hits and misses for the whole module run
+    _cache_stats = {'hits': 0, 'misses': 0}
+    # bumped by every write, so a write through one instance invalidates
+    # the get cache of all of them
+    _cache_generation = 0
+    _cache_lock = threading.Lock()
+
+    # _replace_content patches instead of replacing up to this many changes
+    max_patch_ops = 10
+
+    # how often and how patiently failed commands are retried.  Delays grow
+    # exponentially from delay up to max_delay, with full jitter.
+    default_retry_policy = {'attempts': 4, 'delay': 1, 'max_delay': 30, 'conflict_attempts': 3}
+
+    # commands that may safely be sent again after the server saw them
+    idempotent_cmds = ['get', 'process', 'version', 'replace', 'apply', 'label', 'annotate']
+
+    # failures where the request never reached the API server
+    connect_errors = ['connection refused', 'unable to connect to the server', 'no route to host',
+                      'tls handshake timeout']
+
+    # server side failures that are expected to go away, e.g. while a master restarts
+    transient_errors = ['internalerror', 'serviceunavailable', 'servertimeout', 'toomanyrequests',
+                        'the server is currently unable to handle the request', 'i/o timeout',
+                        'connection reset by peer', 'unexpected eof', 'etcdserver: request timed out',
+                        'lost connection to the server', '(500)', '(502)', '(503)', '(504)']
+
+    # a replace lost the race against another writer, or a patch found the
+    # object changed since it was read
+    conflict_errors = ['the object has been modified', '(conflict)',
+                       'testing value /metadata/resourceversion failed']
+
+    # options every module built on OpenShiftCLI accepts, see README.md
+    argument_spec = dict(
+        transport=dict(default=None, type='str', choices=['cli', 'rest']),
+        retry_policy=dict(default=None, type='dict'),
+    )
+
+    # the transport and retry_policy module options, applied to every instance
+    module_settings = {}
+
     def __init__(self,
                  namespace,
                  kubeconfig='/etc/origin/master/admin.kubeconfig',
                  verbose=False,
-                 all_namespaces=False):
-        ''' Constructor for OpenshiftCLI '''
+                 all_namespaces=False,
+                 transport=None,
+                 retry_policy=None):
+        ''' Constructor for OpenshiftCLI
+
+            transport: 'cli' to fork oc for every call or 'rest' to talk to
+                       the API server directly.  Defaults to the transport
+                       module option, the LIB_OPENSHIFT_TRANSPORT environment
+                       variable or 'cli'.
+            retry_policy: overrides for default_retry_policy.  Defaults to the
+                          retry_policy module option or the JSON object in the
+                          LIB_OPENSHIFT_RETRY_POLICY environment variable.
+        '''
         self.namespace = namespace
         self.verbose = verbose
-        self.kubeconfig = Utils.create_tmpfile_copy(kubeconfig)
+        self.kubeconfig_src = kubeconfig
+        self.kubeconfig = Utils.stage_kubeconfig(kubeconfig)
         self.all_namespaces = all_namespaces
         self.oc_binary = locate_oc_binary()
+        self.transport = transport or OpenShiftCLI.module_settings.get('transport') or \
+            os.environ.get('LIB_OPENSHIFT_TRANSPORT', 'cli')
+        self._get_cache = {}
+        self._cache_generation = OpenShiftCLI._cache_generation
+        if retry_policy is None:
+            retry_policy = OpenShiftCLI.module_settings.get('retry_policy')
+        if retry_policy is None:
+            try:
+                retry_policy = json.loads(os.environ.get('LIB_OPENSHIFT_RETRY_POLICY') or '{}')
+            except ValueError as err:
+                raise OpenShiftCLIError('LIB_OPENSHIFT_RETRY_POLICY is not valid JSON: {}'.format(err))
+        self.retry_policy = dict(OpenShiftCLI.default_retry_policy)
+        self.retry_policy.update(OpenShiftCLI.check_retry_policy(retry_policy))
+
+        if self.transport not in ['cli', 'rest']:
+            raise OpenShiftCLIError('Unknown transport {}; use cli or rest'.format(self.transport))
+
+    @staticmethod
+    def configure(module):
+        ''' apply the shared transport and retry_policy options of a module
+
+            Every OpenShiftCLI the module creates afterwards uses them.
+        '''
+        try:
+            retry_policy = module.params.get('retry_policy')
+            if retry_policy is not None:
+                retry_policy = OpenShiftCLI.check_retry_policy(retry_policy)
+        except OpenShiftCLIError as err:
+            module.fail_json(msg=str(err))
+
+        OpenShiftCLI.module_settings = {'transport': module.params.get('transport'),
+                                        'retry_policy': retry_policy}
+
+    @staticmethod
+    def check_retry_policy(retry_policy):
+        ''' return retry policy overrides with numeric values
+
+            Raises OpenShiftCLIError for unknown keys and values that are not
+            numbers, and when attempts or conflict_attempts is below 1.
+        '''
+        policy = {}
+        for key, value in retry_policy.items():
+            if key not in OpenShiftCLI.default_retry_policy:
+                raise OpenShiftCLIError('Unknown retry_policy key {}; use {}'.format(
+                    key, ', '.join(sorted(OpenShiftCLI.default_retry_policy))))
+            try:
+                policy[key] = int(value) if key in ['attempts', 'conflict_attempts'] else float(value)
+            except (TypeError, ValueError):
+                raise OpenShiftCLIError('retry_policy {} must be a number, got {}'.format(key, value))
+            if key in ['attempts', 'conflict_attempts'] and policy[key] < 1:
+                raise OpenShiftCLIError('retry_policy {} must be at least 1'.format(key))
+
+        return policy
+
+    @staticmethod
+    def cache_stats():
+        ''' return the get cache hit and miss counters '''
+        with OpenShiftCLI._cache_lock:
+            return dict(OpenShiftCLI._cache_stats)
+
+    def invalidate_cache(self):
+        ''' forget the cached get results of every instance '''
+        with OpenShiftCLI._cache_lock:
+            OpenShiftCLI._cache_generation += 1
+            self._get_cache.clear()
+            self._cache_generation = OpenShiftCLI._cache_generation
 
     # Pylint allows only 5 arguments to be passed.
     # pylint: disable=too-many-arguments
     def _replace_content(self, resource, rname, content, force=False, sep='.'):
-        ''' replace the current object with the content '''
+        ''' replace the current object with the content
+
+            A replace that loses a resourceVersion conflict is redone
+            against a fresh copy of the object.
+        '''
+        attempt = 1
+        for attempt in range(1, self.retry_policy['conflict_attempts'] + 1):
+            rval = self._replace_content_once(resource, rname, content, force, sep)
+            if rval['returncode'] == 0 or not OpenShiftCLI._matches(rval.get('stderr'), OpenShiftCLI.conflict_errors):
+                break
+            self.invalidate_cache()
+
+        if attempt > 1:
+            rval['conflict_attempts'] = attempt
+
+        return rval
+
+    def _replace_content_once(self, resource, rname, content, force=False, sep='.'):
+        ''' apply the content to the current object and send the result '''
         res = self._get(resource, rname)
         if not res['results']:
             return res
 
-        fname = Utils.create_tmpfile(rname + '-')
-
-        yed = Yedit(fname, res['results'][0], separator=sep)
-        changes = []
+        # the transaction leaves the fetched object untouched to diff against
+        current = res['results'][0]
+        yed = Yedit(content=current, separator=sep)
+        yed.begin()
         for key, value in content.items():
-            changes.append(yed.put(key, value))
+            yed.put(key, value)
+
+        if not yed.commit()[0]:
+            return {'returncode': 0, 'updated': False}
 
-        if any([change[0] for change in changes]):
-            yed.write()
+        # small changes go out as a patch rather than the whole object
+        patch = ObjectDiff().diff(current, yed.yaml_dict)
+        if not patch:
+            return {'returncode': 0, 'updated': False}
 
-            atexit.register(Utils.cleanup, [fname])
+        if not force and len(patch) <= OpenShiftCLI.max_patch_ops:
+            # list items are patched by index, so only apply to the object they were diffed against
+            version = current.get('metadata', {}).get('resourceVersion')
+            if version:
+                patch.insert(0, {'op': 'test', 'path': '/metadata/resourceVersion', 'value': version})
+            return self._patch(resource, rname, patch)
 
-            return self._replace(fname, force)
+        return self._replace('-', force, input_data=json.dumps(yed.yaml_dict))
 
-        return {'returncode': 0, 'updated': False}
+    def _patch(self, resource, rname, patch, patch_type='json'):
+        '''call oc patch on a resource
 
-    def _replace(self, fname, force=False):
-        '''replace the current object with oc replace'''
+           patch: a list of JSON-patch operations for patch_type 'json', or
+                  the partial object to merge for 'merge' and 'strategic'
+           patch_type: json, merge or strategic
+        '''
+        self.invalidate_cache()
+        return self.openshift_cmd(['patch', resource, rname, '--type=%s' % patch_type, '-p', json.dumps(patch)])
+
+    def _replace(self, fname, force=False, input_data=None):
+        '''replace the current object with oc replace
+
+           fname: the file to replace from, or '-' to read input_data on stdin
+        '''
+        self.invalidate_cache()
         cmd = ['replace', '-f', fname]
         if force:
             cmd.append('--force')
-        return self.openshift_cmd(cmd)
+        return self.openshift_cmd(cmd, input_data=input_data)
 
+    # pylint: disable=unused-argument
     def _create_from_content(self, rname, content):
-        '''create a temporary file and then call oc create on it'''
-        fname = Utils.create_tmpfile(rname + '-')
-        yed = Yedit(fname, content=content)
-        yed.write()
+        '''call oc create with the content passed on stdin'''
+        return self._create('-', input_data=json.dumps(content))
+
+    def _create(self, fname, input_data=None):
+        '''call oc create on a filename
+
+           fname: the file to create from, or '-' to read input_data on stdin
+        '''
+        self.invalidate_cache()
+        return self.openshift_cmd(['create', '-f', fname], input_data=input_data)
+
+    def _create_list(self, objects):
+        '''create many objects with a single oc create'''
+        return self._submit_list('create', objects)
+
+    def _replace_list(self, objects, force=False):
+        '''replace many objects with a single oc replace'''
+        return self._submit_list('replace', objects, force)
+
+    def _submit_list(self, verb, objects, force=False):
+        '''submit objects as one List document
+
+           verb: create or replace
+           objects: the object definitions to submit
+
+           Besides the usual results an 'items' entry reports the kind,
+           name and status of every object.
+        '''
+        if not objects:
+            return {'returncode': 0, 'results': '', 'items': []}
+
+        content = json.dumps({'kind': 'List', 'apiVersion': 'v1', 'items': objects})
+
+        if verb == 'create':
+            rval = self._create('-', input_data=content)
+        else:
+            rval = self._replace('-', force, input_data=content)
+
+        # oc reports success on stdout and failures on stderr, one line per object
+        stdout = rval.get('stdout', '').splitlines()
+        errors = rval.get('stderr', '').splitlines()
+        rval['items'] = []
+        for obj in objects:
+            name = obj['metadata']['name']
+            item = {'kind': obj['kind'], 'name': name, 'status': verb + 'd'}
+            if rval['returncode'] != 0 and \
+               not any([OpenShiftCLI._names(line, obj['kind'], name) and line.endswith(verb + 'd')
+                        for line in stdout]):
+                item['status'] = 'failed'
+                item['msg'] = next((line for line in errors if OpenShiftCLI._names(line, obj['kind'], name)),
+                                   rval.get('stderr', ''))
+            rval['items'].append(item)
 
-        atexit.register(Utils.cleanup, [fname])
+        return rval
 
-        return self._create(fname)
+    @staticmethod
+    def _names(line, kind, name):
+        ''' return whether an oc output line is about the object kind/name
 
-    def _create(self, fname):
-        '''call oc create on a filename'''
-        return self.openshift_cmd(['create', '-f', fname])
+            oc names objects as 'kind "name"' or 'kind/name', with the kind
+            lower cased and at times plural or qualified by its api group.
+        '''
+        pattern = r'(^|[\s:]){}(s|es)?(\.[\w.-]+)?( "{}"|/{}( |$))'.format(re.escape(kind.lower()),
+                                                                      re.escape(name), re.escape(name))
+        return re.search(pattern, line, re.IGNORECASE) is not None
 
     def _delete(self, resource, rname, selector=None):
         '''call oc delete on a resource'''
+        self.invalidate_cache()
         cmd = ['delete', resource, rname]
         if selector:
             cmd.append('--selector=%s' % selector)
@@ -874,21 +2018,33 @@ class OpenShiftCLI(object):
             cmd.append('-v')
             cmd.extend(param_str)
 
-        results = self.openshift_cmd(cmd, output=True, input_data=template_data)
+        # when creating, hand the processed output to oc create untouched
+        output_type = 'raw' if create else 'json'
+        results = self.openshift_cmd(cmd, output=True, output_type=output_type, input_data=template_data)
 
         if results['returncode'] != 0 or not create:
             return results
 
-        fname = Utils.create_tmpfile(template_name + '-')
-        yed = Yedit(fname, results['results'])
-        yed.write()
+        return self._create('-', input_data=results['results'])
 
-        atexit.register(Utils.cleanup, [fname])
+    def _get(self, resource, rname=None, selector=None):
+        '''return a resource by name
 
-        return self.openshift_cmd(['create', '-f', fname])
+           Successful results are cached on this instance until the next
+           command that may write to the cluster, through any instance.
+        '''
+        key = (resource, rname, selector, self.namespace, self.all_namespaces)
+        with OpenShiftCLI._cache_lock:
+            if self._cache_generation != OpenShiftCLI._cache_generation:
+                self._get_cache.clear()
+                self._cache_generation = OpenShiftCLI._cache_generation
+            generation = self._cache_generation
+            cached = self._get_cache.get(key)
+            OpenShiftCLI._cache_stats['misses' if cached is None else 'hits'] += 1
+
+        if cached is not None:
+            return copy.deepcopy(cached)
 
-    def _get(self, resource, rname=None, selector=None):
-        '''return a resource by name '''
         cmd = ['get', resource]
         if selector:
             cmd.append('--selector=%s' % selector)
@@ -905,6 +2061,11 @@ class OpenShiftCLI(object):
         elif not isinstance(rval['results'], list):
             rval['results'] = [rval['results']]
 
+        with OpenShiftCLI._cache_lock:
+            # a write that ran meanwhile may have made the result stale
+            if rval['returncode'] == 0 and generation == OpenShiftCLI._cache_generation:
+                self._get_cache[key] = copy.deepcopy(rval)
+
         return rval
 
     def _schedulable(self, node=None, selector=None, schedulable=True):
@@ -996,23 +2157,65 @@ class OpenShiftCLI(object):
                                 stderr=subprocess.PIPE,
                                 env=curr_env)
 
+        if input_data is not None and not isinstance(input_data, bytes):
+            input_data = input_data.encode('utf-8')
+
         stdout, stderr = proc.communicate(input_data)
 
         return proc.returncode, stdout.decode(), stderr.decode()
 
-    # pylint: disable=too-many-arguments,too-many-branches
+    def _run_rest(self, cmd, namespace, input_data):
+        ''' Serve the command through the API server. Returns None when oc has to run it. '''
+        client = OpenShiftRestClient.get_client(self.kubeconfig, source=self.kubeconfig_src)
+        try:
+            return client.run(cmd, namespace=namespace, all_namespaces=self.all_namespaces, input_data=input_data)
+        except OpenShiftRestConnectError as ex:
+            # worded like oc so the failure is retried as a connect error
+            return 1, '', 'Unable to connect to the server: {}'.format(ex)
+        except (httplib.HTTPException, socket.error) as ex:
+            # the server may have acted on the request, so only idempotent commands are retried
+            return 1, '', 'Lost connection to the server: {}'.format(ex)
+
+    @staticmethod
+    def _matches(stderr, errors):
+        ''' return whether stderr contains any of the error fragments '''
+        stderr = (stderr or '').lower()
+        return any([error in stderr for error in errors])
+
+    def _retryable(self, cmd, oadm, stderr):
+        ''' return whether a failed command is worth sending again '''
+        if OpenShiftCLI._matches(stderr, OpenShiftCLI.connect_errors):
+            return True
+
+        # a JSON patch may append to lists and so cannot be repeated blindly
+        idempotent = cmd[0] in OpenShiftCLI.idempotent_cmds or \
+            (cmd[0] == 'patch' and '--type=json' not in cmd)
+        return not oadm and idempotent and OpenShiftCLI._matches(stderr, OpenShiftCLI.transient_errors)
+
+    # pylint: disable=too-many-arguments,too-many-branches,too-many-locals
     def openshift_cmd(self, cmd, oadm=False, output=False, output_type='json', input_data=None):
-        '''Base command for oc '''
+        '''Base command for oc
+
+           Failures that look transient are retried with exponential backoff
+           according to retry_policy.  Retried commands report the number of
+           attempts and the seconds spent waiting.
+        '''
         cmds = [self.oc_binary]
 
+        writes = oadm or cmd[0] not in OpenShiftCLI.read_only_cmds
+        if writes:
+            self.invalidate_cache()
+
         if oadm:
             cmds.append('adm')
 
         cmds.extend(cmd)
 
+        namespace = None
         if self.all_namespaces:
             cmds.extend(['--all-namespaces'])
         elif self.namespace is not None and self.namespace.lower() not in ['none', 'emtpy']:  # E501
+            namespace = self.namespace
             cmds.extend(['-n', self.namespace])
 
         rval = {}
@@ -1022,15 +2225,43 @@ class OpenShiftCLI(object):
         if self.verbose:
             print(' '.join(cmds))
 
-        try:
-            returncode, stdout, stderr = self._run(cmds, input_data)
-        except OSError as ex:
-            returncode, stdout, stderr = 1, '', 'Failed to execute {}: {}'.format(subprocess.list2cmdline(cmds), ex)
+        attempts = 0
+        waited = 0
+        while True:
+            attempts += 1
+            try:
+                native = None
+                if self.transport == 'rest' and not oadm:
+                    native = self._run_rest(cmd, namespace, input_data)
+
+                if native is None:
+                    returncode, stdout, stderr = self._run(cmds, input_data)
+                else:
+                    returncode, stdout, stderr = native
+            except OSError as ex:
+                returncode, stdout, stderr = 1, '', 'Failed to execute {}: {}'.format(subprocess.list2cmdline(cmds), ex)
+
+            if returncode == 0 or attempts >= self.retry_policy['attempts'] or \
+               not self._retryable(cmd, oadm, stderr):
+                break
+
+            delay = random.uniform(0, min(self.retry_policy['max_delay'],
+                                          self.retry_policy['delay'] * 2 ** (attempts - 1)))
+            waited += delay
+            time.sleep(delay)
+
+        if writes:
+            # drop what other threads read while the write was in flight
+            self.invalidate_cache()
 
         rval = {"returncode": returncode,
                 "results": results,
                 "cmd": ' '.join(cmds)}
 
+        if attempts > 1:
+            rval['attempts'] = attempts
+            rval['retry_wait'] = round(waited, 3)
+
         if returncode == 0:
             if output:
                 if output_type == 'json':
@@ -1063,6 +2294,10 @@ class OpenShiftCLI(object):
 class Utils(object):
     ''' utilities for openshiftcli modules '''
 
+    # staged kubeconfig copies by (path, mtime) and by content digest
+    _staged_kubeconfigs = {}
+    _staged_digests = {}
+
     @staticmethod
     def _write(filename, contents):
         ''' Actually write the file contents to disk. This helps with mocking. '''
@@ -1104,6 +2339,32 @@ class Utils(object):
 
         return tmpfile
 
+    @staticmethod
+    def stage_kubeconfig(kubeconfig):
+        '''return a private copy of a kubeconfig, shared by every caller in the process
+
+           Copies are reused while the source path and mtime are unchanged and
+           deduplicated by content, so each distinct kubeconfig is copied once
+           and cleaned up once at exit.
+        '''
+        try:
+            mtime = os.stat(kubeconfig).st_mtime
+        except OSError:
+            # let the copy report the problem
+            return Utils.create_tmpfile_copy(kubeconfig)
+
+        key = (os.path.abspath(kubeconfig), mtime)
+        if key not in Utils._staged_kubeconfigs:
+            with open(kubeconfig, 'rb') as kfd:
+                digest = hashlib.sha256(kfd.read()).hexdigest()
+
+            if digest not in Utils._staged_digests:
+                Utils._staged_digests[digest] = Utils.create_tmpfile_copy(kubeconfig)
+
+            Utils._staged_kubeconfigs[key] = Utils._staged_digests[digest]
+
+        return Utils._staged_kubeconfigs[key]
+
     @staticmethod
     def create_tmpfile(prefix='tmp'):
         ''' Generates and returns a temporary file name '''
@@ -1237,91 +2498,12 @@ class Utils(object):
         if skip_keys:
             skip.extend(skip_keys)
 
-        for key, value in result_def.items():
-            if key in skip:
-                continue
-
-            # Both are lists
-            if isinstance(value, list):
-                if key not in user_def:
-                    if debug:
-                        print('User data does not have key [%s]' % key)
-                        print('User data: %s' % user_def)
-                    return False
-
-                if not isinstance(user_def[key], list):
-                    if debug:
-                        print('user_def[key] is not a list key=[%s] user_def[key]=%s' % (key, user_def[key]))
-                    return False
-
-                if len(user_def[key]) != len(value):
-                    if debug:
-                        print("List lengths are not equal.")
-                        print("key=[%s]: user_def[%s] != value[%s]" % (key, len(user_def[key]), len(value)))
-                        print("user_def: %s" % user_def[key])
-                        print("value: %s" % value)
-                    return False
-
-                for values in zip(user_def[key], value):
-                    if isinstance(values[0], dict) and isinstance(values[1], dict):
-                        if debug:
-                            print('sending list - list')
-                            print(type(values[0]))
-                            print(type(values[1]))
-                        result = Utils.check_def_equal(values[0], values[1], skip_keys=skip_keys, debug=debug)
-                        if not result:
-                            print('list compare returned false')
-                            return False
-
-                    elif value != user_def[key]:
-                        if debug:
-                            print('value should be identical')
-                            print(user_def[key])
-                            print(value)
-                        return False
-
-            # recurse on a dictionary
-            elif isinstance(value, dict):
-                if key not in user_def:
-                    if debug:
-                        print("user_def does not have key [%s]" % key)
-                    return False
-                if not isinstance(user_def[key], dict):
-                    if debug:
-                        print("dict returned false: not instance of dict")
-                    return False
-
-                # before passing ensure keys match
-                api_values = set(value.keys()) - set(skip)
-                user_values = set(user_def[key].keys()) - set(skip)
-                if api_values != user_values:
-                    if debug:
-                        print("keys are not equal in dict")
-                        print(user_values)
-                        print(api_values)
-                    return False
-
-                result = Utils.check_def_equal(user_def[key], value, skip_keys=skip_keys, debug=debug)
-                if not result:
-                    if debug:
-                        print("dict returned false")
-                        print(result)
-                    return False
-
-            # Verify each key, value pair is the same
-            else:
-                if key not in user_def or value != user_def[key]:
-                    if debug:
-                        print("value not equal; user_def does not have key")
-                        print(key)
-                        print(value)
-                        if key in user_def:
-                            print(user_def[key])
-                    return False
-
+        changes = ObjectDiff(skip_keys=skip, strict=False).diff(result_def, user_def)
         if debug:
-            print('returning true')
-        return True
+            for change in changes:
+                print('%s %s' % (change['op'], change['path']))
+
+        return not changes
 
 
 class OpenShiftCLIConfig(object):
@@ -2101,6 +3283,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=dict(
+            OpenShiftCLI.argument_spec,
             state=dict(default='present', type='str',
                        choices=['present', 'absent']),
             debug=dict(default=False, type='bool'),
@@ -2114,11 +3297,13 @@ def main():
         supports_check_mode=True,
     )
 
+    OpenShiftCLI.configure(module)
     results = PolicyGroup.run_ansible(module.params, module.check_mode)
 
     if 'failed' in results:
         module.fail_json(**results)
 
+    results['get_cache'] = OpenShiftCLI.cache_stats()
     module.exit_json(**results)
 
 
@@ -8,6 +8,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=dict(
+            OpenShiftCLI.argument_spec,
             state=dict(default='present', type='str', choices=['present']),
             debug=dict(default=False, type='bool'),
             kubeconfig=dict(default='/etc/origin/master/admin.kubeconfig', type='str'),
@@ -24,10 +25,12 @@ def main():
         supports_check_mode=True,
     )
 
+    OpenShiftCLI.configure(module)
     results = CAServerCert.run_ansible(module.params, module.check_mode)
     if 'failed' in results:
         return module.fail_json(**results)
 
+    results['get_cache'] = OpenShiftCLI.cache_stats()
     return module.exit_json(**results)
 
 
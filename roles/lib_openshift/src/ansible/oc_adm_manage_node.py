@@ -9,6 +9,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=dict(
+            OpenShiftCLI.argument_spec,
             debug=dict(default=False, type='bool'),
             kubeconfig=dict(default='/etc/origin/master/admin.kubeconfig', type='str'),
             node=dict(default=None, type='list'),
@@ -20,17 +21,24 @@ def main():
             dry_run=dict(default=False, type='bool'),
             force=dict(default=False, type='bool'),
             grace_period=dict(default=None, type='int'),
+            max_workers=dict(default=1, type='int'),
+            list_pods_strategy=dict(default='per_node', type='str', choices=['per_node', 'grouped']),
+            batch_size=dict(default=None, type='int'),
+            batch_timeout=dict(default=None, type='int'),
+            batch_delay=dict(default=0, type='int'),
         ),
         mutually_exclusive=[["selector", "node"], ['evacuate', 'list_pods'], ['list_pods', 'schedulable']],
         required_one_of=[["node", "selector"]],
 
         supports_check_mode=True,
     )
+    OpenShiftCLI.configure(module)
     results = ManageNode.run_ansible(module.params, module.check_mode)
 
     if 'failed' in results:
         module.fail_json(**results)
 
+    results['get_cache'] = OpenShiftCLI.cache_stats()
     module.exit_json(**results)
 
 
@@ -9,6 +9,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=dict(
+            OpenShiftCLI.argument_spec,
             state=dict(default='present', type='str',
                        choices=['present', 'absent']),
             debug=dict(default=False, type='bool'),
@@ -57,11 +58,13 @@ def main():
         required_together=[['cacert_file', 'cert_file', 'key_file']],
         supports_check_mode=True,
     )
+    OpenShiftCLI.configure(module)
     results = Router.run_ansible(module.params, module.check_mode)
 
     if 'failed' in results:
         module.fail_json(**results)
 
+    results['get_cache'] = OpenShiftCLI.cache_stats()
     module.exit_json(**results)
 
 
@@ -6,6 +6,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=dict(
+            OpenShiftCLI.argument_spec,
             kubeconfig=dict(default='/etc/origin/master/admin.kubeconfig', type='str'),
             state=dict(default='present', type='str',
                        choices=['present', 'absent', 'list', 'add']),
@@ -21,11 +22,13 @@ def main():
         mutually_exclusive=(['name', 'selector']),
     )
 
+    OpenShiftCLI.configure(module)
     results = OCLabel.run_ansible(module.params, module.check_mode)
 
     if 'failed' in results:
         module.fail_json(**results)
 
+    results['get_cache'] = OpenShiftCLI.cache_stats()
     module.exit_json(**results)
 
 if __name__ == '__main__':
@@ -8,6 +8,7 @@ def main():
 
     module = AnsibleModule(
         argument_spec=dict(
+            OpenShiftCLI.argument_spec,
             kubeconfig=dict(default='/etc/origin/master/admin.kubeconfig', type='str'),
             state=dict(default='present', type='str',
                        choices=['present', 'absent', 'list']),
@@ -22,10 +23,12 @@ def main():
         supports_check_mode=True,
     )
 
+    OpenShiftCLI.configure(module)
     rval = OCProject.run_ansible(module.params, module.check_mode)
     if 'failed' in rval:
         return module.fail_json(**rval)
 
+    rval['get_cache'] = OpenShiftCLI.cache_stats()
     return module.exit_json(**rval)
 
 
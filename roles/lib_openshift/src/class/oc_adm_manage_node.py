@@ -95,29 +95,194 @@ class ManageNode(OpenShiftCLI):
 
         return all_pods
 
+    def get_pods_by_node(self, node_names, pod_selector=None):
+        '''list the pods of every node with a single oc get and group them by node'''
+        cmd = ['get', 'pods', '--all-namespaces']
+        if pod_selector:
+            cmd.append('--selector=%s' % pod_selector)
+        if len(node_names) == 1:
+            cmd.append('--field-selector=spec.nodeName=%s' % node_names[0])
+        cmd.extend(['-o', 'json'])
+
+        results = self.openshift_cmd(cmd, output=True)
+        if results['returncode'] != 0:
+            return results
+
+        all_pods = dict((name, []) for name in node_names)
+        for pod in results['results']['items']:
+            node_name = pod.get('spec', {}).get('nodeName')
+            if node_name in all_pods:
+                all_pods[node_name].append(pod)
+
+        return {'returncode': 0, 'nodes': all_pods}
+
     def list_pods(self):
         ''' run oadm manage-node --list-pods'''
         _nodes = self.config.config_options['node']['value']
         _selector = self.config.config_options['selector']['value']
         _pod_selector = self.config.config_options['pod_selector']['value']
+        _max_workers = self.config.config_options['max_workers']['value'] or 1
 
         if not _nodes:
             _nodes = self.get_nodes(selector=_selector)
+            if isinstance(_nodes, dict):
+                return _nodes
         else:
             _nodes = [{'name': name} for name in _nodes]
 
-        all_pods = {}
-        for node in _nodes:
-            results = self.get_pods_from_node(node['name'], pod_selector=_pod_selector)
-            if isinstance(results, dict):
+        node_names = [node['name'] for node in _nodes]
+
+        if self.config.config_options['list_pods_strategy']['value'] == 'grouped':
+            results = self.get_pods_by_node(node_names, pod_selector=_pod_selector)
+            if results['returncode'] != 0:
                 return results
-            all_pods[node['name']] = results
+            all_pods = results['nodes']
+
+        else:
+            def _list(name):
+                '''list the pods of one node'''
+                return self.get_pods_from_node(name, pod_selector=_pod_selector)
+
+            if _max_workers > 1 and len(node_names) > 1:
+                pool = ThreadPool(min(_max_workers, len(node_names)))
+                try:
+                    node_pods = pool.map(_list, node_names)
+                finally:
+                    pool.close()
+                    pool.join()
+            else:
+                node_pods = [_list(name) for name in node_names]
+
+            # report the first failure in node order, as the serial loop did
+            all_pods = {}
+            for name, results in zip(node_names, node_pods):
+                if isinstance(results, dict):
+                    return results
+                all_pods[name] = results
 
         results = {}
         results['nodes'] = all_pods
         results['returncode'] = 0
         return results
 
+    @staticmethod
+    def run_concurrently(func, names, max_workers, timeout=None):
+        '''call func(name) for every name using at most max_workers threads
+
+           Returns {name: (result, elapsed seconds, exception)}, where
+           exception is whatever func raised or None.  Names that have not
+           finished when timeout seconds have passed are left out.
+        '''
+        results = {}
+        pending = list(names)
+        lock = threading.Lock()
+
+        def worker():
+            '''work through the pending names'''
+            while True:
+                with lock:
+                    if not pending:
+                        return
+                    name = pending.pop(0)
+                start = time.time()
+                result = None
+                error = None
+                try:
+                    result = func(name)
+                except Exception as err:  # pylint: disable=broad-except
+                    error = err
+                results[name] = (result, round(time.time() - start, 3), error)
+
+        threads = [threading.Thread(target=worker) for _ in range(max(1, min(max_workers, len(names))))]
+        for thread in threads:
+            # an oc call that outlives the timeout must not keep the module alive
+            thread.daemon = True
+            thread.start()
+
+        deadline = time.time() + timeout if timeout else None
+        for thread in threads:
+            thread.join(None if deadline is None else max(0, deadline - time.time()))
+
+        return dict(results)
+
+    # pylint: disable=too-many-locals
+    def rolling(self):
+        '''make nodes (un)schedulable and/or evacuate them batch by batch
+
+           Nodes in a batch are processed concurrently, at most max_workers
+           at a time.  A batch that fails or does not finish within
+           batch_timeout seconds stops the run.
+        '''
+        options = self.config.config_options
+        schedulable = options['schedulable']['value']
+        batch_size = options['batch_size']['value']
+
+        nodes = []
+        for name in options['node']['value'] or [None]:
+            results = self.get_nodes(name, selector=options['selector']['value'])
+            if isinstance(results, dict):
+                return results
+            nodes.extend(results)
+
+        current = dict((node['name'], node['schedulable']) for node in nodes)
+        names = [node['name'] for node in nodes]
+
+        def process(name):
+            '''run the requested actions against a single node'''
+            result = {'name': name}
+            if schedulable is not None and current[name] != schedulable:
+                result['schedulable'] = self._schedulable(node=[name], schedulable=schedulable)
+                if result['schedulable']['returncode'] != 0:
+                    return result
+
+            if options['evacuate']['value']:
+                result['evacuate'] = self._evacuate(node=[name],
+                                                    pod_selector=options['pod_selector']['value'],
+                                                    dry_run=options['dry_run']['value'],
+                                                    grace_period=options['grace_period']['value'],
+                                                    force=options['force']['value'])
+            return result
+
+        rval = {'returncode': 0, 'changed': False, 'nodes': [], 'batches': 0}
+        for idx in range(0, len(names), batch_size):
+            if idx and options['batch_delay']['value']:
+                time.sleep(options['batch_delay']['value'])
+
+            batch = names[idx:idx + batch_size]
+            batch_results = ManageNode.run_concurrently(process, batch,
+                                                        options['max_workers']['value'] or 1,
+                                                        options['batch_timeout']['value'])
+            rval['batches'] += 1
+
+            for name in batch:
+                if name not in batch_results:
+                    rval['nodes'].append({'name': name, 'returncode': 1,
+                                          'msg': 'Timed out after %s seconds' % options['batch_timeout']['value']})
+                    rval['returncode'] = 1
+                    continue
+
+                result, elapsed, error = batch_results[name]
+                if error is not None:
+                    rval['nodes'].append({'name': name, 'returncode': 1, 'elapsed': elapsed,
+                                          'msg': 'Failed: %s' % error})
+                    rval['returncode'] = 1
+                    continue
+
+                result['elapsed'] = elapsed
+                result['returncode'] = 0
+                for action in ['schedulable', 'evacuate']:
+                    if action in result:
+                        rval['changed'] = True
+                        if result[action]['returncode'] != 0:
+                            result['returncode'] = result[action]['returncode']
+                            rval['returncode'] = result['returncode']
+                rval['nodes'].append(result)
+
+            if rval['returncode'] != 0:
+                break
+
+        return rval
+
     def schedulable(self):
         '''oadm manage-node call for making nodes unschedulable'''
         nodes = self.config.config_options['node']['value']
@@ -182,12 +347,30 @@ class ManageNode(OpenShiftCLI):
                                     'dry_run': {'value': params['dry_run'], 'include': True},
                                     'force': {'value': params['force'], 'include': True},
                                     'grace_period': {'value': params['grace_period'], 'include': True},
+                                    'max_workers': {'value': params['max_workers'], 'include': False},
+                                    'list_pods_strategy': {'value': params['list_pods_strategy'],
+                                                           'include': False},
+                                    'batch_size': {'value': params['batch_size'], 'include': False},
+                                    'batch_timeout': {'value': params['batch_timeout'], 'include': False},
+                                    'batch_delay': {'value': params['batch_delay'], 'include': False},
                                    })
 
+        if params['batch_size'] is not None and params['batch_size'] < 1:
+            return {'failed': True, 'msg': 'batch_size must be at least 1, got %s' % params['batch_size']}
+
         oadm_mn = ManageNode(nconfig)
         # Run the oadm manage-node commands
         results = None
         changed = False
+        if params['batch_size'] and (params['schedulable'] != None or params['evacuate']):
+            if check_mode:
+                return {'changed': True, 'msg': 'CHECK_MODE: would have processed the nodes in batches.'}
+            results = oadm_mn.rolling()
+            if results['returncode'] != 0:
+                return {'failed': True, 'msg': results}
+
+            return {'changed': results.pop('changed'), 'results': results, 'state': "present"}
+
         if params['schedulable'] != None:
             if check_mode:
                 # schedulable returns results after the fact.
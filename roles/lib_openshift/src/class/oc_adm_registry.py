@@ -182,34 +182,36 @@ class Registry(OpenShiftCLI):
         if self.service:
             service.put('spec.selector', self.service.get_selector())
 
-        # need to create the service and the deploymentconfig
-        service_file = Utils.create_tmp_file_from_contents('service', service.yaml_dict)
-        deployment_file = Utils.create_tmp_file_from_contents('deploymentconfig', deploymentconfig.yaml_dict)
-
         return {"service": service,
-                "service_file": service_file,
                 "service_update": False,
                 "deployment": deploymentconfig,
-                "deployment_file": deployment_file,
                 "deployment_update": False}
 
     def create(self):
         '''Create a registry'''
-        results = []
         self.needs_update()
         # if the object is none, then we need to create it
         # if the object needs an update, then we should call replace
+        creates = []
+        replaces = []
         # Handle the deploymentconfig
         if self.deploymentconfig is None:
-            results.append(self._create(self.prepared_registry['deployment_file']))
+            creates.append(self.prepared_registry['deployment'].yaml_dict)
         elif self.prepared_registry['deployment_update']:
-            results.append(self._replace(self.prepared_registry['deployment_file']))
+            replaces.append(self.prepared_registry['deployment'].yaml_dict)
 
         # Handle the service
         if self.service is None:
-            results.append(self._create(self.prepared_registry['service_file']))
+            creates.append(self.prepared_registry['service'].yaml_dict)
         elif self.prepared_registry['service_update']:
-            results.append(self._replace(self.prepared_registry['service_file']))
+            replaces.append(self.prepared_registry['service'].yaml_dict)
+
+        # submit each group in a single call
+        results = []
+        if creates:
+            results.append(self._create_list(creates))
+        if replaces:
+            results.append(self._replace_list(replaces))
 
         # Clean up returned results
         rval = 0
@@ -231,11 +233,15 @@ class Registry(OpenShiftCLI):
             if portip:
                 self.portal_ip = portip
 
-        results = []
+        replaces = []
         if self.prepared_registry['deployment_update']:
-            results.append(self._replace(self.prepared_registry['deployment_file']))
+            replaces.append(self.prepared_registry['deployment'].yaml_dict)
         if self.prepared_registry['service_update']:
-            results.append(self._replace(self.prepared_registry['service_file']))
+            replaces.append(self.prepared_registry['service'].yaml_dict)
+
+        results = []
+        if replaces:
+            results.append(self._replace_list(replaces))
 
         # Clean up returned results
         rval = 0
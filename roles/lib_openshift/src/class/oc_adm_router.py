@@ -234,11 +234,11 @@ class Router(OpenShiftCLI):
         if results['returncode'] != 0 or 'items' not in results['results']:
             return results
 
-        oc_objects = {'DeploymentConfig': {'obj': None, 'path': None, 'update': False},
-                      'Secret': {'obj': None, 'path': None, 'update': False},
-                      'ServiceAccount': {'obj': None, 'path': None, 'update': False},
-                      'ClusterRoleBinding': {'obj': None, 'path': None, 'update': False},
-                      'Service': {'obj': None, 'path': None, 'update': False},
+        oc_objects = {'DeploymentConfig': {'obj': None, 'update': False},
+                      'Secret': {'obj': None, 'update': False},
+                      'ServiceAccount': {'obj': None, 'update': False},
+                      'ClusterRoleBinding': {'obj': None, 'update': False},
+                      'Service': {'obj': None, 'update': False},
                      }
         # pylint: disable=invalid-sequence-index
         for res in results['results']['items']:
@@ -261,10 +261,6 @@ class Router(OpenShiftCLI):
         # add modifications added
         oc_objects['DeploymentConfig']['obj'] = self.add_modifications(oc_objects['DeploymentConfig']['obj'])
 
-        for oc_type, oc_data in oc_objects.items():
-            if oc_data['obj'] is not None:
-                oc_data['path'] = Utils.create_tmp_file_from_contents(oc_type, oc_data['obj'].yaml_dict)
-
         return oc_objects
 
     def create(self):
@@ -277,20 +273,25 @@ class Router(OpenShiftCLI):
            - secrets
            - clusterrolebinding
         '''
-        results = []
         self.needs_update()
 
-        import time
+        # submit every missing part in one call and every changed part in another
+        creates = []
+        replaces = []
         # pylint: disable=maybe-no-member
         for kind, oc_data in self.prepared_router.items():
             if oc_data['obj'] is not None:
-                time.sleep(1)
                 if self.get_object_by_kind(kind) is None:
-                    results.append(self._create(oc_data['path']))
+                    creates.append(oc_data['obj'].yaml_dict)
 
                 elif oc_data['update']:
-                    results.append(self._replace(oc_data['path']))
+                    replaces.append(oc_data['obj'].yaml_dict)
 
+        results = []
+        if creates:
+            results.append(self._create_list(creates))
+        if replaces:
+            results.append(self._replace_list(replaces))
 
         rval = 0
         for result in results:
@@ -301,12 +302,12 @@ class Router(OpenShiftCLI):
 
     def update(self):
         '''run update for the router.  This performs a replace'''
-        results = []
-
         # pylint: disable=maybe-no-member
-        for _, oc_data in self.prepared_router.items():
-            if oc_data['update']:
-                results.append(self._replace(oc_data['path']))
+        replaces = [oc_data['obj'].yaml_dict for oc_data in self.prepared_router.values() if oc_data['update']]
+
+        results = []
+        if replaces:
+            results.append(self._replace_list(replaces))
 
         rval = 0
         for result in results:
@@ -11,6 +11,12 @@ class OCEnv(OpenShiftCLI):
                       "rc":  "spec.template.spec.containers[0].env",
                      }
 
+    # the same paths as JSON pointers for oc patch
+    container_pointer = {"pod": "/spec/containers/0/env",
+                         "dc":  "/spec/template/spec/containers/0/env",
+                         "rc":  "/spec/template/spec/containers/0/env",
+                        }
+
     # pylint allows 5. we need 6
     # pylint: disable=too-many-arguments
     def __init__(self,
@@ -56,10 +62,17 @@ class OCEnv(OpenShiftCLI):
                 result['results'] = self.resource.get(OCEnv.container_path[self.kind]) or []
         return result
 
+    def patch_env(self):
+        ''' send the container environment, and nothing else, to the server '''
+        return self._patch(self.kind, self.name,
+                           [{'op': 'add',
+                             'path': OCEnv.container_pointer[self.kind],
+                             'value': self.resource.get(OCEnv.container_path[self.kind]) or []}])
+
     def delete(self):
         ''' delete environment variables '''
         if self.resource.delete_env_var(self.env_vars.keys()):
-            return self._replace_content(self.kind, self.name, self.resource.yaml_dict)
+            return self.patch_env()
 
         return {'returncode': 0, 'changed': False}
 
@@ -68,7 +81,7 @@ class OCEnv(OpenShiftCLI):
         for update_key, update_value in self.env_vars.items():
             self.resource.update_env_var(update_key, update_value)
 
-        return self._replace_content(self.kind, self.name, self.resource.yaml_dict)
+        return self.patch_env()
 
     # pylint: disable=too-many-return-statements
     @staticmethod
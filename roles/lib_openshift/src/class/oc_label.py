@@ -108,8 +108,20 @@ class OCLabel(OpenShiftCLI):
 
         return False
 
+    def patch_labels(self, remove=None):
+        ''' merge the user labels into a single named object, dropping the
+            keys in remove '''
+        labels = dict((key, None) for key in remove or [])
+        for label in self.labels:
+            labels[label['key']] = "{}".format(label['value'])
+
+        return self._patch(self.kind, self.name, {'metadata': {'labels': labels}}, patch_type='merge')
+
     def replace(self):
         ''' replace currently stored labels with user provided labels '''
+        if self.name and not self.selector:
+            return self.patch_labels(remove=self.get_extra_current_labels())
+
         cmd = self.cmd_template()
 
         # First delete any extra labels
@@ -171,6 +183,9 @@ class OCLabel(OpenShiftCLI):
 
     def add(self):
         ''' add labels '''
+        if self.name and not self.selector:
+            return self.patch_labels()
+
         cmd = self.cmd_template()
 
         for label in self.labels:
@@ -19,6 +19,73 @@ class OCObjectValidator(OpenShiftCLI):
 
         return True, rval, list(filter(invalid_filter, rval['results'][0]['items']))  # wrap filter with list for py3
 
+    @staticmethod
+    def iter_items(data):
+        ''' yield the items of a JSON list one at a time
+
+            data is the whole JSON text; the items are decoded from it one
+            by one, so the decoded list is never held as a whole.
+        '''
+        decoder = json.JSONDecoder()
+        space = re.compile(r'[\s,]*')
+
+        idx = space.match(data).end()
+        if data[idx:idx + 1] != '{':
+            raise ValueError('Expected a JSON object')
+        idx += 1
+
+        while True:
+            idx = space.match(data, idx).end()
+            if data[idx] == '}':
+                return
+            key, idx = decoder.raw_decode(data, idx)
+            idx = space.match(data, idx).end()
+            if data[idx] != ':':
+                raise ValueError('Expected : at %s' % idx)
+            idx = space.match(data, idx + 1).end()
+
+            if key != 'items':
+                _, idx = decoder.raw_decode(data, idx)
+                continue
+
+            if data[idx] != '[':
+                raise ValueError('Expected a list of items at %s' % idx)
+            idx += 1
+            while True:
+                idx = space.match(data, idx).end()
+                if data[idx] == ']':
+                    idx += 1
+                    break
+                item, idx = decoder.raw_decode(data, idx)
+                yield item
+
+    def stream_invalid(self, kind, invalid_filter):
+        ''' return invalid object information, filtering the items as they are decoded
+
+            Only the invalid items are kept, not the decoded list.  Also
+            returns how long the fetch and the parse took.
+        '''
+        start = time.time()
+        rval = self.openshift_cmd(['get', kind, '-o', 'json'], output=True, output_type='raw')
+        timing = {'fetch': round(time.time() - start, 3)}
+        if rval['returncode'] != 0:
+            return False, rval, [], timing
+
+        start = time.time()
+        count = 0
+        invalid = []
+        try:
+            for item in OCObjectValidator.iter_items(rval['results']):
+                count += 1
+                if invalid_filter(item):
+                    invalid.append(item)
+        except (ValueError, IndexError) as err:
+            rval.update({'returncode': 1, 'results': {}, 'stderr': 'Invalid JSON list: {}'.format(err)})
+            return False, rval, [], timing
+
+        timing.update({'parse': round(time.time() - start, 3), 'items': count})
+        return True, rval, invalid, timing
+
     # pylint: disable=too-many-return-statements
     @staticmethod
     def run_ansible(params):
@@ -63,8 +130,12 @@ class OCObjectValidator(OpenShiftCLI):
             ),
         )
 
+        timing = {} if params.get('bulk') else None
         for resource, invalid_filter, invalid_msg in checks:
-            success, rval, invalid = objectvalidator.get_invalid(resource, invalid_filter)
+            if timing is None:
+                success, rval, invalid = objectvalidator.get_invalid(resource, invalid_filter)
+            else:
+                success, rval, invalid, timing[resource] = objectvalidator.stream_invalid(resource, invalid_filter)
             if not success:
                 return {'failed': True, 'msg': 'Failed to GET {}.'.format(resource), 'state': 'list', 'results': rval}
             if invalid:
@@ -72,7 +143,7 @@ class OCObjectValidator(OpenShiftCLI):
                 all_invalid[invalid_msg] = invalid
 
         if failed:
-            return {
+            rval = {
                 'failed': True,
                 'msg': (
                     "All objects are not valid.  If you are a supported customer please contact "
@@ -82,5 +153,9 @@ class OCObjectValidator(OpenShiftCLI):
                 'state': 'list',
                 'results': all_invalid
                 }
+        else:
+            rval = {'msg': 'All objects are valid.'}
 
-        return {'msg': 'All objects are valid.'}
+        if timing is not None:
+            rval['timing'] = timing
+        return rval
@@ -53,7 +53,7 @@ class OCScale(OpenShiftCLI):
     def put(self):
         '''update replicas into dc '''
         self.resource.update_replicas(self.replicas)
-        return self._replace_content(self.kind, self.name, self.resource.yaml_dict)
+        return self._patch(self.kind, self.name, {'spec': {'replicas': self.replicas}}, patch_type='merge')
 
     def needs_update(self):
         ''' verify whether an update is needed '''
@@ -4,13 +4,33 @@
 '''
 
 import argparse
+import ast
+import hashlib
+import json
+import multiprocessing
 import os
 import yaml
 import six
 
 OPENSHIFT_ANSIBLE_PATH = os.path.dirname(os.path.realpath(__file__))
 OPENSHIFT_ANSIBLE_SOURCES_PATH = os.path.join(OPENSHIFT_ANSIBLE_PATH, 'sources.yml')  # noqa: E501
+ROLE_PATH = os.path.normpath(os.path.join(OPENSHIFT_ANSIBLE_PATH, '..'))
 LIBRARY = os.path.join(OPENSHIFT_ANSIBLE_PATH, '..', 'library/')
+# The fragment digests every generated file was last built from
+MANIFEST = os.path.join(OPENSHIFT_ANSIBLE_PATH, 'manifest.json')
+MODULE_UTILS = os.path.join(OPENSHIFT_ANSIBLE_PATH, '..', 'module_utils/')
+# The shared code is importable as ansible.module_utils.<role name>
+MODULE_UTILS_NAME = os.path.basename(os.path.dirname(OPENSHIFT_ANSIBLE_PATH))
+MODULE_UTILS_FRAGMENT = 'module_utils/{}.py'.format(MODULE_UTILS_NAME)
+MODULE_UTILS_FILE = os.path.join(MODULE_UTILS, MODULE_UTILS_NAME + '.py')
+MODULE_UTILS_HEADER = ['doc/generated', 'doc/license']
+MODULE_UTILS_IMPORT = '''# pylint: disable=wildcard-import,unused-wildcard-import
+from ansible.module_utils.{} import *  # noqa: F401,F403
+'''.format(MODULE_UTILS_NAME)
+MODULE_UTILS_EXPORTS = '''
+# every name, private helpers included, is imported into the modules
+__all__ = [{}]
+'''
 
 
 class GenerateAnsibleException(Exception):
@@ -23,6 +43,10 @@ def parse_args():
     parser = argparse.ArgumentParser(description="Generate ansible modules.")
     parser.add_argument('--verify', action='store_true', default=False,
                         help='Verify library code matches the generated code.')
+    parser.add_argument('--force', action='store_true', default=False,
+                        help='Regenerate or verify every module regardless of the manifest.')
+    parser.add_argument('--module-utils', action='store_true', default=False,
+                        help='Generate thin modules importing the shared code from {}.'.format(MODULE_UTILS_FRAGMENT))
 
     return parser.parse_args()
 
@@ -57,14 +81,71 @@ def fragment_banner(fragment_path, side, data):
     return banner
 
 
-def generate(parts):
+def shared(fpart):
+    '''return whether a fragment is library code modules can share'''
+    return fpart.startswith('lib/') or fpart.startswith('../')
+
+
+def module_utils_parts(sources):
+    '''return the fragments of the shared module_utils file
+
+    Library fragments only one module uses stay inlined in that module, so
+    its private helpers remain module attributes.
+
+:param dict sources: The modules mapped to their fragments
+    '''
+    parts = list(MODULE_UTILS_HEADER)
+    # keep the order in which the modules list the library fragments
+    for fname in sorted(sources):
+        parts.extend([fpart for fpart in sources[fname]
+                      if shared(fpart) and fpart not in parts and
+                      len([name for name in sources if fpart in sources[name]]) > 1])
+    return parts
+
+
+def exported_names(source):
+    '''return every top level name a module defines or imports
+
+:param string source: The python source of the module
+    '''
+    names = []
+    nodes = list(ast.parse(source).body)
+    while nodes:
+        node = nodes.pop(0)
+        if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            names.append(node.name)
+        elif isinstance(node, ast.Assign):
+            names.extend([target.id for target in node.targets if isinstance(target, ast.Name)])
+        elif isinstance(node, ast.Import):
+            names.extend([alias.asname or alias.name.split('.')[0] for alias in node.names])
+        elif isinstance(node, ast.ImportFrom) and node.module != '__future__':
+            names.extend([alias.asname or alias.name for alias in node.names])
+        else:
+            # imports guarded by try or if blocks
+            for field in ['body', 'handlers', 'orelse', 'finalbody']:
+                nodes[0:0] = getattr(node, field, [])
+
+    return sorted(set(names) - set(['*']))
+
+
+def generate(parts, module_utils=None):
     '''generate the source code for the ansible modules
 
 :param Array parts: An array of paths (strings) to module fragments
+:param Array module_utils: The fragments to import from module_utils instead of inlining
     '''
 
     data = six.StringIO()
+    imported = False
     for fpart in parts:
+        if module_utils and fpart in module_utils:
+            if not imported:
+                fragment_banner(MODULE_UTILS_FRAGMENT, "header", data)
+                data.write(MODULE_UTILS_IMPORT)
+                fragment_banner(MODULE_UTILS_FRAGMENT, "footer", data)
+                imported = True
+            continue
+
         # first line is pylint disable so skip it
         with open(os.path.join(OPENSHIFT_ANSIBLE_PATH, fpart)) as pfd:
             fragment_banner(fpart, "header", data)
@@ -83,12 +164,123 @@ def get_sources():
     return yaml.load(open(OPENSHIFT_ANSIBLE_SOURCES_PATH).read())
 
 
-def verify():
-    '''verify if the generated code matches the library code'''
-    for fname, parts in get_sources().items():
-        data = generate(parts)
-        fname = os.path.join(LIBRARY, fname)
-        if not open(fname).read() == data.getvalue():
+def get_targets(module_utils=False):
+    '''return the generated files mapped to how they are built
+
+:param bool module_utils: Generate thin modules and the shared module_utils file
+    '''
+    sources = get_sources()
+    utils_parts = module_utils_parts(sources) if module_utils else []
+    targets = {}
+    for fname, parts in sources.items():
+        targets[os.path.join(LIBRARY, fname)] = (parts, [fpart for fpart in parts if fpart in utils_parts] or False)
+
+    if module_utils:
+        targets[MODULE_UTILS_FILE] = (utils_parts, False)
+
+    return targets
+
+
+def digest(path):
+    '''return the sha256 of a file'''
+    with open(path, 'rb') as dfd:
+        return hashlib.sha256(dfd.read()).hexdigest()
+
+
+def get_manifest():
+    '''return the manifest of the last generation, empty when there is none'''
+    if not os.path.exists(MANIFEST):
+        return {}
+    with open(MANIFEST) as mfd:
+        return json.load(mfd)
+
+
+def manifest_entry(target, digests):
+    '''return what the manifest records about a generated file
+
+:param tuple target: The fragments and layout of the file
+:param dict digests: Fragment digests computed so far, filled in as needed
+    '''
+    parts, module_utils = target
+    if 'generate.py' not in digests:
+        digests['generate.py'] = digest(os.path.realpath(__file__))
+
+    fragments = []
+    for fpart in parts:
+        if fpart not in digests:
+            digests[fpart] = digest(os.path.join(OPENSHIFT_ANSIBLE_PATH, fpart))
+        fragments.append('%s  %s' % (digests[fpart], fpart))
+
+    return {'generator': digests['generate.py'], 'module_utils': module_utils, 'fragments': fragments}
+
+
+def stale_targets(targets, manifest, digests):
+    '''return the targets whose fragments or output changed since the manifest was written
+
+:param dict targets: The generated files mapped to how they are built
+:param dict manifest: The manifest of the last generation
+:param dict digests: Fragment digests computed so far, filled in as needed
+    '''
+    stale = {}
+    for fname, target in targets.items():
+        recorded = manifest.get(os.path.relpath(fname, ROLE_PATH))
+        if recorded is None or not os.path.exists(fname):
+            stale[fname] = target
+            continue
+
+        entry = manifest_entry(target, digests)
+        if any([recorded.get(key) != value for key, value in entry.items()]) or \
+           recorded.get('sha256') != digest(fname):
+            stale[fname] = target
+
+    return stale
+
+
+def render(job):
+    '''return a generated file and its content; run by the generation workers'''
+    fname, (parts, module_utils) = job
+    content = generate(parts, module_utils).getvalue()
+    if fname == MODULE_UTILS_FILE:
+        names = ''.join(["\n    '%s'," % name for name in exported_names(content)])
+        content += MODULE_UTILS_EXPORTS.format(names + '\n')
+    return fname, content
+
+
+def generate_files(targets):
+    '''return the given targets mapped to their generated content
+
+    Modules are independent of each other, so several are generated at once
+    in a pool of processes.
+    '''
+    jobs = sorted(targets.items())
+    if len(jobs) < 2:
+        return dict([render(job) for job in jobs])
+
+    pool = multiprocessing.Pool(min(len(jobs), multiprocessing.cpu_count()))
+    try:
+        return dict(pool.map(render, jobs))
+    finally:
+        pool.close()
+        pool.join()
+
+
+def verify(module_utils=None, force=False):
+    '''verify if the generated code matches the library code
+
+    Files the manifest shows unchanged since their generation are not generated again.
+
+:param bool module_utils: The layout to verify, by default the one on disk
+:param bool force: Generate and compare every file
+    '''
+    if module_utils is None:
+        module_utils = os.path.exists(MODULE_UTILS_FILE)
+
+    targets = get_targets(module_utils)
+    if not force:
+        targets = stale_targets(targets, get_manifest(), {})
+
+    for fname, content in generate_files(targets).items():
+        if not os.path.exists(fname) or not open(fname).read() == content:
             raise GenerateAnsibleException('Generated content does not match for %s' % fname)
 
 
@@ -96,14 +288,35 @@ def main():
     ''' combine the necessary files to create the ansible module '''
     args = parse_args()
     if args.verify:
-        verify()
+        verify(args.module_utils or None, args.force)
+        return
+
+    targets = get_targets(args.module_utils)
+    manifest = {} if args.force else get_manifest()
+    digests = {}
+    files = generate_files(stale_targets(targets, manifest, digests))
+    if args.module_utils and not os.path.isdir(MODULE_UTILS):
+        os.makedirs(MODULE_UTILS)
 
-    for fname, parts in get_sources().items():
-        data = generate(parts)
-        fname = os.path.join(LIBRARY, fname)
+    for fname, content in files.items():
         with open(fname, 'w') as afd:
             afd.seek(0)
-            afd.write(data.getvalue())
+            afd.write(content)
+
+    # the inlined modules no longer use a previously generated module_utils
+    if not args.module_utils and os.path.exists(MODULE_UTILS_FILE):
+        os.remove(MODULE_UTILS_FILE)
+
+    updated = {}
+    for fname, target in targets.items():
+        entry = manifest_entry(target, digests)
+        entry['sha256'] = digest(fname)
+        updated[os.path.relpath(fname, ROLE_PATH)] = entry
+
+    if updated != manifest:
+        with open(MANIFEST, 'w') as mfd:
+            json.dump(updated, mfd, indent=2, sort_keys=True, separators=(',', ': '))
+            mfd.write('\n')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,97 @@
+'''
+ Unit tests for ObjectDiff
+'''
+
+import os
+import sys
+import unittest
+
+# Removing invalid variable names for tests so that I can
+# keep them brief
+# pylint: disable=invalid-name,no-name-in-module
+# Disable import-error b/c our libraries aren't loaded in jenkins
+# pylint: disable=import-error,wrong-import-position
+# place class in our python path
+module_path = os.path.join('/'.join(os.path.realpath(__file__).split('/')[:-4]), 'library')  # noqa: E501
+sys.path.insert(0, module_path)
+from oc_obj import ObjectDiff, Utils  # noqa: E402
+
+
+class ObjectDiffTest(unittest.TestCase):
+    '''
+     Test class for ObjectDiff
+    '''
+
+    def setUp(self):
+        ''' a service as the API server returns it '''
+        self.current = {'kind': 'Service',
+                        'metadata': {'name': 'router', 'resourceVersion': '42'},
+                        'spec': {'clusterIP': '172.30.0.1',
+                                 'selector': {'router': 'router'},
+                                 'ports': [{'name': '80-tcp', 'port': 80},
+                                           {'name': '443-tcp', 'port': 443},
+                                           {'name': '1936-tcp', 'port': 1936}]},
+                        'status': {}}
+
+    def test_no_changes(self):
+        ''' Testing that equal objects produce no changes '''
+        self.assertEqual(ObjectDiff().diff(self.current, self.current), [])
+
+    def test_changes(self):
+        ''' Testing replace, add and remove operations '''
+        desired = {'kind': 'Service',
+                   'metadata': {'name': 'router', 'resourceVersion': '42', 'labels': {'a/b': 'c'}},
+                   'spec': {'clusterIP': '172.30.0.2',
+                            'ports': [{'name': '80-tcp', 'port': 8080},
+                                      {'name': '1936-tcp', 'port': 1936},
+                                      {'name': '8443-tcp', 'port': 8443}]},
+                   'status': {}}
+
+        self.assertEqual(ObjectDiff().diff(self.current, desired),
+                         [{'op': 'add', 'path': '/metadata/labels', 'value': {'a/b': 'c'}},
+                          {'op': 'replace', 'path': '/spec/clusterIP', 'value': '172.30.0.2'},
+                          {'op': 'remove', 'path': '/spec/selector'},
+                          {'op': 'replace', 'path': '/spec/ports/0/port', 'value': 8080},
+                          {'op': 'remove', 'path': '/spec/ports/1'},
+                          {'op': 'add', 'path': '/spec/ports/-', 'value': {'name': '8443-tcp', 'port': 8443}}])
+
+        self.assertEqual(ObjectDiff(skip_keys=['metadata', 'spec']).diff(self.current, desired), [])
+
+    def test_reordered_list(self):
+        ''' Testing that reordered named items replace the whole list '''
+        desired = {'spec': {'ports': list(reversed(self.current['spec']['ports']))}}
+        current = {'spec': {'ports': self.current['spec']['ports']}}
+
+        for strict in [True, False]:
+            self.assertEqual(ObjectDiff(strict=strict).diff(current, desired),
+                             [{'op': 'replace', 'path': '/spec/ports', 'value': desired['spec']['ports']}])
+
+    def test_check_def_equal(self):
+        ''' Testing that user definitions may leave out top level keys '''
+        user_def = {'kind': 'Service',
+                    'apiVersion': 'v1',
+                    'metadata': {'name': 'router'},
+                    'spec': {'clusterIP': '172.30.0.1',
+                             'selector': {'router': 'router'},
+                             'ports': [{'name': '80-tcp', 'port': 80},
+                                       {'name': '443-tcp', 'port': 443},
+                                       {'name': '1936-tcp', 'port': 1936, 'protocol': 'TCP'}]}}
+
+        self.assertTrue(Utils.check_def_equal(user_def, self.current))
+
+        user_def['spec']['selector']['extra'] = 'label'
+        self.assertFalse(Utils.check_def_equal(user_def, self.current))
+        self.assertTrue(Utils.check_def_equal(user_def, self.current, skip_keys=['selector']))
+
+    def test_check_def_equal_env_order(self):
+        ''' Testing that a reordered env list is a change, since $(VAR) expands in order '''
+        env = [{'name': 'HOST', 'value': 'router'},
+               {'name': 'URL', 'value': 'https://$(HOST):443'}]
+        current = {'kind': 'DeploymentConfig',
+                   'spec': {'template': {'spec': {'containers': [{'name': 'router', 'env': env}]}}}}
+        user_def = {'kind': 'DeploymentConfig',
+                    'spec': {'template': {'spec': {'containers': [{'name': 'router',
+                                                                   'env': list(reversed(env))}]}}}}
+
+        self.assertTrue(Utils.check_def_equal(current, current))
+        self.assertFalse(Utils.check_def_equal(user_def, current))
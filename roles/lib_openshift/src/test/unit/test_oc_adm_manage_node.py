@@ -5,6 +5,7 @@
 import os
 import six
 import sys
+import threading
 import unittest
 import mock
 
@@ -37,7 +38,12 @@ class ManageNodeTest(unittest.TestCase):
                   'evacuate': False,
                   'grace_period': False,
                   'dry_run': False,
-                  'force': False}
+                  'force': False,
+                  'max_workers': 1,
+                  'list_pods_strategy': 'per_node',
+                  'batch_size': None,
+                  'batch_timeout': None,
+                  'batch_delay': 0}
 
         pod_list = '''{
     "metadata": {},
@@ -120,7 +126,12 @@ class ManageNodeTest(unittest.TestCase):
                   'evacuate': False,
                   'grace_period': False,
                   'dry_run': False,
-                  'force': False}
+                  'force': False,
+                  'max_workers': 1,
+                  'list_pods_strategy': 'per_node',
+                  'batch_size': None,
+                  'batch_timeout': None,
+                  'batch_delay': 0}
 
         node = [{
             "apiVersion": "v1",
@@ -168,6 +179,241 @@ class ManageNodeTest(unittest.TestCase):
         self.assertEqual(results['results']['nodes'][0]['name'], 'ip-172-31-49-140.ec2.internal')
         self.assertEqual(results['results']['nodes'][0]['schedulable'], False)
 
+    @mock.patch('oc_adm_manage_node.Utils.create_tmpfile_copy')
+    @mock.patch('oc_adm_manage_node.ManageNode._list_pods')
+    def test_list_pods_concurrently(self, mock_list_pods, mock_tmpfile_copy):
+        ''' Testing a concurrent list of pods across nodes '''
+        params = {'node': ['node-1', 'node-2', 'node-3'],
+                  'schedulable': None,
+                  'selector': None,
+                  'pod_selector': None,
+                  'list_pods': True,
+                  'kubeconfig': '/etc/origin/master/admin.kubeconfig',
+                  'evacuate': False,
+                  'grace_period': False,
+                  'dry_run': False,
+                  'force': False,
+                  'max_workers': 4,
+                  'list_pods_strategy': 'per_node',
+                  'batch_size': None,
+                  'batch_timeout': None,
+                  'batch_delay': 0}
+
+        failing = []
+
+        def list_pods(node=None, selector=None, pod_selector=None):
+            ''' one pod per node, named after it '''
+            if node[0] in failing:
+                return {'returncode': 1, 'results': '', 'stderr': '%s failed' % node[0]}
+            return {'returncode': 0,
+                    'results': '{"items": [{"metadata": {"name": "%s-pod"}}]}' % node[0]}
+
+        mock_list_pods.side_effect = list_pods
+        mock_tmpfile_copy.return_value = '/tmp/mocked_kubeconfig'
+
+        results = ManageNode.run_ansible(params, False)
+
+        self.assertEqual(mock_list_pods.call_count, 3)
+        self.assertEqual(sorted(results['results']['nodes'].keys()), ['node-1', 'node-2', 'node-3'])
+        self.assertEqual(results['results']['nodes']['node-2'][0]['metadata']['name'], 'node-2-pod')
+
+        # the first failing node in node order is reported
+        failing.extend(['node-3', 'node-2'])
+        params['node'] = ['node-1', 'node-3', 'node-2']
+        results = ManageNode.run_ansible(params, False)
+
+        self.assertTrue(results['failed'])
+        self.assertEqual(results['msg']['stderr'], 'node-3 failed')
+
+    @mock.patch('oc_adm_manage_node.Utils.create_tmpfile_copy')
+    @mock.patch('oc_adm_manage_node.ManageNode.openshift_cmd')
+    def test_list_pods_grouped(self, mock_openshift_cmd, mock_tmpfile_copy):
+        ''' Testing a single pod list grouped by node '''
+        params = {'node': ['node-1', 'node-2'],
+                  'schedulable': None,
+                  'selector': None,
+                  'pod_selector': 'router=router',
+                  'list_pods': True,
+                  'kubeconfig': '/etc/origin/master/admin.kubeconfig',
+                  'evacuate': False,
+                  'grace_period': False,
+                  'dry_run': False,
+                  'force': False,
+                  'max_workers': 1,
+                  'list_pods_strategy': 'grouped',
+                  'batch_size': None,
+                  'batch_timeout': None,
+                  'batch_delay': 0}
+
+        mock_openshift_cmd.side_effect = [
+            {"cmd": "oc get pods --all-namespaces --selector=router=router -o json",
+             "results": {"items": [{"metadata": {"name": "router-1"}, "spec": {"nodeName": "node-1"}},
+                                   {"metadata": {"name": "router-2"}, "spec": {"nodeName": "node-3"}},
+                                   {"metadata": {"name": "router-3"}, "spec": {"nodeName": "node-1"}}]},
+             "returncode": 0}
+        ]
+
+        mock_tmpfile_copy.return_value = '/tmp/mocked_kubeconfig'
+
+        results = ManageNode.run_ansible(params, False)
+
+        mock_openshift_cmd.assert_called_once_with(['get', 'pods', '--all-namespaces',
+                                                    '--selector=router=router', '-o', 'json'],
+                                                   output=True)
+        self.assertEqual([pod['metadata']['name'] for pod in results['results']['nodes']['node-1']],
+                         ['router-1', 'router-3'])
+        self.assertEqual(results['results']['nodes']['node-2'], [])
+
+    @mock.patch('oc_adm_manage_node.Utils.create_tmpfile_copy')
+    @mock.patch('oc_adm_manage_node.ManageNode._evacuate')
+    @mock.patch('oc_adm_manage_node.ManageNode._schedulable')
+    @mock.patch('oc_adm_manage_node.ManageNode.get_nodes')
+    def test_rolling_drain(self, mock_get_nodes, mock_schedulable, mock_evacuate, mock_tmpfile_copy):
+        ''' Testing a drain of nodes in batches '''
+        params = {'node': None,
+                  'schedulable': False,
+                  'selector': 'type=compute',
+                  'pod_selector': None,
+                  'list_pods': False,
+                  'kubeconfig': '/etc/origin/master/admin.kubeconfig',
+                  'evacuate': True,
+                  'grace_period': None,
+                  'dry_run': False,
+                  'force': False,
+                  'max_workers': 2,
+                  'list_pods_strategy': 'per_node',
+                  'batch_size': 2,
+                  'batch_timeout': None,
+                  'batch_delay': 0}
+
+        mock_get_nodes.return_value = [{'name': 'node-1', 'schedulable': True},
+                                       {'name': 'node-2', 'schedulable': False},
+                                       {'name': 'node-3', 'schedulable': True},
+                                       {'name': 'node-4', 'schedulable': True},
+                                       {'name': 'node-5', 'schedulable': True}]
+        mock_schedulable.return_value = {'returncode': 0, 'results': ''}
+        failing = []
+
+        def evacuate(node=None, **_):
+            ''' fail the evacuation of the nodes in failing '''
+            if node[0] in failing:
+                return {'returncode': 1, 'results': '', 'stderr': '%s failed' % node[0]}
+            return {'returncode': 0, 'results': ''}
+
+        mock_evacuate.side_effect = evacuate
+        mock_tmpfile_copy.return_value = '/tmp/mocked_kubeconfig'
+
+        results = ManageNode.run_ansible(params, False)
+
+        self.assertTrue(results['changed'])
+        self.assertEqual(results['results']['batches'], 3)
+        self.assertEqual([node['name'] for node in results['results']['nodes']],
+                         ['node-1', 'node-2', 'node-3', 'node-4', 'node-5'])
+        # node-2 was already unschedulable
+        self.assertEqual(sorted(call[1]['node'][0] for call in mock_schedulable.call_args_list),
+                         ['node-1', 'node-3', 'node-4', 'node-5'])
+        self.assertNotIn('schedulable', results['results']['nodes'][1])
+        self.assertEqual(mock_evacuate.call_count, 5)
+        self.assertTrue(all('elapsed' in node for node in results['results']['nodes']))
+
+        # a failing batch stops the run
+        failing.append('node-3')
+        mock_evacuate.reset_mock()
+        results = ManageNode.run_ansible(params, False)
+
+        self.assertTrue(results['failed'])
+        self.assertEqual(results['msg']['batches'], 2)
+        self.assertEqual(results['msg']['nodes'][2]['evacuate']['stderr'], 'node-3 failed')
+        self.assertEqual(mock_evacuate.call_count, 4)
+
+    @mock.patch('oc_adm_manage_node.Utils.create_tmpfile_copy')
+    @mock.patch('oc_adm_manage_node.ManageNode._schedulable')
+    @mock.patch('oc_adm_manage_node.ManageNode.get_nodes')
+    def test_rolling_batch_timeout(self, mock_get_nodes, mock_schedulable, mock_tmpfile_copy):
+        ''' Testing that a batch which takes too long fails the run '''
+        params = {'node': ['node-1', 'node-2'],
+                  'schedulable': True,
+                  'selector': None,
+                  'pod_selector': None,
+                  'list_pods': False,
+                  'kubeconfig': '/etc/origin/master/admin.kubeconfig',
+                  'evacuate': False,
+                  'grace_period': None,
+                  'dry_run': False,
+                  'force': False,
+                  'max_workers': 2,
+                  'list_pods_strategy': 'per_node',
+                  'batch_size': 2,
+                  'batch_timeout': 1,
+                  'batch_delay': 0}
+
+        mock_get_nodes.side_effect = lambda name, selector=None: [{'name': name, 'schedulable': False}]
+        release = threading.Event()
+
+        def schedulable(node=None, **_):
+            ''' hang on node-2 '''
+            if node[0] == 'node-2':
+                release.wait(5)
+            return {'returncode': 0, 'results': ''}
+
+        mock_schedulable.side_effect = schedulable
+        mock_tmpfile_copy.return_value = '/tmp/mocked_kubeconfig'
+
+        results = ManageNode.run_ansible(params, False)
+        release.set()
+
+        self.assertTrue(results['failed'])
+        self.assertEqual(results['msg']['nodes'][0]['returncode'], 0)
+        self.assertEqual(results['msg']['nodes'][1], {'name': 'node-2', 'returncode': 1,
+                                                      'msg': 'Timed out after 1 seconds'})
+
+    @mock.patch('oc_adm_manage_node.Utils.create_tmpfile_copy')
+    @mock.patch('oc_adm_manage_node.ManageNode._schedulable')
+    @mock.patch('oc_adm_manage_node.ManageNode.get_nodes')
+    def test_rolling_worker_errors(self, mock_get_nodes, mock_schedulable, mock_tmpfile_copy):
+        ''' Testing that a node whose worker raised reports the error, and that batch_size is validated '''
+        params = {'node': ['node-1', 'node-2'],
+                  'schedulable': True,
+                  'selector': None,
+                  'pod_selector': None,
+                  'list_pods': False,
+                  'kubeconfig': '/etc/origin/master/admin.kubeconfig',
+                  'evacuate': False,
+                  'grace_period': None,
+                  'dry_run': False,
+                  'force': False,
+                  'max_workers': 2,
+                  'list_pods_strategy': 'per_node',
+                  'batch_size': 2,
+                  'batch_timeout': 5,
+                  'batch_delay': 0}
+
+        mock_get_nodes.side_effect = lambda name, selector=None: [{'name': name, 'schedulable': False}]
+
+        def schedulable(node=None, **_):
+            ''' blow up on node-2 '''
+            if node[0] == 'node-2':
+                raise ValueError('No JSON object could be decoded')
+            return {'returncode': 0, 'results': ''}
+
+        mock_schedulable.side_effect = schedulable
+        mock_tmpfile_copy.return_value = '/tmp/mocked_kubeconfig'
+
+        results = ManageNode.run_ansible(params, False)
+
+        self.assertTrue(results['failed'])
+        self.assertEqual(results['msg']['nodes'][0]['returncode'], 0)
+        self.assertEqual(results['msg']['nodes'][1]['returncode'], 1)
+        self.assertEqual(results['msg']['nodes'][1]['msg'], 'Failed: No JSON object could be decoded')
+
+        for batch_size in [0, -1]:
+            mock_schedulable.reset_mock()
+            params['batch_size'] = batch_size
+            results = ManageNode.run_ansible(params, False)
+            self.assertTrue(results['failed'])
+            self.assertIn('batch_size must be at least 1', results['msg'])
+            mock_schedulable.assert_not_called()
+
     @unittest.skipIf(six.PY3, 'py2 test only')
     @mock.patch('os.path.exists')
     @mock.patch('os.environ.get')
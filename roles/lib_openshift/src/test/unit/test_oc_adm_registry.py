@@ -237,7 +237,6 @@ class RegistryTest(unittest.TestCase):
             (1, '', 'Error from server (NotFound): service "docker-registry" not found'),
             (0, RegistryTest.dry_run, ''),
             (0, '', ''),
-            (0, '', ''),
         ]
 
         mock_tmpfile_copy.side_effect = [
@@ -257,8 +256,11 @@ class RegistryTest(unittest.TestCase):
             mock.call(['oc', 'adm', 'registry', '--daemonset=False', '--enforce-quota=False',
                        '--ports=5000', '--replicas=1', '--selector=type=infra',
                        '--service-account=registry', '--dry-run=True', '-o', 'json', '-n', 'default'], None),
-            mock.call(['oc', 'create', '-f', mock.ANY, '-n', 'default'], None),
-            mock.call(['oc', 'create', '-f', mock.ANY, '-n', 'default'], None), ])
+            mock.call(['oc', 'create', '-f', '-', '-n', 'default'], mock.ANY), ])
+
+        self.assertEqual(mock_cmd.call_count, 4)
+        self.assertEqual([item['kind'] for item in results['results']['results'][0]['items']],
+                         ['DeploymentConfig', 'Service'])
 
     @unittest.skipIf(six.PY3, 'py2 test only')
     @mock.patch('os.path.exists')
@@ -335,10 +335,6 @@ class RouterTest(unittest.TestCase):
             (1, '', 'Error from server (NotFound): clsuterrolebinding "router-router-role" not found'),
             (0, RouterTest.dry_run, ''),
             (0, '', ''),
-            (0, '', ''),
-            (0, '', ''),
-            (0, '', ''),
-            (0, '', ''),
         ]
 
         mock_tmpfile_copy.side_effect = [
@@ -360,10 +356,11 @@ class RouterTest(unittest.TestCase):
             mock.call(['oc', 'adm', 'router', 'router', '--expose-metrics=False', '--external-host-insecure=False',
                        '--ports=80:80,443:443', '--replicas=2', '--selector=type=infra', '--service-account=router',
                        '--stats-port=1936', '--dry-run=True', '-o', 'json', '-n', 'default'], None),
-            mock.call(['oc', 'create', '-f', mock.ANY, '-n', 'default'], None),
-            mock.call(['oc', 'create', '-f', mock.ANY, '-n', 'default'], None),
-            mock.call(['oc', 'create', '-f', mock.ANY, '-n', 'default'], None),
-            mock.call(['oc', 'create', '-f', mock.ANY, '-n', 'default'], None)])
+            mock.call(['oc', 'create', '-f', '-', '-n', 'default'], mock.ANY)])
+
+        self.assertEqual(mock_cmd.call_count, 7)
+        self.assertEqual(sorted([item['kind'] for item in results['results']['results'][0]['items']]),
+                         ['ClusterRoleBinding', 'DeploymentConfig', 'Service', 'ServiceAccount'])
 
     @unittest.skipIf(six.PY3, 'py2 test only')
     @mock.patch('os.path.exists')
@@ -2,6 +2,7 @@
  Unit tests for oc_env
 '''
 
+import json
 import os
 import six
 import sys
@@ -322,8 +323,14 @@ class OCEnvTest(unittest.TestCase):
         # Making sure our mocks were called as we expected
         mock_cmd.assert_has_calls([
             mock.call(['oc', 'get', 'dc', 'router', '-o', 'json', '-n', 'default'], None),
+            mock.call(['oc', 'patch', 'dc', 'router', '--type=json', '-p', mock.ANY, '-n', 'default'], None),
         ])
 
+        # only the container environment is sent
+        patch = json.loads(mock_cmd.call_args_list[1][0][0][6])
+        self.assertEqual(patch[0]['path'], '/spec/template/spec/containers/0/env')
+        self.assertIn({'name': 'SOMEKEY', 'value': 'SOMEVALUE'}, patch[0]['value'])
+
     @mock.patch('oc_env.locate_oc_binary')
     @mock.patch('oc_env.Utils.create_tmpfile_copy')
     @mock.patch('oc_env.OCEnv._run')
@@ -2,6 +2,7 @@
  Unit tests for oc label
 '''
 
+import json
 import os
 import six
 import sys
@@ -176,6 +177,12 @@ class OCLabelTest(unittest.TestCase):
         self.assertTrue(results['results']['results']['labels'][0] ==
                         {'storage_pv_quota': 'False', 'awesomens': 'testinglabel'})
 
+        # the labels are merged into the namespace with a single patch
+        cmd = mock_cmd.call_args_list[1][0][0]
+        self.assertEqual(cmd[1:6], ['patch', 'namespace', 'default', '--type=merge', '-p'])
+        self.assertEqual(json.loads(cmd[6]),
+                         {'metadata': {'labels': {'storage_pv_quota': 'False', 'awesomens': 'testinglabel'}}})
+
     @unittest.skipIf(six.PY3, 'py2 test only')
     @mock.patch('os.path.exists')
     @mock.patch('os.environ.get')
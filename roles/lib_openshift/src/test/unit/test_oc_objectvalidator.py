@@ -2,6 +2,7 @@
  Unit tests for oc_objectvalidator
 '''
 
+import json
 import os
 import sys
 import unittest
@@ -901,3 +902,62 @@ class OCObjectValidatorTest(unittest.TestCase):
             mock.call(['oc', 'get', 'netnamespace', '-o', 'json', '-n', 'default'], None),
             mock.call(['oc', 'get', 'namespace', '-o', 'json', '-n', 'default'], None),
         ])
+
+    def test_iter_items(self):
+        ''' Testing that list items are decoded one at a time '''
+        data = '''{"kind": "List", "metadata": {"note": "[\\"items\\"]"},
+                   "items": [{"a": [1, {"b": "}]"}]} , {"c": null}, [], "d"],
+                   "apiVersion": "v1"}'''
+
+        self.assertEqual(list(OCObjectValidator.iter_items(data)),
+                         [{'a': [1, {'b': '}]'}]}, {'c': None}, [], 'd'])
+        self.assertEqual(list(OCObjectValidator.iter_items('{"items": []}')), [])
+        self.assertRaises(ValueError, list, OCObjectValidator.iter_items('[]'))
+
+    @mock.patch('oc_objectvalidator.Utils.create_tmpfile_copy')
+    @mock.patch('oc_objectvalidator.OCObjectValidator._run')
+    def test_bulk(self, mock_cmd, mock_tmpfile_copy):
+        ''' Testing that bulk mode filters items as they are decoded and reports timing '''
+
+        # Arrange
+
+        # run_ansible input parameters
+        params = {
+            'kubeconfig': '/etc/origin/master/admin.kubeconfig',
+            'bulk': True,
+        }
+
+        lists = {
+            'hostsubnet': {'kind': 'List', 'items': [{'metadata': {'name': 'bar0'}, 'host': 'bar0'},
+                                                     {'metadata': {'name': 'bar1'}, 'host': 'baz1'}]},
+            'netnamespace': {'kind': 'List', 'items': [{'metadata': {'name': 'foo0'}, 'netname': 'foo0'}]},
+            'namespace': {'kind': 'List', 'items': [{'metadata': {'name': 'default'}}]},
+        }
+
+        def _run(cmds, _):
+            ''' answer every kind from its list '''
+            return 0, json.dumps(lists[cmds[2]]), ''
+
+        mock_cmd.side_effect = _run
+
+        mock_tmpfile_copy.side_effect = [
+            '/tmp/mocked_kubeconfig',
+        ]
+
+        # Act
+        results = OCObjectValidator.run_ansible(params)
+
+        # Assert
+        self.assertTrue(results['failed'])
+        self.assertEqual(results['results'], {
+            u'hostsubnets where metadata.name != host': [lists['hostsubnet']['items'][1]],
+        })
+        self.assertEqual(sorted(results['timing']), ['hostsubnet', 'namespace', 'netnamespace'])
+        self.assertEqual(results['timing']['hostsubnet']['items'], 2)
+        self.assertEqual(sorted(results['timing']['namespace']), ['fetch', 'items', 'parse'])
+
+        mock_cmd.assert_has_calls([
+            mock.call(['oc', 'get', 'hostsubnet', '-o', 'json', '-n', 'default'], None),
+            mock.call(['oc', 'get', 'netnamespace', '-o', 'json', '-n', 'default'], None),
+            mock.call(['oc', 'get', 'namespace', '-o', 'json', '-n', 'default'], None),
+        ], any_order=True)
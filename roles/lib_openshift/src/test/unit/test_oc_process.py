@@ -449,7 +449,6 @@ class OCProcessTest(unittest.TestCase):
 }'''
 
         mock_cmd.side_effect = [
-            (0, OCProcessTest.mysql, ''),
             (0, OCProcessTest.mysql, ''),
             (0, mysqlproc, ''),
         ]
@@ -248,7 +248,6 @@ class OCProjectTest(unittest.TestCase):
 
         # Return values of our mocked function call. These get returned once per call.
         mock_cmd.side_effect = [
-            (0, project_results, ''),
             (0, project_results, ''),
             (0, '', ''),
             (0, mod_project_results, ''),
@@ -274,7 +273,6 @@ class OCProjectTest(unittest.TestCase):
         # Making sure our mock was called as we expected
         mock_cmd.assert_has_calls([
             mock.call(['oc', 'get', 'namespace', 'operations', '-o', 'json'], None),
-            mock.call(['oc', 'get', 'namespace', 'operations', '-o', 'json'], None),
-            mock.call(['oc', 'replace', '-f', mock.ANY], None),
+            mock.call(['oc', 'patch', 'namespace', 'operations', '--type=json', '-p', mock.ANY], None),
             mock.call(['oc', 'get', 'namespace', 'operations', '-o', 'json'], None),
         ])
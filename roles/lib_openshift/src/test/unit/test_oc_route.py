@@ -254,7 +254,7 @@ metadata:
         # Making sure our mock was called as we expected
         mock_cmd.assert_has_calls([
             mock.call(['oc', 'get', 'route', 'test', '-o', 'json', '-n', 'default'], None),
-            mock.call(['oc', 'create', '-f', mock.ANY, '-n', 'default'], None),
+            mock.call(['oc', 'create', '-f', '-', '-n', 'default'], mock.ANY),
             mock.call(['oc', 'get', 'route', 'test', '-o', 'json', '-n', 'default'], None),
         ])
 
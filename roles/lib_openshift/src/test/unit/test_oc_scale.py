@@ -118,6 +118,46 @@ class OCScaleTest(unittest.TestCase):
         self.assertFalse(results['changed'])
         self.assertEqual(results['result'][0], 3)
 
+    @mock.patch('oc_scale.Utils.create_tmpfile_copy')
+    @mock.patch('oc_scale.OCScale.openshift_cmd')
+    def test_scale_up(self, mock_openshift_cmd, mock_tmpfile_copy):
+        ''' Testing a scale up '''
+        params = {'name': 'router',
+                  'namespace': 'default',
+                  'replicas': 3,
+                  'state': 'present',
+                  'kind': 'dc',
+                  'kubeconfig': '/etc/origin/master/admin.kubeconfig',
+                  'debug': False}
+
+        dc = {"kind": "DeploymentConfig",
+              "apiVersion": "v1",
+              "metadata": {"name": "router", "namespace": "default", "resourceVersion": "6558"},
+              "spec": {"replicas": 1}}
+
+        mock_openshift_cmd.side_effect = [
+            {"cmd": '/usr/bin/oc get dc router -n default',
+             'results': dc,
+             'returncode': 0},
+            {"cmd": '/usr/bin/oc patch dc router --type=merge -p {"spec": {"replicas": 3}} -n default',
+             'results': '',
+             'returncode': 0},
+            {"cmd": '/usr/bin/oc get dc router -n default',
+             'results': dict(dc, spec={"replicas": 3}),
+             'returncode': 0},
+        ]
+
+        mock_tmpfile_copy.side_effect = [
+            '/tmp/mocked_kubeconfig',
+        ]
+
+        results = OCScale.run_ansible(params, False)
+
+        self.assertTrue(results['changed'])
+        self.assertEqual(results['result'][0], 3)
+        # only the replica count is sent
+        mock_openshift_cmd.assert_any_call(['patch', 'dc', 'router', '--type=merge', '-p', '{"spec": {"replicas": 3}}'])
+
     @mock.patch('oc_scale.Utils.create_tmpfile_copy')
     @mock.patch('oc_scale.OCScale.openshift_cmd')
     def test_no_dc_scale(self, mock_openshift_cmd, mock_tmpfile_copy):
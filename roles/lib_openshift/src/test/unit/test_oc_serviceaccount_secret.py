@@ -2,6 +2,7 @@
  Unit tests for oc secret add
 '''
 
+import json
 import os
 import six
 import sys
@@ -18,12 +19,6 @@ module_path = os.path.join('/'.join(os.path.realpath(__file__).split('/')[:-4]),
 sys.path.insert(0, module_path)
 from oc_serviceaccount_secret import OCServiceAccountSecret, locate_oc_binary  # noqa: E402
 
-try:
-    import ruamel.yaml as yaml  # noqa: EF401
-    YAML_TYPE = 'ruamel'
-except ImportError:
-    YAML_TYPE = 'pyyaml'
-
 
 class OCServiceAccountSecretTest(unittest.TestCase):
     '''
@@ -107,48 +102,12 @@ class OCServiceAccountSecretTest(unittest.TestCase):
             ]
         }
         '''
-        builder_ryaml_file = '''\
-secrets:
-- name: builder-dockercfg-rsrua
-- name: builder-token-akqxi
-- name: newsecret
-kind: ServiceAccount
-imagePullSecrets:
-- name: builder-dockercfg-rsrua
-apiVersion: v1
-metadata:
-  name: builder
-  namespace: default
-  resourceVersion: '302879'
-  creationTimestamp: '2017-02-05T17:02:00Z'
-  selfLink: /api/v1/namespaces/default/serviceaccounts/builder
-  uid: cf47bca7-ebc4-11e6-b041-0ed9df7abc38
-'''
-
-        builder_pyyaml_file = '''\
-apiVersion: v1
-imagePullSecrets:
-- name: builder-dockercfg-rsrua
-kind: ServiceAccount
-metadata:
-  creationTimestamp: '2017-02-05T17:02:00Z'
-  name: builder
-  namespace: default
-  resourceVersion: '302879'
-  selfLink: /api/v1/namespaces/default/serviceaccounts/builder
-  uid: cf47bca7-ebc4-11e6-b041-0ed9df7abc38
-secrets:
-- name: builder-dockercfg-rsrua
-- name: builder-token-akqxi
-- name: newsecret
-'''
 
         # Return values of our mocked function call. These get returned once per call.
         mock_cmd.side_effect = [
             (0, oc_get_sa_before, ''),  # First call to the mock
-            (0, oc_get_sa_before, ''),  # Second call to the mock
-            (0, 'serviceaccount "builder" replaced', ''),  # Third call to the mock
-            (0, oc_get_sa_after, ''),  # Fourth call to the mock
+            (0, 'serviceaccount "builder" patched', ''),  # Second call to the mock
+            (0, oc_get_sa_after, ''),  # Third call to the mock
         ]
 
         mock_oc_binary.side_effect = [
@@ -170,18 +129,15 @@ secrets:
         # Making sure our mocks were called as we expected
         mock_cmd.assert_has_calls([
             mock.call(['oc', 'get', 'sa', 'builder', '-o', 'json', '-n', 'default'], None),
-            mock.call(['oc', 'get', 'sa', 'builder', '-o', 'json', '-n', 'default'], None),
-            mock.call(['oc', 'replace', '-f', mock.ANY, '-n', 'default'], None),
+            mock.call(['oc', 'patch', 'sa', 'builder', '--type=json', '-p', mock.ANY, '-n', 'default'], None),
             mock.call(['oc', 'get', 'sa', 'builder', '-o', 'json', '-n', 'default'], None)
         ])
 
-        yaml_file = builder_pyyaml_file
-
-        if YAML_TYPE == 'ruamel':
-            yaml_file = builder_ryaml_file
-        mock_write.assert_has_calls([
-            mock.call(mock.ANY, yaml_file)
-        ])
+        # only the new secret is sent to the server, and nothing is written to disk
+        patch = json.loads(mock_cmd.call_args_list[1][0][0][6])
+        self.assertEqual(patch, [{'op': 'test', 'path': '/metadata/resourceVersion', 'value': '302879'},
+                                 {'op': 'add', 'path': '/secrets/-', 'value': {'name': 'newsecret'}}])
+        mock_write.assert_not_called()
 
     @mock.patch('oc_serviceaccount_secret.locate_oc_binary')
     @mock.patch('oc_serviceaccount_secret.Utils.create_tmpfile_copy')
@@ -233,45 +189,10 @@ secrets:
         }
         '''
 
-        builder_ryaml_file = '''\
-secrets:
-- name: builder-dockercfg-rsrua
-- name: builder-token-akqxi
-kind: ServiceAccount
-imagePullSecrets:
-- name: builder-dockercfg-rsrua
-apiVersion: v1
-metadata:
-  name: builder
-  namespace: default
-  resourceVersion: '302879'
-  creationTimestamp: '2017-02-05T17:02:00Z'
-  selfLink: /api/v1/namespaces/default/serviceaccounts/builder
-  uid: cf47bca7-ebc4-11e6-b041-0ed9df7abc38
-'''
-
-        builder_pyyaml_file = '''\
-apiVersion: v1
-imagePullSecrets:
-- name: builder-dockercfg-rsrua
-kind: ServiceAccount
-metadata:
-  creationTimestamp: '2017-02-05T17:02:00Z'
-  name: builder
-  namespace: default
-  resourceVersion: '302879'
-  selfLink: /api/v1/namespaces/default/serviceaccounts/builder
-  uid: cf47bca7-ebc4-11e6-b041-0ed9df7abc38
-secrets:
-- name: builder-dockercfg-rsrua
-- name: builder-token-akqxi
-'''
-
         # Return values of our mocked function call. These get returned once per call.
         mock_cmd.side_effect = [
             (0, oc_get_sa_before, ''),  # First call to the mock
-            (0, oc_get_sa_before, ''),  # Second call to the mock
-            (0, 'serviceaccount "builder" replaced', ''),  # Third call to the mock
+            (0, 'serviceaccount "builder" patched', ''),  # Second call to the mock
         ]
 
         mock_oc_binary.side_effect = [
@@ -293,17 +214,14 @@ secrets:
         # Making sure our mocks were called as we expected
         mock_cmd.assert_has_calls([
             mock.call(['oc', 'get', 'sa', 'builder', '-o', 'json', '-n', 'default'], None),
-            mock.call(['oc', 'get', 'sa', 'builder', '-o', 'json', '-n', 'default'], None),
-            mock.call(['oc', 'replace', '-f', mock.ANY, '-n', 'default'], None),
+            mock.call(['oc', 'patch', 'sa', 'builder', '--type=json', '-p', mock.ANY, '-n', 'default'], None),
         ])
 
-        yaml_file = builder_pyyaml_file
-
-        if YAML_TYPE == 'ruamel':
-            yaml_file = builder_ryaml_file
-        mock_write.assert_has_calls([
-            mock.call(mock.ANY, yaml_file)
-        ])
+        # only the removed secret is sent to the server, and nothing is written to disk
+        patch = json.loads(mock_cmd.call_args_list[1][0][0][6])
+        self.assertEqual(patch, [{'op': 'test', 'path': '/metadata/resourceVersion', 'value': '302879'},
+                                 {'op': 'remove', 'path': '/secrets/2'}])
+        mock_write.assert_not_called()
 
     @unittest.skipIf(six.PY3, 'py2 test only')
     @mock.patch('os.path.exists')
@@ -0,0 +1,542 @@
+'''
+ Unit tests for OpenShiftCLI against a stub API server
+'''
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+import mock
+
+from six.moves import BaseHTTPServer, http_client, socketserver
+
+# Removing invalid variable names for tests so that I can
+# keep them brief
+# pylint: disable=invalid-name,no-name-in-module
+# Disable import-error b/c our libraries aren't loaded in jenkins
+# pylint: disable=import-error,wrong-import-position
+# place class in our python path
+module_path = os.path.join('/'.join(os.path.realpath(__file__).split('/')[:-4]), 'library')  # noqa: E501
+sys.path.insert(0, module_path)
+from oc_obj import OCObject, OpenShiftCLI, OpenShiftCLIError, OpenShiftRestClient  # noqa: E402
+from oc_adm_manage_node import ManageNode, ManageNodeConfig  # noqa: E402
+
+
+class StubAPIHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    ''' A tiny in-memory API server '''
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self):
+        plural, name = self.path.split('?')[0].split('/')[-2:]
+        self._reply(404, {'kind': 'Status', 'reason': 'NotFound',
+                          'message': '%s "%s" not found' % (plural, name)})
+
+    def _body(self):
+        return json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode())
+
+    def _record(self):
+        ''' record the request; returns True when a queued failure was sent instead '''
+        self.server.requests.append((self.command, self.path, self.client_address))
+        self.server.auth.append(self.headers.get('Authorization'))
+        if self.command in self.server.failures and self.server.failures[self.command]:
+            if self.headers.get('Content-Length'):
+                self._body()
+            status, reason = self.server.failures[self.command].pop(0)
+            if status is None:
+                # drop the connection without answering
+                self.close_connection = True
+                return True
+            self._reply(status, {'kind': 'Status', 'reason': reason, 'message': 'injected failure'})
+            return True
+        return False
+
+    def do_GET(self):
+        ''' get an item or a list '''
+        if self._record():
+            return
+        path = self.path.split('?')[0]
+        if path in self.server.objects:
+            return self._reply(200, self.server.objects[path])
+
+        items = [obj for key, obj in sorted(self.server.objects.items())
+                 if key.rsplit('/', 1)[0] == path]
+        if items or path.endswith('s'):
+            # the API server answers with a typed list whose items carry no kind
+            kind = items[0]['kind'] if items else path.rsplit('/', 1)[-1][:-1].capitalize()
+            items = [dict([(key, value) for key, value in item.items() if key not in ['kind', 'apiVersion']])
+                     for item in items]
+            return self._reply(200, {'kind': kind + 'List', 'apiVersion': 'v1',
+                                     'metadata': {'resourceVersion': '1'}, 'items': items})
+
+        return self._not_found()
+
+    def do_POST(self):
+        ''' create an item '''
+        if self._record():
+            return
+        obj = self._body()
+        self.server.objects[self.path + '/' + obj['metadata']['name']] = obj
+        self._reply(201, obj)
+
+    def do_PUT(self):
+        ''' replace an item '''
+        if self._record():
+            return
+        if self.path not in self.server.objects:
+            return self._not_found()
+        self.server.objects[self.path] = self._body()
+        self._reply(200, self.server.objects[self.path])
+
+    def do_PATCH(self):
+        ''' patch an item with a JSON patch '''
+        if self._record():
+            return
+        if self.path not in self.server.objects:
+            return self._not_found()
+        self.server.patches.append((self.headers['Content-Type'], self._body()))
+        while self.server.writers:
+            self.server.writers.pop(0)(self.server.objects[self.path])
+        obj = json.loads(json.dumps(self.server.objects[self.path]))
+        for change in self.server.patches[-1][1]:
+            keys = [key.replace('~1', '/').replace('~0', '~') for key in change['path'].split('/')[1:]]
+            parent = obj
+            for key in keys[:-1]:
+                parent = parent[int(key) if isinstance(parent, list) else key]
+            if change['op'] == 'test':
+                if parent[int(keys[-1]) if isinstance(parent, list) else keys[-1]] != change['value']:
+                    return self._reply(422, {'kind': 'Status', 'reason': 'Invalid',
+                                             'message': 'the server rejected our request due to an error in our '
+                                                        'request: testing value %s failed' % change['path']})
+            elif change['op'] == 'remove':
+                del parent[int(keys[-1]) if isinstance(parent, list) else keys[-1]]
+            elif isinstance(parent, list) and keys[-1] == '-':
+                parent.append(change['value'])
+            else:
+                parent[int(keys[-1]) if isinstance(parent, list) else keys[-1]] = change['value']
+        self.server.objects[self.path] = obj
+        self._reply(200, obj)
+
+    def do_DELETE(self):
+        ''' delete an item '''
+        if self._record():
+            return
+        if self.server.objects.pop(self.path, None) is None:
+            return self._not_found()
+        self._reply(200, {'kind': 'Status', 'status': 'Success'})
+
+
+class StubAPIServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    ''' serve every keep-alive connection on its own thread '''
+    daemon_threads = True
+
+
+class OpenShiftRestTest(unittest.TestCase):
+    '''
+     Test class for the OpenShiftCLI REST transport
+    '''
+
+    def setUp(self):
+        ''' start the stub API server and write a kubeconfig pointing at it '''
+        self.server = StubAPIServer(('127.0.0.1', 0), StubAPIHandler)
+        self.server.objects = {}
+        self.server.requests = []
+        self.server.auth = []
+        self.server.patches = []
+        self.server.writers = []
+        self.server.failures = {}
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        self.tmpdir = tempfile.mkdtemp()
+        self.kubeconfig = os.path.join(self.tmpdir, 'admin.kubeconfig')
+        with open(self.kubeconfig, 'w') as kfd:
+            kfd.write(json.dumps({
+                'apiVersion': 'v1',
+                'kind': 'Config',
+                'current-context': 'default/stub/admin',
+                'contexts': [{'name': 'default/stub/admin',
+                              'context': {'cluster': 'stub', 'namespace': 'default', 'user': 'admin'}}],
+                'clusters': [{'name': 'stub',
+                              'cluster': {'server': 'http://127.0.0.1:%s' % self.server.server_port}}],
+                'users': [{'name': 'admin', 'user': {'token': 'sekret'}}],
+            }))
+
+    def tearDown(self):
+        ''' stop the stub API server '''
+        self.server.shutdown()
+        self.server.server_close()
+        OpenShiftRestClient._clients.clear()  # pylint: disable=protected-access
+        shutil.rmtree(self.tmpdir)
+
+    def test_get_create_delete(self):
+        ''' Testing get, create and delete over the REST transport '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+
+        results = cli._get('dc', 'router')
+        self.assertEqual(results['returncode'], 1)
+        self.assertIn('deploymentconfigs "router" not found', results['stderr'])
+
+        dc = {'kind': 'DeploymentConfig', 'apiVersion': 'v1',
+              'metadata': {'name': 'router', 'labels': {'router': 'router'}},
+              'spec': {'replicas': 1}}
+        results = cli._create_from_content('router', dc)
+        self.assertEqual(results['returncode'], 0)
+
+        results = cli._get('dc', 'router')
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(results['results'][0]['spec']['replicas'], 1)
+
+        results = cli._replace_content('dc', 'router', {'spec.replicas': 3})
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(self.server.objects['/oapi/v1/namespaces/default/deploymentconfigs/router']['spec'],
+                         {'replicas': 3})
+        self.assertEqual(self.server.patches,
+                         [('application/json-patch+json', [{'op': 'replace', 'path': '/spec/replicas', 'value': 3}])])
+
+        results = cli._get('dc', selector='router=router')
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(results['results'][0]['kind'], 'List')
+        self.assertEqual(results['results'][0]['items'][0]['kind'], 'DeploymentConfig')
+        self.assertIn(('GET', '/oapi/v1/namespaces/default/deploymentconfigs?labelSelector=router%3Drouter'),
+                      [req[:2] for req in self.server.requests])
+
+        results = cli._delete('dc', 'router')
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(self.server.objects, {})
+
+        self.assertEqual(set(self.server.auth), set(['Bearer sekret']))
+
+    @mock.patch.dict(os.environ, {'LIB_OPENSHIFT_TRANSPORT': 'rest'})
+    def test_get_nodes_by_selector(self):
+        ''' Testing that typed lists are reported as a List like oc does '''
+        for name in ['node1', 'node2']:
+            self.server.objects['/api/v1/nodes/' + name] = {'kind': 'Node', 'apiVersion': 'v1',
+                                                            'metadata': {'name': name},
+                                                            'spec': {'unschedulable': True} if name == 'node2' else {}}
+
+        config = ManageNodeConfig(self.kubeconfig, {})
+        nodes = ManageNode(config).get_nodes(selector='region=infra')
+
+        self.assertEqual(nodes, [{'name': 'node1', 'schedulable': True},
+                                 {'name': 'node2', 'schedulable': False}])
+        self.assertEqual([req[:2] for req in self.server.requests],
+                         [('GET', '/api/v1/nodes?labelSelector=region%3Dinfra')])
+
+    def test_connection_is_shared(self):
+        ''' Testing that instances share one keep-alive connection '''
+        obj = OCObject('secrets', 'default', kubeconfig=self.kubeconfig)
+        obj.transport = 'rest'
+        other = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+
+        for _ in range(5):
+            obj.get()
+            other._get('secrets', 'foo')
+            obj.invalidate_cache()
+
+        self.assertEqual(len(self.server.requests), 10)
+        self.assertEqual(len(set([req[2] for req in self.server.requests])), 1)
+
+    def test_rewritten_kubeconfig_gets_new_client(self):
+        ''' Testing that a new token in the kubeconfig is used by the next client '''
+        client = OpenShiftRestClient.get_client(self.kubeconfig)
+        self.assertIs(OpenShiftRestClient.get_client(self.kubeconfig), client)
+
+        with open(self.kubeconfig) as kfd:
+            config = json.load(kfd)
+        config['users'][0]['user']['token'] = 'rotated'
+        with open(self.kubeconfig, 'w') as kfd:
+            kfd.write(json.dumps(config))
+        mtime = os.stat(self.kubeconfig).st_mtime + 10
+        os.utime(self.kubeconfig, (mtime, mtime))
+
+        other = OpenShiftRestClient.get_client(self.kubeconfig)
+        self.assertIsNot(other, client)
+        other.request('GET', '/api/v1/namespaces/default/secrets')
+        self.assertEqual(self.server.auth, ['Bearer rotated'])
+        self.assertEqual(len(OpenShiftRestClient._clients), 1)  # pylint: disable=protected-access
+
+    def test_unsupported_commands_use_oc(self):
+        ''' Testing that commands the client does not know fall back to oc '''
+        client = OpenShiftRestClient.get_client(self.kubeconfig)
+
+        self.assertIsNone(client.run(['label', 'node', 'foo', 'a=b']))
+        self.assertIsNone(client.run(['get', 'widgets', 'foo', '-o', 'json']))
+        self.assertIsNone(client.run(['replace', '-f', 'foo.yml', '--force']))
+        self.assertIsNone(client.run(['patch', 'dc', 'router', '-p', '{}']))
+        self.assertEqual(self.server.requests, [])
+
+    def test_get_cache(self):
+        ''' Testing that gets are cached until the next write '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+        self.server.objects['/api/v1/namespaces/default/services/router'] = \
+            {'kind': 'Service', 'metadata': {'name': 'router'}, 'spec': {'ports': []}}
+        before = OpenShiftCLI.cache_stats()
+
+        first = cli._get('svc', 'router')
+        first['results'][0]['spec']['ports'].append('mutated by caller')
+        second = cli._get('svc', 'router')
+        self.assertEqual(second['results'][0]['spec']['ports'], [])
+        self.assertEqual(len(self.server.requests), 1)
+
+        cli._replace_content('svc', 'router', {'spec.clusterIP': '172.30.0.1'})
+        cli._get('svc', 'router')
+        self.assertEqual([req[0] for req in self.server.requests], ['GET', 'PATCH', 'GET'])
+
+        after = OpenShiftCLI.cache_stats()
+        self.assertEqual(after['hits'] - before['hits'], 2)
+        self.assertEqual(after['misses'] - before['misses'], 2)
+
+    def test_get_cache_is_shared_across_instances(self):
+        ''' Testing that a write through one instance invalidates the gets cached by another '''
+        reader = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+        writer = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+        path = '/api/v1/namespaces/default/services/router'
+        self.server.objects[path] = {'kind': 'Service', 'metadata': {'name': 'router'}, 'spec': {}}
+
+        reader._get('svc', 'router')
+        reader._get('svc', 'router')
+        self.assertEqual(len(self.server.requests), 1)
+
+        writer._replace_content('svc', 'router', {'spec.clusterIP': '172.30.0.1'})
+        results = reader._get('svc', 'router')
+        self.assertEqual(results['results'][0]['spec'], {'clusterIP': '172.30.0.1'})
+        self.assertEqual([req[0] for req in self.server.requests], ['GET', 'GET', 'PATCH', 'GET'])
+
+    def test_create_list(self):
+        ''' Testing that a batch of objects is submitted as one List '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+        objects = [{'kind': 'Service', 'metadata': {'name': 'router'}},
+                   {'kind': 'ServiceAccount', 'metadata': {'name': 'router'}}]
+
+        results = cli._create_list(objects)
+
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(results['items'], [{'kind': 'Service', 'name': 'router', 'status': 'created'},
+                                            {'kind': 'ServiceAccount', 'name': 'router', 'status': 'created'}])
+        self.assertEqual(sorted(self.server.objects.keys()),
+                         ['/api/v1/namespaces/default/serviceaccounts/router',
+                          '/api/v1/namespaces/default/services/router'])
+
+    @mock.patch('oc_obj.OpenShiftCLI._run')
+    def test_create_list_status_by_kind(self, mock_run):
+        ''' Testing that objects sharing a name get their own status '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig)
+        objects = [{'kind': 'Service', 'metadata': {'name': 'router'}},
+                   {'kind': 'ServiceAccount', 'metadata': {'name': 'router'}},
+                   {'kind': 'DeploymentConfig', 'metadata': {'name': 'router'}}]
+        mock_run.return_value = (1,
+                                 'service "router" created\ndeploymentconfig.apps.openshift.io/router created\n',
+                                 'Error from server (AlreadyExists): serviceaccounts "router" already exists')
+
+        results = cli._create_list(objects)
+
+        self.assertEqual([item['status'] for item in results['items']], ['created', 'failed', 'created'])
+        self.assertEqual(results['items'][1]['msg'],
+                         'Error from server (AlreadyExists): serviceaccounts "router" already exists')
+
+    @mock.patch('oc_obj.time.sleep')
+    def test_transient_failures_are_retried(self, mock_sleep):
+        ''' Testing that idempotent commands are retried with backoff '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest',
+                           retry_policy={'attempts': 3, 'delay': 2})
+        self.server.objects['/api/v1/namespaces/default/services/router'] = \
+            {'kind': 'Service', 'metadata': {'name': 'router'}, 'spec': {}}
+        self.server.failures['GET'] = [(503, 'ServiceUnavailable'), (500, 'InternalError')]
+
+        results = cli._get('svc', 'router')
+
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(results['attempts'], 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertTrue(0 <= mock_sleep.call_args_list[0][0][0] <= 2)
+        self.assertTrue(0 <= mock_sleep.call_args_list[1][0][0] <= 4)
+        self.assertAlmostEqual(results['retry_wait'],
+                               sum([call[0][0] for call in mock_sleep.call_args_list]), places=2)
+
+        # creates are not repeated once the server has seen them
+        self.server.failures['POST'] = [(503, 'ServiceUnavailable')]
+        results = cli._create_from_content('router', {'kind': 'ServiceAccount', 'metadata': {'name': 'router'}})
+        self.assertEqual(results['returncode'], 1)
+        self.assertNotIn('attempts', results)
+        self.assertEqual(mock_sleep.call_count, 2)
+
+    def test_dropped_requests_are_not_resent(self):
+        ''' Testing that only requests the server cannot have seen are sent again '''
+        client = OpenShiftRestClient.get_client(self.kubeconfig)
+        self.server.objects['/api/v1/namespaces/default/services/router'] = \
+            {'kind': 'Service', 'metadata': {'name': 'router'}, 'spec': {}}
+
+        # a GET on a dropped keep-alive connection is sent again
+        client.request('GET', '/api/v1/namespaces/default/services/router')
+        self.server.failures['GET'] = [(None, None)]
+        status, _ = client.request('GET', '/api/v1/namespaces/default/services/router')
+        self.assertEqual(status, 200)
+        self.assertEqual([req[0] for req in self.server.requests], ['GET', 'GET', 'GET'])
+
+        # a POST may have been processed and is left to the caller
+        self.server.failures['POST'] = [(None, None)]
+        with self.assertRaises((http_client.HTTPException, IOError)):
+            client.request('POST', '/api/v1/namespaces/default/services',
+                           body={'kind': 'Service', 'metadata': {'name': 'other'}})
+        self.assertEqual([req[0] for req in self.server.requests], ['GET', 'GET', 'GET', 'POST'])
+
+    @mock.patch('oc_obj.time.sleep')
+    def test_connection_errors_are_reported(self, mock_sleep):
+        ''' Testing that an unreachable API server fails the command instead of raising '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest',
+                           retry_policy={'attempts': 2})
+        self.server.shutdown()
+        self.server.server_close()
+
+        results = cli._get('svc', 'router')
+
+        self.assertEqual(results['returncode'], 1)
+        self.assertIn('Unable to connect to the server', results['stderr'])
+        self.assertEqual(results['attempts'], 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @mock.patch('oc_obj.time.sleep')
+    def test_lost_connections_retry_idempotent_commands(self, mock_sleep):
+        ''' Testing that a dropped request is only retried when it can safely be sent twice '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+        self.server.failures['POST'] = [(None, None)]
+
+        results = cli._create_from_content('router', {'kind': 'ServiceAccount', 'metadata': {'name': 'router'}})
+
+        self.assertEqual(results['returncode'], 1)
+        self.assertIn('Lost connection to the server', results['stderr'])
+        self.assertNotIn('attempts', results)
+        self.assertEqual([req[0] for req in self.server.requests], ['POST'])
+
+        self.server.objects['/api/v1/namespaces/default/services/router'] = \
+            {'kind': 'Service', 'metadata': {'name': 'router'}, 'spec': {}}
+        self.server.failures['GET'] = [(None, None)]
+
+        results = cli._get('svc', 'router')
+
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(results['attempts'], 2)
+        self.assertEqual(mock_sleep.call_count, 1)
+
+    @mock.patch.object(OpenShiftCLI, 'max_patch_ops', 0)
+    def test_replace_conflict_is_retried(self):
+        ''' Testing that a replace that hits a conflict is redone on a fresh copy '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+        path = '/api/v1/namespaces/default/services/router'
+        self.server.objects[path] = {'kind': 'Service', 'metadata': {'name': 'router'}, 'spec': {}}
+        self.server.failures['PUT'] = [(409, 'Conflict')]
+
+        results = cli._replace_content('svc', 'router', {'spec.clusterIP': '172.30.0.1'})
+
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(results['conflict_attempts'], 2)
+        self.assertEqual([req[0] for req in self.server.requests], ['GET', 'PUT', 'GET', 'PUT'])
+        self.assertEqual(self.server.objects[path]['spec'], {'clusterIP': '172.30.0.1'})
+
+    def test_patch_conflict_is_retried(self):
+        ''' Testing that a patch only applies to the version it was diffed against '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='rest')
+        path = '/api/v1/namespaces/default/serviceaccounts/router'
+        self.server.objects[path] = {'kind': 'ServiceAccount',
+                                     'metadata': {'name': 'router', 'resourceVersion': '1'},
+                                     'secrets': [{'name': 'a'}, {'name': 'b'}, {'name': 'c'}]}
+
+        def writer(obj):
+            ''' another client drops a secret between our get and patch '''
+            obj['secrets'].pop(0)
+            obj['metadata']['resourceVersion'] = '2'
+
+        self.server.writers.append(writer)
+
+        results = cli._replace_content('sa', 'router', {'secrets': [{'name': 'a'}, {'name': 'c'}]})
+
+        self.assertEqual(results['returncode'], 0)
+        self.assertEqual(results['conflict_attempts'], 2)
+        self.assertEqual([req[0] for req in self.server.requests], ['GET', 'PATCH', 'GET', 'PATCH'])
+        self.assertEqual(self.server.patches[0][1][0],
+                         {'op': 'test', 'path': '/metadata/resourceVersion', 'value': '1'})
+        # without the test the stale remove of index 1 would have left [b] behind
+        self.assertEqual(self.server.objects[path]['secrets'], [{'name': 'a'}, {'name': 'c'}])
+
+    @mock.patch.dict(os.environ, {'LIB_OPENSHIFT_TRANSPORT': 'rest',
+                                  'LIB_OPENSHIFT_RETRY_POLICY': '{"attempts": 6, "conflict_attempts": 1}'})
+    def test_settings_from_environment(self):
+        ''' Testing that the transport and retry policy can be set from the environment '''
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig)
+        self.assertEqual(cli.transport, 'rest')
+        self.assertEqual(cli.retry_policy['attempts'], 6)
+        self.assertEqual(cli.retry_policy['conflict_attempts'], 1)
+
+        self.server.objects['/api/v1/namespaces/default/services/router'] = \
+            {'kind': 'Service', 'metadata': {'name': 'router'}, 'spec': {}}
+        results = cli._replace_content('svc', 'router', {'spec.clusterIP': '172.30.0.1'})
+        self.assertEqual(results['returncode'], 0)
+        self.assertNotIn('conflict_attempts', results)
+
+        with self.assertRaises(OpenShiftCLIError):
+            OpenShiftCLI('default', kubeconfig=self.kubeconfig, retry_policy={'conflict_attempts': 0})
+        with mock.patch.dict(os.environ, {'LIB_OPENSHIFT_RETRY_POLICY': 'attempts=6'}):
+            with self.assertRaises(OpenShiftCLIError):
+                OpenShiftCLI('default', kubeconfig=self.kubeconfig)
+
+    @mock.patch.dict(os.environ, {'LIB_OPENSHIFT_TRANSPORT': 'cli',
+                                  'LIB_OPENSHIFT_RETRY_POLICY': '{"attempts": 6}'})
+    @mock.patch.object(OpenShiftCLI, 'module_settings', {})
+    def test_settings_from_module_options(self):
+        ''' Testing that the transport and retry_policy module options win over the environment '''
+        module = mock.Mock(params={'transport': 'rest',
+                                   'retry_policy': {'attempts': '2', 'max_delay': '10'}})
+        OpenShiftCLI.configure(module)
+        self.assertFalse(module.fail_json.called)
+
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig)
+        self.assertEqual(cli.transport, 'rest')
+        self.assertEqual(cli.retry_policy['attempts'], 2)
+        self.assertEqual(cli.retry_policy['max_delay'], 10.0)
+        self.assertEqual(cli.retry_policy['delay'], 1)
+
+        # constructor arguments still win over the module options
+        cli = OpenShiftCLI('default', kubeconfig=self.kubeconfig, transport='cli', retry_policy={})
+        self.assertEqual(cli.transport, 'cli')
+        self.assertEqual(cli.retry_policy['attempts'], 4)
+
+        for retry_policy in [{'retries': 2}, {'attempts': 'many'}, {'conflict_attempts': 0}]:
+            module = mock.Mock(params={'transport': None, 'retry_policy': retry_policy})
+            module.fail_json.side_effect = SystemExit
+            with self.assertRaises(SystemExit):
+                OpenShiftCLI.configure(module)
+
+    def test_kubeconfig_is_staged_once(self):
+        ''' Testing that instances share one kubeconfig copy until it changes '''
+        first = OpenShiftCLI('default', kubeconfig=self.kubeconfig)
+        second = OpenShiftCLI('kube-system', kubeconfig=self.kubeconfig)
+        self.assertEqual(first.kubeconfig, second.kubeconfig)
+        self.assertNotEqual(first.kubeconfig, self.kubeconfig)
+
+        # same content under a new mtime reuses the copy
+        os.utime(self.kubeconfig, (0, 0))
+        self.assertEqual(OpenShiftCLI('default', kubeconfig=self.kubeconfig).kubeconfig, first.kubeconfig)
+
+        # new content gets a new copy
+        with open(self.kubeconfig, 'a') as kfd:
+            kfd.write('\n')
+        os.utime(self.kubeconfig, (1, 1))
+        third = OpenShiftCLI('default', kubeconfig=self.kubeconfig)
+        self.assertNotEqual(third.kubeconfig, first.kubeconfig)
+        with open(third.kubeconfig) as kfd:
+            self.assertTrue(kfd.read().endswith('\n'))
@@ -29,7 +29,10 @@
 # pylint: disable=wrong-import-order,wrong-import-position,unused-import
 
 from __future__ import print_function  # noqa: F401
+import collections  # noqa: F401
+import contextlib  # noqa: F401
 import copy  # noqa: F401
+import hashlib  # noqa: F401
 import json  # noqa: F401
 import os  # noqa: F401
 import re  # noqa: F401
@@ -26,8 +26,11 @@ def main():
                                    type='str'),
             backup=dict(default=True, type='bool'),
             separator=dict(default='.', type='str'),
+            edits=dict(default=None, type='list'),
+            selector=dict(default=None, type='dict'),
         ),
-        mutually_exclusive=[["curr_value", "index"], ['update', "append"]],
+        mutually_exclusive=[["curr_value", "index"], ['update', "append"], ["edits", "value"],
+                            ["selector", "content"]],
         required_one_of=[["content", "src"]],
     )
 
@@ -5,6 +5,7 @@
 import os
 import sys
 import unittest
+import mock
 
 # Removing invalid variable names for tests so that I can
 # keep them brief
@@ -15,7 +16,7 @@ import unittest
 yedit_path = os.path.join('/'.join(os.path.realpath(__file__).split('/')[:-4]), 'library')  # noqa: E501
 sys.path.insert(0, yedit_path)
 
-from yedit import Yedit, YeditException  # noqa: E402
+from yedit import Yedit, YeditException, YeditPath  # noqa: E402
 
 # pylint: disable=too-many-public-methods
 # Silly pylint, moar tests!
@@ -277,6 +278,223 @@ class YeditTest(unittest.TestCase):
         with self.assertRaises(YeditException):
             yed.put('new.stuff.here[0]', 'item')
 
+    def test_transaction_commit(self):
+        '''test that a transaction copies only the paths it edits'''
+        yed = Yedit('yedit_test.yml')
+        original = yed.yaml_dict
+        untouched = original['b']['c']['d'][0]
+
+        yed.begin()
+        yed.put('b.c.d[0].e', 'y')
+        yed.append('b.c.d', 'h')
+        yed.put('x.y', 'z')
+        yed.delete('a')
+        changed, result = yed.commit()
+
+        self.assertTrue(changed)
+        self.assertEqual(result, {'b': {'c': {'d': [{'e': 'y'}, 'f', 'g', 'h']}}, 'x': {'y': 'z'}})
+        self.assertEqual(original, self.data)
+        self.assertFalse(yed.yaml_dict['b']['c']['d'] is original['b']['c']['d'])
+        self.assertEqual(untouched, {'e': 'x'})
+
+        yed.begin()
+        yed.put('x.y', 'z')
+        self.assertFalse(yed.commit()[0])
+
+    def test_transaction_rollback(self):
+        '''test that a failed transaction leaves the document alone'''
+        yed = Yedit(content={'a': {'b': ['c']}})
+        with self.assertRaises(YeditException):
+            with yed.transaction():
+                yed.append('a.b', 'd')
+                yed.put('a.b.c.d', 'x')
+
+        self.assertEqual(yed.yaml_dict, {'a': {'b': ['c']}})
+        with self.assertRaises(YeditException):
+            yed.commit()
+
+    def test_yedit_path(self):
+        '''test that parsed paths are reused and accepted as keys'''
+        path = YeditPath.get('b.c.d[0].e')
+        self.assertTrue(path is YeditPath.get('b.c.d[0].e'))
+        self.assertFalse(path is YeditPath.get('b.c.d[0].e', sep='#'))
+        self.assertEqual(path.tokens, (('', 'b'), ('', 'c'), ('', 'd'), ('0', ''), ('', 'e')))
+        self.assertEqual(Yedit.parse_key('b#c.d', '#'), [('', 'b'), ('', 'c.d')])
+        self.assertFalse(Yedit.valid_key('b..c'))
+
+        yed = Yedit('yedit_test.yml')
+        self.assertEqual(yed.get(path), 'x')
+        yed.put(path, 'y')
+        self.assertEqual(yed.get('b.c.d[0].e'), 'y')
+
+        # the least recently used path is dropped first
+        size = YeditPath.cache_size
+        try:
+            YeditPath.cache_size = 2
+            YeditPath.get('first')
+            YeditPath.get('second')
+            YeditPath.get('first')
+            YeditPath.get('third')
+            self.assertEqual([key for key, _ in YeditPath._cache.keys()][-2:], ['first', 'third'])
+            self.assertNotIn(('second', '.'), YeditPath._cache)
+        finally:
+            YeditPath.cache_size = size
+
+    def test_run_ansible_edits(self):
+        '''test applying a batch of edits with a single write'''
+        params = {'src': YeditTest.filename,
+                  'backup': False,
+                  'separator': '.',
+                  'state': 'present',
+                  'content': None,
+                  'content_type': 'dict',
+                  'value': None,
+                  'edits': [{'key': 'a', 'value': 'a'},
+                            {'key': 'x.y', 'value': 'z'},
+                            {'key': 'b.c.d', 'value': 'h', 'append': True},
+                            {'key': 'b.c.d[0]', 'state': 'absent'}],
+                  'selector': None}
+        module = type('Module', (object,), {'params': params})
+
+        with mock.patch.object(Yedit, 'write', autospec=True, side_effect=Yedit.write) as mock_write:
+            results = Yedit.run_ansible(module)
+
+        self.assertTrue(results['changed'])
+        self.assertEqual(results['edits'], [{'key': 'a', 'changed': False},
+                                            {'key': 'x.y', 'changed': True},
+                                            {'key': 'b.c.d', 'changed': True},
+                                            {'key': 'b.c.d[0]', 'changed': True}])
+        self.assertEqual(mock_write.call_count, 1)
+        self.assertEqual(Yedit(YeditTest.filename).yaml_dict,
+                         {'a': 'a', 'b': {'c': {'d': ['f', 'g', 'h']}}, 'x': {'y': 'z'}})
+
+        # a failing edit leaves the file alone
+        params['edits'] = [{'key': 'a', 'value': 'b'}, {'key': 'b.c.d.e', 'value': 'x'}]
+        results = Yedit.run_ansible(module)
+        self.assertTrue(results['failed'])
+        self.assertEqual(Yedit(YeditTest.filename).get('a'), 'a')
+
+    def test_fast_load(self):
+        '''test that the fast loader reads the same document'''
+        yed = Yedit('yedit_test.yml', round_trip=False)
+        self.assertEqual(yed.yaml_dict, self.data)
+        self.assertTrue(type(yed.yaml_dict) is dict)
+
+        # python objects need no round trip
+        self.assertFalse(Yedit(content={'a': 'b'}).round_trip)
+        self.assertTrue(Yedit('yedit_test.yml').round_trip)
+
+    def test_write_unchanged(self):
+        '''test that a document the file already holds is not written again'''
+        params = {'src': YeditTest.filename,
+                  'backup': True,
+                  'separator': '.',
+                  'state': 'present',
+                  'content': None,
+                  'content_type': 'dict',
+                  'value': None,
+                  'edits': None,
+                  'selector': None}
+        module = type('Module', (object,), {'params': params})
+
+        with mock.patch.object(Yedit, '_write', side_effect=Yedit._write) as mock_write:
+            results = Yedit.run_ansible(module)
+            self.assertFalse(results['changed'])
+            mock_write.assert_not_called()
+            self.assertFalse(os.path.exists(YeditTest.filename + '.orig'))
+
+            # changed on disk after it was read
+            yed = Yedit(YeditTest.filename)
+            with open(YeditTest.filename, 'a') as yfd:
+                yfd.write('# edited\n')
+            self.assertTrue(yed.write()[0])
+            self.assertEqual(mock_write.call_count, 1)
+            self.assertFalse(yed.write()[0])
+            self.assertEqual(mock_write.call_count, 1)
+
+    def test_multi_document_edit(self):
+        '''test editing the matching documents of a multi-document file'''
+        with open(YeditTest.filename, 'w') as yfd:
+            yfd.write('''---
+kind: Service
+metadata:
+  name: router
+spec:
+  ports: []
+---
+kind: DeploymentConfig
+metadata:
+  name: router
+spec:
+  replicas: 1
+---
+kind: DeploymentConfig
+metadata:
+  name: registry
+spec:
+  replicas: 1
+''')
+        params = {'src': YeditTest.filename,
+                  'backup': False,
+                  'separator': '.',
+                  'state': 'present',
+                  'key': 'spec.replicas',
+                  'value': 3,
+                  'value_type': '',
+                  'update': False,
+                  'append': False,
+                  'edits': None,
+                  'selector': {'kind': 'DeploymentConfig', 'name': 'router'}}
+        module = type('Module', (object,), {'params': params})
+
+        results = Yedit.run_ansible(module)
+
+        self.assertTrue(results['changed'])
+        self.assertEqual(results['result'], [{'index': 1, 'kind': 'DeploymentConfig', 'name': 'router',
+                                              'changed': True, 'edits': [{'key': 'spec.replicas',
+                                                                          'changed': True}]}])
+        with open(YeditTest.filename) as yfd:
+            self.assertEqual([doc['spec'] for doc in Yedit.load_documents(yfd)],
+                             [{'ports': []}, {'replicas': 3}, {'replicas': 1}])
+
+        # nothing changes the second time
+        self.assertFalse(Yedit.run_ansible(module)['changed'])
+        self.assertFalse(os.path.exists(YeditTest.filename + '.yedit'))
+
+        params['state'] = 'list'
+        params['selector'] = {'kind': 'DeploymentConfig'}
+        self.assertEqual(Yedit.run_ansible(module)['result'], [3, 1])
+
+    def test_multi_document_edit_keeps_empty_documents(self):
+        '''test that empty documents survive an edit of the others'''
+        with open(YeditTest.filename, 'w') as yfd:
+            yfd.write('---\n---\nkind: Service\nspec:\n  ports: []\n---\n')
+
+        changed, _ = Yedit.edit_documents(YeditTest.filename,
+                                          [{'state': 'present', 'key': 'spec.type', 'value': 'NodePort'}])
+
+        self.assertTrue(changed)
+        with open(YeditTest.filename) as yfd:
+            self.assertEqual(list(Yedit.load_documents(yfd)),
+                             [None, {'kind': 'Service', 'spec': {'ports': [], 'type': 'NodePort'}}, None])
+
+    @mock.patch('yedit.Yedit.dump_document')
+    def test_multi_document_edit_failure_cleanup(self, mock_dump):
+        '''test that a failed edit leaves the file alone and reports the original error'''
+        mock_dump.side_effect = IOError('disk full')
+        with open(YeditTest.filename, 'w') as yfd:
+            yfd.write('kind: Service\n')
+
+        with mock.patch('yedit.os.unlink', side_effect=OSError('busy')):
+            with self.assertRaises(IOError) as err:
+                Yedit.edit_documents(YeditTest.filename,
+                                     [{'state': 'present', 'key': 'spec.type', 'value': 'NodePort'}])
+
+        self.assertEqual(str(err.exception), 'disk full')
+        os.unlink(YeditTest.filename + '.yedit')
+        with open(YeditTest.filename) as yfd:
+            self.assertEqual(yfd.read(), 'kind: Service\n')
+
     def tearDown(self):
         '''TearDown method'''
         os.unlink(YeditTest.filename)
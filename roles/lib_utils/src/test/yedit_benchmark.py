@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+'''
+ Compare the Yedit load modes on large generated documents
+
+ Usage: yedit_benchmark.py [megabytes ...]
+'''
+
+from __future__ import print_function
+
+import os
+import sys
+import tempfile
+import time
+
+# Disable import-error b/c our libraries aren't loaded in jenkins
+# pylint: disable=import-error,wrong-import-position
+# place yedit in our path
+yedit_path = os.path.join('/'.join(os.path.realpath(__file__).split('/')[:-3]), 'library')  # noqa: E501
+sys.path.insert(0, yedit_path)
+
+from yedit import Yedit, yaml  # noqa: E402
+
+
+def document(megabytes):
+    ''' return a template dump of roughly the given size '''
+    item = {'kind': 'DeploymentConfig',
+            'apiVersion': 'v1',
+            'metadata': {'name': 'router', 'labels': {'router': 'router'}},
+            'spec': {'replicas': 2,
+                     'template': {'spec': {'containers': [{'name': 'router',
+                                                           'image': 'openshift3/ose-haproxy-router:v3.6',
+                                                           'env': [{'name': 'ROUTER_SERVICE_NAME',
+                                                                    'value': 'router'}],
+                                                           'ports': [{'containerPort': 80},
+                                                                     {'containerPort': 443}]}]}}}}
+    single = len(yaml.dump(item, Dumper=Yedit.fast_dumper(), default_flow_style=False))
+    items = []
+    for idx in range(megabytes * 1024 * 1024 // single):
+        items.append(dict(item, metadata={'name': 'router-%s' % idx, 'labels': {'router': 'router'}}))
+    return yaml.dump({'kind': 'List', 'apiVersion': 'v1', 'items': items},
+                     Dumper=Yedit.fast_dumper(), default_flow_style=False)
+
+
+def timed(filename, round_trip):
+    ''' return the seconds it takes to load filename '''
+    start = time.time()
+    Yedit(filename, round_trip=round_trip)
+    return time.time() - start
+
+
+def main():
+    ''' run the benchmark '''
+    print('fast loader: %s' % Yedit.fast_loader().__name__)
+    for megabytes in [int(arg) for arg in sys.argv[1:]] or [1, 4]:
+        fd, filename = tempfile.mkstemp(suffix='.yml')
+        with os.fdopen(fd, 'w') as yfd:
+            yfd.write(document(megabytes))
+
+        try:
+            round_trip = timed(filename, True)
+            fast = timed(filename, False)
+        finally:
+            os.unlink(filename)
+
+        print('%4d MB  round trip %7.2fs  fast %7.2fs  speedup %5.1fx' %
+              (megabytes, round_trip, fast, round_trip / fast))
+
+
+if __name__ == '__main__':
+    main()
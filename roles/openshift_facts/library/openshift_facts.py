@@ -17,10 +17,14 @@ import os
 import yaml
 import struct
 import socket
+import tempfile
+import threading
+import time
 from distutils.util import strtobool
 from distutils.version import LooseVersion
+from multiprocessing.pool import ThreadPool
 from ansible.module_utils.six import string_types, text_type
-from ansible.module_utils.six.moves import configparser
+from ansible.module_utils.six.moves import configparser, http_client
 
 # ignore pylint errors related to the module_utils import
 # pylint: disable=redefined-builtin, unused-wildcard-import, wildcard-import
@@ -34,6 +38,9 @@ from ansible.module_utils._text import to_native
 
 HAVE_DBUS = False
 
+# rpm query results for the lifetime of the module run
+RPM_QUERY_CACHE = dict()
+
 try:
     from dbus import SystemBus, Interface
     from dbus.exceptions import DBusException
@@ -250,35 +257,123 @@ def query_metadata(metadata_url, headers=None, expect_json=False):
         return [to_native(line.strip()) for line in result.readlines()]
 
 
-def walk_metadata(metadata_url, headers=None, expect_json=False):
+class MetadataClient(object):
+    """ Query a metadata service over keep-alive connections
+
+        Every thread using the client gets its own persistent connection,
+        which is reused for all of the thread's requests.
+
+        Args:
+            metadata_url (str): base metadata url, every queried url must share its host
+            headers (dict): headers to set for metadata requests
+            timeout (int): seconds to wait for each request
+    """
+    def __init__(self, metadata_url, headers=None, timeout=5):
+        self.url = urlparse(metadata_url)
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+
+    def connection(self):
+        """ Return the calling thread's connection, opening it if needed """
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            if self.url.scheme == 'https':
+                conn = http_client.HTTPSConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+            else:
+                conn = http_client.HTTPConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def query(self, metadata_url, expect_json=False):
+        """ Return metadata from the provided metadata_url
+
+            Args:
+                metadata_url (str): metadata url
+                expect_json (bool): does the metadata_url return json
+            Returns:
+                dict or list: metadata request result
+        """
+        path = urlparse(metadata_url)
+        path = path.path + ('?' + path.query if path.query else '')
+        # a keep-alive connection may have been closed by the server, so
+        # retry once on a fresh one
+        for attempt in range(2):
+            conn = self.connection()
+            try:
+                conn.request('GET', path, headers=self.headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http_client.HTTPException, socket.error, IOError):
+                conn.close()
+                self.local.conn = None
+                if attempt:
+                    raise OpenShiftFactsMetadataUnavailableError("Metadata unavailable")
+
+        if response.status != 200:
+            raise OpenShiftFactsMetadataUnavailableError("Metadata unavailable")
+        if expect_json:
+            return json.loads(to_native(body))
+        return [to_native(line.strip()) for line in body.splitlines()]
+
+    def close(self):
+        """ Close every connection the client opened """
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+
+
+def walk_metadata(metadata_url, headers=None, expect_json=False, max_workers=8, timeout=5):
     """ Walk the metadata tree and return a dictionary of the entire tree
 
+        The tree is walked one level at a time: the listings and values of
+        a level are fetched concurrently by a bounded pool of threads.
+
         Args:
             metadata_url (str): metadata url
             headers (dict): headers to set for metadata request
             expect_json (bool): does the metadata_url return json
+            max_workers (int): most requests in flight at once
+            timeout (int): seconds to wait for each request
         Returns:
             dict: the result of walking the metadata tree
     """
-    metadata = dict()
+    client = MetadataClient(metadata_url, headers, timeout)
+    pool = ThreadPool(max_workers)
+    root = dict()
+    # (parent dict, key, url, is a directory listing)
+    pending = [(root, 'metadata', metadata_url, True)]
+    try:
+        while pending:
+            results = pool.map(lambda entry: client.query(entry[2], expect_json), pending)
+            next_pending = []
+            for (parent, key, url, listing), result in zip(pending, results):
+                if not listing:
+                    # disable pylint maybe-no-member because overloaded use of
+                    # the module name causes pylint to not detect that results
+                    # is an array or hash
+                    # pylint: disable=maybe-no-member
+                    parent[key] = result.pop() if len(result) == 1 else result
+                    continue
 
-    for line in query_metadata(metadata_url, headers, expect_json):
-        if line.endswith('/') and not line == 'public-keys/':
-            key = line[:-1]
-            metadata[key] = walk_metadata(metadata_url + line,
-                                          headers, expect_json)
-        else:
-            results = query_metadata(metadata_url + line, headers,
-                                     expect_json)
-            if len(results) == 1:
-                # disable pylint maybe-no-member because overloaded use of
-                # the module name causes pylint to not detect that results
-                # is an array or hash
-                # pylint: disable=maybe-no-member
-                metadata[line] = results.pop()
-            else:
-                metadata[line] = results
-    return metadata
+                parent[key] = dict()
+                for line in result:
+                    if line.endswith('/') and not line == 'public-keys/':
+                        next_pending.append((parent[key], line[:-1], url + line, True))
+                    else:
+                        next_pending.append((parent[key], line, url + line, False))
+            pending = next_pending
+    finally:
+        pool.close()
+        pool.join()
+        client.close()
+    return root['metadata']
 
 
 def get_provider_metadata(metadata_url, supports_recursive=False,
@@ -1434,11 +1529,36 @@ def apply_provider_facts(facts, provider_facts):
     return facts
 
 
+def build_fact_trie(facts_to_overwrite):
+    """ Build a prefix trie of facts to overwrite
+
+        Args:
+            facts_to_overwrite (list): facts in jinja '.' notation
+                                       ex: ['master.named_certificates']
+        Returns:
+            dict: nested dicts keyed by fact path component, where the
+                  None key marks the end of a fact
+                  ex: {'master': {'named_certificates': {None: True}}}
+    """
+    trie = dict()
+    for fact in facts_to_overwrite or []:
+        node = trie
+        for key in fact.split('.'):
+            node = node.setdefault(key, dict())
+        node[None] = True
+    return trie
+
+
 # Disabling pylint too many branches. This function needs refactored
 # but is a very core part of openshift_facts.
-# pylint: disable=too-many-branches, too-many-nested-blocks
+# pylint: disable=too-many-branches, too-many-locals
 def merge_facts(orig, new, additive_facts_to_overwrite, protected_facts_to_overwrite):
-    """ Recursively merge facts dicts
+    """ Merge facts dicts
+
+        The dicts are walked iteratively.  Values that are not merged,
+        such as subtrees only one side has, are shared with orig and new
+        rather than copied, so the inputs must not be modified through
+        the result.
 
         Args:
             orig (dict): existing facts
@@ -1463,48 +1583,42 @@ def merge_facts(orig, new, additive_facts_to_overwrite, protected_facts_to_overw
                             "builddefaults",
                             "buildoverrides"]
 
-    facts = dict()
-    for key, value in iteritems(orig):
-        # Key exists in both old and new facts.
-        if key in new:
-            if key in inventory_json_facts:
+    merged = dict()
+    # (merged dict, orig dict, new dict, additive trie node, protected trie node)
+    pending = [(merged, orig, new,
+                build_fact_trie(additive_facts_to_overwrite),
+                build_fact_trie(protected_facts_to_overwrite))]
+    while pending:
+        facts, orig, new, additive, protected = pending.pop()
+        for key, value in iteritems(orig):
+            # Key isn't in new so keep the existing fact.
+            if key not in new:
+                facts[key] = value
+            elif key in inventory_json_facts:
                 # Watchout for JSON facts that sometimes load as strings.
                 # (can happen if the JSON contains a boolean)
                 if isinstance(new[key], string_types):
                     facts[key] = yaml.safe_load(new[key])
                 else:
-                    facts[key] = copy.deepcopy(new[key])
-            # Continue to recurse if old and new fact is a dictionary.
+                    facts[key] = new[key]
+            # Continue to merge if old and new fact is a dictionary.
             elif isinstance(value, dict) and isinstance(new[key], dict):
-                # Collect the subset of additive facts to overwrite if
-                # key matches. These will be passed to the subsequent
-                # merge_facts call.
-                relevant_additive_facts = []
-                for item in additive_facts_to_overwrite:
-                    if '.' in item and item.startswith(key + '.'):
-                        relevant_additive_facts.append(item)
-
-                # Collect the subset of protected facts to overwrite
-                # if key matches. These will be passed to the
-                # subsequent merge_facts call.
-                relevant_protected_facts = []
-                for item in protected_facts_to_overwrite:
-                    if '.' in item and item.startswith(key + '.'):
-                        relevant_protected_facts.append(item)
-                facts[key] = merge_facts(value, new[key], relevant_additive_facts, relevant_protected_facts)
+                facts[key] = dict()
+                pending.append((facts[key], value, new[key],
+                                additive.get(key, {}), protected.get(key, {})))
             # Key matches an additive fact and we are not overwriting
             # it so we will append the new value to the existing value.
-            elif key in additive_facts and key not in [x.split('.')[-1] for x in additive_facts_to_overwrite]:
+            elif key in additive_facts and None not in additive.get(key, {}):
                 if isinstance(value, list) and isinstance(new[key], list):
                     new_fact = []
-                    for item in copy.deepcopy(value) + copy.deepcopy(new[key]):
+                    for item in value + new[key]:
                         if item not in new_fact:
                             new_fact.append(item)
                     facts[key] = new_fact
             # Key matches a protected fact and we are not overwriting
             # it so we will determine if it is okay to change this
             # fact.
-            elif key in protected_facts and key not in [x.split('.')[-1] for x in protected_facts_to_overwrite]:
+            elif key in protected_facts and None not in protected.get(key, {}):
                 # ha (bool) can not change unless it has been passed
                 # as a protected fact to overwrite.
                 if key == 'ha':
@@ -1516,19 +1630,18 @@ def merge_facts(orig, new, additive_facts_to_overwrite, protected_facts_to_overw
             # No other condition has been met. Overwrite the old fact
             # with the new value.
             else:
-                facts[key] = copy.deepcopy(new[key])
-        # Key isn't in new so add it to facts to keep it.
-        else:
-            facts[key] = copy.deepcopy(value)
-    new_keys = set(new.keys()) - set(orig.keys())
-    for key in new_keys:
-        # Watchout for JSON facts that sometimes load as strings.
-        # (can happen if the JSON contains a boolean)
-        if key in inventory_json_facts and isinstance(new[key], string_types):
-            facts[key] = yaml.safe_load(new[key])
-        else:
-            facts[key] = copy.deepcopy(new[key])
-    return facts
+                facts[key] = new[key]
+
+        for key, value in iteritems(new):
+            if key in orig:
+                continue
+            # Watchout for JSON facts that sometimes load as strings.
+            # (can happen if the JSON contains a boolean)
+            if key in inventory_json_facts and isinstance(value, string_types):
+                facts[key] = yaml.safe_load(value)
+            else:
+                facts[key] = value
+    return merged
 
 
 def save_local_facts(filename, facts):
@@ -1583,6 +1696,75 @@ def get_local_facts_from_file(filename):
     return local_facts
 
 
+def get_cached_facts(filename, boot_id, ttl):
+    """ Retrieve cached facts
+
+        Args:
+            filename (str): facts cache file
+            boot_id (str): id of the current boot
+            ttl (int): seconds the cached facts stay valid
+        Returns:
+            dict: the cached facts, or None when they are missing, stale or
+                  were gathered before the last reboot
+    """
+    try:
+        with open(filename, 'r') as cache_file:
+            cache = json.load(cache_file)
+    except (ValueError, IOError):
+        return None
+
+    if not isinstance(cache, dict) or not boot_id or cache.get('boot_id') != boot_id:
+        return None
+
+    age = time.time() - cache.get('timestamp', 0)
+    if age < 0 or age >= ttl:
+        return None
+
+    return cache.get('facts')
+
+
+def save_cached_facts(filename, boot_id, facts):
+    """ Save facts to a cache file
+
+        Args:
+            filename (str): facts cache file
+            boot_id (str): id of the current boot
+            facts (dict): facts to cache
+    """
+    cache = dict(boot_id=boot_id, timestamp=time.time(), facts=facts)
+    tmp_filename = None
+    try:
+        # write next to the cache and rename so readers never see a partial file
+        cache_fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(filename) or '.',
+                                                  prefix=os.path.basename(filename) + '.')
+        with os.fdopen(cache_fd, 'w') as cache_file:
+            cache_file.write(module.jsonify(cache))  # noqa: F405
+        os.chmod(tmp_filename, 0o600)
+        os.rename(tmp_filename, filename)
+    except (IOError, OSError):
+        # the cache only saves time, the facts were gathered anyway
+        if tmp_filename is not None and os.path.exists(tmp_filename):
+            try:
+                os.unlink(tmp_filename)
+            except OSError:
+                pass
+
+
+def get_local_instance_id():
+    """ Return the id of the instance the host runs on, without querying metadata
+
+        Returns:
+            str: the cloud-init instance id or the DMI product uuid, or None
+                 when neither is available
+    """
+    for path in ['/var/lib/cloud/data/instance-id',
+                 '/sys/devices/virtual/dmi/id/product_uuid']:
+        instance_id = get_file_content(path)  # noqa: F405
+        if instance_id:
+            return instance_id.strip()
+    return None
+
+
 def sort_unique(alist):
     """ Sorts and de-dupes a list
 
@@ -1803,6 +1985,27 @@ def set_container_facts_if_unset(facts):
     return facts
 
 
+def get_installed_rpms(rpms):
+    """ Query which of the given packages are installed
+
+        All packages are looked up with a single rpm call, and the
+        answer is remembered for the rest of the module run.
+
+        Args:
+            rpms (list): package names
+        Returns:
+            list: the installed packages, in the order they were given
+    """
+    key = tuple(rpms)
+    if key not in RPM_QUERY_CACHE:
+        # rpm exits non-zero when any package is missing, and prints
+        # "package <name> is not installed" for those instead of the name
+        _, output, _ = module.run_command(['rpm', '-q', '--queryformat', '%{NAME}\\n'] + rpms)  # noqa: F405
+        names = set(output.splitlines())
+        RPM_QUERY_CACHE[key] = [rpm for rpm in rpms if rpm in names]
+    return list(RPM_QUERY_CACHE[key])
+
+
 def set_installed_variant_rpm_facts(facts):
     """ Set RPM facts of installed variant
         Args:
@@ -1810,18 +2013,14 @@ def set_installed_variant_rpm_facts(facts):
         Returns:
             dict: the facts dict updated with installed_variant_rpms
                           """
-    installed_rpms = []
+    variant_rpms = []
     for base_rpm in ['openshift', 'atomic-openshift', 'origin']:
         optional_rpms = ['master', 'node', 'clients', 'sdn-ovs']
-        variant_rpms = [base_rpm] + \
-                       ['{0}-{1}'.format(base_rpm, r) for r in optional_rpms] + \
-                       ['tuned-profiles-%s-node' % base_rpm]
-        for rpm in variant_rpms:
-            exit_code, _, _ = module.run_command(['rpm', '-q', rpm])  # noqa: F405
-            if exit_code == 0:
-                installed_rpms.append(rpm)
-
-    facts['common']['installed_variant_rpms'] = installed_rpms
+        variant_rpms += [base_rpm] + \
+            ['{0}-{1}'.format(base_rpm, r) for r in optional_rpms] + \
+            ['tuned-profiles-%s-node' % base_rpm]
+
+    facts['common']['installed_variant_rpms'] = get_installed_rpms(variant_rpms)
     return facts
 
 
@@ -1860,6 +2059,17 @@ class OpenShiftFacts(object):
                                                 '.' notation ex: ['master.named_certificates']
             protected_facts_to_overwrite (list): protected facts to overwrite in jinja
                                                  '.' notation ex: ['master.master_count']
+            system_facts_cache_ttl (int): seconds gathered system facts are reused
+                                          for, 0 disables the cache
+            refresh_system_facts (bool): gather the system facts even when the
+                                         cache is valid
+            provider_facts_cache_ttl (int): seconds detected provider facts are
+                                            reused for, 0 disables the cache
+            pin_provider_facts (bool): save the detected provider facts in the
+                                       local facts file and reuse them while the
+                                       instance id stays the same
+            refresh_provider_facts (bool): detect the provider facts even when
+                                           they are pinned or cached
 
         Raises:
             OpenShiftFactsUnsupportedRoleError:
@@ -1881,7 +2091,12 @@ class OpenShiftFacts(object):
                  additive_facts_to_overwrite=None,
                  openshift_env=None,
                  openshift_env_structures=None,
-                 protected_facts_to_overwrite=None):
+                 protected_facts_to_overwrite=None,
+                 system_facts_cache_ttl=0,
+                 refresh_system_facts=False,
+                 provider_facts_cache_ttl=0,
+                 pin_provider_facts=False,
+                 refresh_provider_facts=False):
         self.changed = False
         self.filename = filename
         if role not in self.known_roles:
@@ -1890,15 +2105,14 @@ class OpenShiftFacts(object):
             )
         self.role = role
 
-        try:
-            # ansible-2.1
-            # pylint: disable=too-many-function-args,invalid-name
-            self.system_facts = ansible_facts(module, ['hardware', 'network', 'virtual', 'facter'])  # noqa: F405
-            for (k, v) in self.system_facts.items():
-                self.system_facts["ansible_%s" % k.replace('-', '_')] = v
-        except UnboundLocalError:
-            # ansible-2.2
-            self.system_facts = get_all_facts(module)['ansible_facts']  # noqa: F405
+        self.system_facts_cache = dict(hit=False, gather_time=0)
+        self.system_facts = self.init_system_facts(system_facts_cache_ttl,
+                                                   refresh_system_facts)
+
+        self.provider_facts_cache_ttl = provider_facts_cache_ttl
+        self.pin_provider_facts = pin_provider_facts
+        self.refresh_provider_facts = refresh_provider_facts
+        self.provider_facts_cache = dict(hit=False, pinned=False, gather_time=0)
 
         self.facts = self.generate_facts(local_facts,
                                          additive_facts_to_overwrite,
@@ -1906,6 +2120,53 @@ class OpenShiftFacts(object):
                                          openshift_env_structures,
                                          protected_facts_to_overwrite)
 
+    @staticmethod
+    def gather_system_facts():
+        """ Gather the hardware, network, virtual and facter facts
+
+            Returns:
+                dict: The gathered system facts
+        """
+        try:
+            # ansible-2.1
+            # pylint: disable=too-many-function-args,invalid-name
+            system_facts = ansible_facts(module, ['hardware', 'network', 'virtual', 'facter'])  # noqa: F405
+            for (k, v) in system_facts.items():
+                system_facts["ansible_%s" % k.replace('-', '_')] = v
+        except UnboundLocalError:
+            # ansible-2.2
+            system_facts = get_all_facts(module)['ansible_facts']  # noqa: F405
+        return system_facts
+
+    def init_system_facts(self, cache_ttl=0, refresh=False):
+        """ Initialize the system facts
+
+            Facts gathered during the current boot are reused from a cache
+            next to the local facts file until they are cache_ttl seconds old.
+
+            Args:
+                cache_ttl (int): seconds the cached facts stay valid, 0 disables the cache
+                refresh (bool): ignore the cached facts
+            Returns:
+                dict: The system facts
+        """
+        start = time.time()
+        cache_file = os.path.splitext(self.filename)[0] + '.system_facts.cache'
+        boot_id = get_file_content('/proc/sys/kernel/random/boot_id')  # noqa: F405
+
+        system_facts = None
+        if cache_ttl > 0 and not refresh:
+            system_facts = get_cached_facts(cache_file, boot_id, cache_ttl)
+
+        hit = system_facts is not None
+        if not hit:
+            system_facts = self.gather_system_facts()
+            if cache_ttl > 0 and boot_id and not module.check_mode:  # noqa: F405
+                save_cached_facts(cache_file, boot_id, system_facts)
+
+        self.system_facts_cache = dict(hit=hit, gather_time=round(time.time() - start, 3))
+        return system_facts
+
     def generate_facts(self,
                        local_facts,
                        additive_facts_to_overwrite,
@@ -1929,6 +2190,8 @@ class OpenShiftFacts(object):
                                             openshift_env,
                                             openshift_env_structures,
                                             protected_facts_to_overwrite)
+        # provider facts pinned by an earlier run, not a role
+        pinned_provider = local_facts.pop('provider', None)
         roles = local_facts.keys()
 
         if 'common' in local_facts and 'deployment_type' in local_facts['common']:
@@ -1942,7 +2205,7 @@ class OpenShiftFacts(object):
             deployment_subtype = 'basic'
 
         defaults = self.get_defaults(roles, deployment_type, deployment_subtype)
-        provider_facts = self.init_provider_facts()
+        provider_facts = self.init_provider_facts(pinned_provider)
         facts = apply_provider_facts(defaults, provider_facts)
         facts = merge_facts(facts,
                             local_facts,
@@ -2208,17 +2471,60 @@ class OpenShiftFacts(object):
 
         return dict(name=provider, metadata=metadata)
 
-    def init_provider_facts(self):
+    def init_provider_facts(self, pinned=None):
         """ Initialize the provider facts
 
+            When provider facts are pinned, the provider section saved in the
+            local facts file is reused as long as the instance id is unchanged,
+            without any metadata I/O.  Hosts without a local instance id are
+            never pinned.  Otherwise normalized provider facts
+            detected during the current boot are reused from a cache next to
+            the local facts file until they are provider_facts_cache_ttl
+            seconds old.
+
+            Args:
+                pinned (dict): provider section of the local facts file
             Returns:
                 dict: The normalized provider facts
         """
-        provider_info = self.guess_host_provider()
-        provider_facts = normalize_provider_facts(
-            provider_info.get('name'),
-            provider_info.get('metadata')
-        )
+        start = time.time()
+        cache_ttl = self.provider_facts_cache_ttl
+        cache_file = os.path.splitext(self.filename)[0] + '.provider_facts.cache'
+        instance_id = None
+        if self.pin_provider_facts:
+            instance_id = get_local_instance_id()
+            if instance_id is not None and not self.refresh_provider_facts and \
+                    isinstance(pinned, dict) and pinned.get('facts') and \
+                    pinned.get('instance_id') == instance_id:
+                self.provider_facts_cache = dict(hit=True, pinned=True,
+                                                 gather_time=round(time.time() - start, 3))
+                return pinned['facts']
+
+        boot_id = get_file_content('/proc/sys/kernel/random/boot_id')  # noqa: F405
+
+        provider_facts = None
+        if cache_ttl > 0 and not self.refresh_provider_facts:
+            provider_facts = get_cached_facts(cache_file, boot_id, cache_ttl)
+
+        hit = provider_facts is not None
+        if not hit:
+            provider_info = self.guess_host_provider()
+            provider_facts = normalize_provider_facts(
+                provider_info.get('name'),
+                provider_info.get('metadata')
+            )
+            if cache_ttl > 0 and boot_id and not module.check_mode:  # noqa: F405
+                save_cached_facts(cache_file, boot_id, provider_facts)
+
+        pin = dict(instance_id=instance_id, facts=provider_facts)
+        if self.pin_provider_facts and instance_id is not None and provider_facts and pin != pinned:
+            self.changed = True
+            if not module.check_mode:  # noqa: F405
+                local_facts = get_local_facts_from_file(self.filename)
+                local_facts['provider'] = pin
+                save_local_facts(self.filename, local_facts)
+
+        self.provider_facts_cache = dict(hit=hit, pinned=False, gather_time=round(time.time() - start, 3))
         return provider_facts
 
     @staticmethod
@@ -2292,22 +2598,22 @@ class OpenShiftFacts(object):
             facts_to_set[self.role] = facts
 
         if openshift_env != {} and openshift_env is not None:
+            # Collect every openshift_env fact into one tree so it is merged once.
+            oo_env_facts = dict()
             for fact, value in iteritems(openshift_env):
-                oo_env_facts = dict()
-                current_level = oo_env_facts
                 keys = self.split_openshift_env_fact_keys(fact, openshift_env_structures)[1:]
-                if len(keys) > 0 and keys[0] != self.role:
+                if len(keys) == 0 or keys[0] != self.role:
                     continue
-                for key in keys:
-                    if key == keys[-1]:
-                        current_level[key] = value
-                    elif key not in current_level:
+                current_level = oo_env_facts
+                for key in keys[:-1]:
+                    if not isinstance(current_level.get(key), dict):
                         current_level[key] = dict()
-                        current_level = current_level[key]
-                facts_to_set = merge_facts(orig=facts_to_set,
-                                           new=oo_env_facts,
-                                           additive_facts_to_overwrite=[],
-                                           protected_facts_to_overwrite=[])
+                    current_level = current_level[key]
+                current_level[keys[-1]] = value
+            facts_to_set = merge_facts(orig=facts_to_set,
+                                       new=oo_env_facts,
+                                       additive_facts_to_overwrite=[],
+                                       protected_facts_to_overwrite=[])
 
         local_facts = get_local_facts_from_file(self.filename)
 
@@ -2337,7 +2643,11 @@ class OpenShiftFacts(object):
                     isinstance(new_local_facts['docker']['log_options'], string_types):
                 new_local_facts['docker']['log_options'] = new_local_facts['docker']['log_options'].split(',')
 
+        # pinned provider facts are kept exactly as they were detected
+        pinned_provider = new_local_facts.pop('provider', None)
         new_local_facts = self.remove_empty_facts(new_local_facts)
+        if pinned_provider is not None:
+            new_local_facts['provider'] = pinned_provider
 
         if new_local_facts != local_facts:
             self.validate_local_facts(new_local_facts)
@@ -2445,7 +2755,12 @@ def main():
             additive_facts_to_overwrite=dict(default=[], type='list', required=False),
             openshift_env=dict(default={}, type='dict', required=False),
             openshift_env_structures=dict(default=[], type='list', required=False),
-            protected_facts_to_overwrite=dict(default=[], type='list', required=False)
+            protected_facts_to_overwrite=dict(default=[], type='list', required=False),
+            system_facts_cache_ttl=dict(default=0, type='int', required=False),
+            refresh_system_facts=dict(default=False, type='bool', required=False),
+            provider_facts_cache_ttl=dict(default=0, type='int', required=False),
+            pin_provider_facts=dict(default=False, type='bool', required=False),
+            refresh_provider_facts=dict(default=False, type='bool', required=False)
         ),
         supports_check_mode=True,
         add_file_common_args=True,
@@ -2464,6 +2779,11 @@ def main():
     openshift_env = module.params['openshift_env']  # noqa: F405
     openshift_env_structures = module.params['openshift_env_structures']  # noqa: F405
     protected_facts_to_overwrite = module.params['protected_facts_to_overwrite']  # noqa: F405
+    system_facts_cache_ttl = module.params['system_facts_cache_ttl']  # noqa: F405
+    refresh_system_facts = module.params['refresh_system_facts']  # noqa: F405
+    provider_facts_cache_ttl = module.params['provider_facts_cache_ttl']  # noqa: F405
+    pin_provider_facts = module.params['pin_provider_facts']  # noqa: F405
+    refresh_provider_facts = module.params['refresh_provider_facts']  # noqa: F405
 
     fact_file = '/etc/ansible/facts.d/openshift.fact'
 
@@ -2473,7 +2793,12 @@ def main():
                                      additive_facts_to_overwrite,
                                      openshift_env,
                                      openshift_env_structures,
-                                     protected_facts_to_overwrite)
+                                     protected_facts_to_overwrite,
+                                     system_facts_cache_ttl,
+                                     refresh_system_facts,
+                                     provider_facts_cache_ttl,
+                                     pin_provider_facts,
+                                     refresh_provider_facts)
 
     file_params = module.params.copy()  # noqa: F405
     file_params['path'] = fact_file
@@ -2482,7 +2807,9 @@ def main():
                                                     openshift_facts.changed)
 
     return module.exit_json(changed=changed,  # noqa: F405
-                            ansible_facts=openshift_facts.facts)
+                            ansible_facts=openshift_facts.facts,
+                            system_facts_cache=openshift_facts.system_facts_cache,
+                            provider_facts_cache=openshift_facts.provider_facts_cache)
 
 
 if __name__ == '__main__':
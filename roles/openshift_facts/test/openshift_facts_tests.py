@@ -0,0 +1,260 @@
+# pylint: disable=missing-docstring,invalid-name,redefined-outer-name,protected-access
+import json
+import os
+import sys
+import threading
+
+import pytest
+from six.moves import BaseHTTPServer, socketserver
+
+sys.path.insert(1, os.path.join(os.path.dirname(__file__), os.pardir, "library"))
+
+import openshift_facts  # noqa: E402
+from openshift_facts import OpenShiftFacts  # noqa: E402
+
+
+class FakeModule(object):
+    check_mode = False
+
+    def __init__(self, params=None):
+        self.params = params or {}
+        self.commands = []
+
+    @staticmethod
+    def jsonify(data):
+        return json.dumps(data)
+
+    def run_command(self, args):
+        self.commands.append(args)
+        installed = ['atomic-openshift', 'atomic-openshift-node', 'tuned-profiles-atomic-openshift-node']
+        output = ''.join([name + '\n' if name in installed else 'package %s is not installed\n' % name
+                          for name in args[4:]])
+        return 1, output, ''
+
+
+@pytest.fixture()
+def module(monkeypatch):
+    fake = FakeModule()
+    monkeypatch.setattr(openshift_facts, 'module', fake, raising=False)
+    return fake
+
+
+@pytest.fixture()
+def facts(tmpdir):
+    """An OpenShiftFacts that has not gathered anything yet."""
+    instance = OpenShiftFacts.__new__(OpenShiftFacts)
+    instance.filename = str(tmpdir.join('openshift.fact'))
+    instance.provider_facts_cache_ttl = 0
+    instance.pin_provider_facts = False
+    instance.refresh_provider_facts = False
+    return instance
+
+
+def test_system_facts_cache(module, facts, monkeypatch):
+    gathered = []
+
+    def gather():
+        gathered.append(True)
+        return {'ansible_hostname': 'node%d' % len(gathered)}
+
+    boot_id = ['boot-1']
+    monkeypatch.setattr(OpenShiftFacts, 'gather_system_facts', staticmethod(gather))
+    monkeypatch.setattr(openshift_facts, 'get_file_content', lambda path: boot_id[0], raising=False)
+
+    assert facts.init_system_facts(60) == {'ansible_hostname': 'node1'}
+    assert not facts.system_facts_cache['hit']
+    assert os.listdir(os.path.dirname(facts.filename)) == ['openshift.system_facts.cache']
+
+    assert facts.init_system_facts(60) == {'ansible_hostname': 'node1'}
+    assert facts.system_facts_cache['hit']
+
+    # explicit refresh, reboot, expiry and a disabled cache all gather again
+    assert facts.init_system_facts(60, refresh=True) == {'ansible_hostname': 'node2'}
+    boot_id[0] = 'boot-2'
+    assert facts.init_system_facts(60) == {'ansible_hostname': 'node3'}
+    monkeypatch.setattr(openshift_facts.time, 'time', lambda: 10 ** 10)
+    assert facts.init_system_facts(60) == {'ansible_hostname': 'node4'}
+    assert facts.init_system_facts(0) == {'ansible_hostname': 'node5'}
+    assert not facts.system_facts_cache['hit']
+
+
+def test_installed_variant_rpms(module, monkeypatch):
+    monkeypatch.setattr(openshift_facts, 'RPM_QUERY_CACHE', {})
+
+    for _ in range(2):
+        facts = openshift_facts.set_installed_variant_rpm_facts({'common': {}})
+        assert facts['common']['installed_variant_rpms'] == ['atomic-openshift',
+                                                             'atomic-openshift-node',
+                                                             'tuned-profiles-atomic-openshift-node']
+
+    assert len(module.commands) == 1
+    assert module.commands[0][:4] == ['rpm', '-q', '--queryformat', '%{NAME}\\n']
+    assert len(module.commands[0]) == 4 + 18
+
+
+METADATA = {
+    'ami-id': 'ami-1234',
+    'hostname': 'ip-10-0-0-1.ec2.internal',
+    'instance-id': 'i-1234',
+    'local-ipv4': '10.0.0.1',
+    'public-keys/': {'0=key': 'ssh-rsa AAAA'},
+    'network/': {'interfaces/': {'macs/': {
+        '0e:00:00:00:00:01/': {'device-number': '0', 'local-ipv4s': '10.0.0.1\n10.0.0.2'},
+        '0e:00:00:00:00:02/': {'device-number': '1', 'local-ipv4s': '10.0.1.1'},
+    }}},
+}
+
+
+class StubMetadataHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address))
+        node = METADATA
+        for part in [part for part in self.path.split('/')[3:] if part]:
+            node = node.get(part + '/', node.get(part)) if isinstance(node, dict) else None
+        if node is None:
+            body, status = b'', 404
+        elif isinstance(node, dict):
+            body, status = '\n'.join(sorted(node)).encode(), 200
+        else:
+            body, status = node.encode(), 200
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubMetadataServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+@pytest.fixture()
+def metadata_server():
+    server = StubMetadataServer(('127.0.0.1', 0), StubMetadataHandler)
+    server.requests = []
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_walk_metadata(metadata_server):
+    url = 'http://127.0.0.1:%d/latest/meta-data/' % metadata_server.server_address[1]
+
+    metadata = openshift_facts.walk_metadata(url, max_workers=4, timeout=5)
+
+    assert metadata['instance-id'] == 'i-1234'
+    assert metadata['public-keys/'] == '0=key'
+    assert metadata['network']['interfaces']['macs']['0e:00:00:00:00:01']['local-ipv4s'] == ['10.0.0.1', '10.0.0.2']
+    assert metadata['network']['interfaces']['macs']['0e:00:00:00:00:02']['device-number'] == '1'
+
+    # connections are kept alive and bounded by the pool size
+    assert len(metadata_server.requests) == 15
+    assert len(set([address for _, address in metadata_server.requests])) <= 4
+
+    with pytest.raises(openshift_facts.OpenShiftFactsMetadataUnavailableError):
+        openshift_facts.walk_metadata(url + 'missing/', timeout=5)
+
+
+def test_provider_facts_cache(module, facts, monkeypatch):
+    guessed = []
+
+    def guess(_):
+        guessed.append(True)
+        return {'name': 'openstack', 'metadata': None}
+
+    monkeypatch.setattr(OpenShiftFacts, 'guess_host_provider', guess)
+    monkeypatch.setattr(openshift_facts, 'normalize_provider_facts',
+                        lambda name, metadata: {'name': name, 'run': len(guessed)})
+    monkeypatch.setattr(openshift_facts, 'get_file_content', lambda path: 'boot-1', raising=False)
+
+    facts.provider_facts_cache_ttl = 60
+    assert facts.init_provider_facts() == {'name': 'openstack', 'run': 1}
+    assert facts.init_provider_facts() == {'name': 'openstack', 'run': 1}
+    assert facts.provider_facts_cache['hit']
+
+    facts.provider_facts_cache_ttl = 0
+    assert facts.init_provider_facts() == {'name': 'openstack', 'run': 2}
+    assert not facts.provider_facts_cache['hit']
+
+
+def test_pinned_provider_facts(module, facts, monkeypatch):
+    guessed = []
+    files = {'/var/lib/cloud/data/instance-id': 'i-1234\n'}
+
+    def guess(_):
+        guessed.append(True)
+        return {'name': 'aws', 'metadata': None}
+
+    monkeypatch.setattr(OpenShiftFacts, 'guess_host_provider', guess)
+    monkeypatch.setattr(openshift_facts, 'normalize_provider_facts',
+                        lambda name, metadata: {'name': name, 'run': len(guessed)})
+    monkeypatch.setattr(openshift_facts, 'get_file_content', lambda path: files.get(path), raising=False)
+    facts.pin_provider_facts = True
+    facts.changed = False
+
+    assert facts.init_provider_facts() == {'name': 'aws', 'run': 1}
+    pinned = openshift_facts.get_local_facts_from_file(facts.filename)['provider']
+    assert pinned == {'instance_id': 'i-1234', 'facts': {'name': 'aws', 'run': 1}}
+    assert facts.changed
+
+    # later runs skip the provider probe entirely
+    facts.changed = False
+    assert facts.init_provider_facts(pinned) == {'name': 'aws', 'run': 1}
+    assert facts.provider_facts_cache['pinned']
+    assert not facts.changed
+    assert len(guessed) == 1
+
+    # a new instance or an explicit refresh probe again
+    files['/var/lib/cloud/data/instance-id'] = 'i-5678'
+    assert facts.init_provider_facts(pinned) == {'name': 'aws', 'run': 2}
+    pinned = openshift_facts.get_local_facts_from_file(facts.filename)['provider']
+    assert pinned['instance_id'] == 'i-5678'
+
+    facts.refresh_provider_facts = True
+    assert facts.init_provider_facts(pinned) == {'name': 'aws', 'run': 3}
+    assert not facts.provider_facts_cache['pinned']
+
+    # without an instance id nothing is pinned or reused
+    del files['/var/lib/cloud/data/instance-id']
+    facts.refresh_provider_facts = False
+    os.remove(facts.filename)
+    assert facts.init_provider_facts({'instance_id': None, 'facts': {'name': 'stale'}}) == {'name': 'aws', 'run': 4}
+    assert not os.path.exists(facts.filename)
+
+
+def test_merge_facts(module):
+    orig = {'master': {'named_certificates': [{'certfile': 'a'}], 'ha': True,
+                       'admission_plugin_config': {'old': {}}, 'api_port': '8443'},
+            'node': {'labels': {'region': 'infra'}}}
+    new = {'master': {'named_certificates': [{'certfile': 'b'}], 'ha': 'true',
+                      'admission_plugin_config': '{"new": {"enabled": true}}'},
+           'common': {'hostname': 'master1'}}
+
+    facts = openshift_facts.merge_facts(orig, new, [], [])
+    assert facts['master'] == {'named_certificates': [{'certfile': 'a'}, {'certfile': 'b'}], 'ha': True,
+                               'admission_plugin_config': {'new': {'enabled': True}}, 'api_port': '8443'}
+    # subtrees only one side has are shared, not copied
+    assert facts['node'] is orig['node']
+    assert facts['common'] is new['common']
+
+    facts = openshift_facts.merge_facts(orig, new, ['master.named_certificates'], ['master.ha'])
+    assert facts['master']['named_certificates'] == [{'certfile': 'b'}]
+    assert facts['master']['ha'] == 'true'
+
+
+def test_init_local_facts_openshift_env(module, facts):
+    facts.role = 'master'
+    local_facts = facts.init_local_facts({'api_port': '8443'},
+                                         openshift_env={'openshift_master_api_port': '443',
+                                                        'openshift_master_cluster_method': 'native',
+                                                        'openshift_node_labels': 'ignored'})
+    assert local_facts['master'] == {'api_port': '8443', 'api': {'port': '443'}, 'cluster': {'method': 'native'}}
+    assert 'labels' not in local_facts['node']
+    assert openshift_facts.get_local_facts_from_file(facts.filename) == local_facts
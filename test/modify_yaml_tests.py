@@ -3,12 +3,15 @@
 
 import os
 import sys
+import time
 import unittest
 
+import yaml
+
 sys.path = [os.path.abspath(os.path.dirname(__file__) + "/../library/")] + sys.path
 
 # pylint: disable=import-error
-from modify_yaml import set_key  # noqa: E402
+from modify_yaml import set_key, set_keys  # noqa: E402
 
 
 class ModifyYamlTests(unittest.TestCase):
@@ -35,3 +38,51 @@ class ModifyYamlTests(unittest.TestCase):
         self.assertEquals(yaml_value, cfg['masterClients']
                           ['externalKubernetesClientConnectionOverrides']
                           ['acceptContentTypes'])
+
+    def test_set_keys(self):
+        cfg = {"section": {"a": 1, "b": None}, "empty": None}
+        changes = set_keys(cfg, {'section.a': 1,
+                                 'section.b.c': [2],
+                                 'empty.d': '3',
+                                 'new.e.f': 4})
+        self.assertEqual([('empty.d', '3'), ('new.e.f', 4), ('section.b.c', [2])], sorted(changes))
+        self.assertEqual({"section": {"a": 1, "b": {"c": [2]}},
+                          "empty": {"d": '3'},
+                          "new": {"e": {"f": 4}}}, cfg)
+        self.assertEqual([], set_keys(cfg, {'section.b.c': [2], 'empty.d': '3'}))
+
+    def test_set_keys_overlap(self):
+        prefix = {'b': 2}
+        for yaml_keys in [{'a': 5, 'a.b': 2}, {'a': prefix, 'a.c': 3}]:
+            cfg = {}
+            with self.assertRaises(ValueError):
+                set_keys(cfg, yaml_keys)
+            self.assertEqual({}, cfg)
+        self.assertEqual({'b': 2}, prefix)
+
+    # Micro-benchmark: a task per key loads, edits and dumps the file every
+    # time, yaml_keys does it once for all of them.
+    def test_set_keys_benchmark(self):
+        yaml_keys = {}
+        for section in range(5):
+            for key in range(10):
+                yaml_keys['section%s.sub.key%s' % (section, key)] = key
+
+        content = yaml.safe_dump({'kind': 'MasterConfig'}, default_flow_style=False)
+        start = time.time()
+        for yaml_key, yaml_value in yaml_keys.items():
+            single = yaml.safe_load(content)
+            set_key(single, yaml_key, yaml_value)
+            content = yaml.safe_dump(single, default_flow_style=False)
+        single_time = time.time() - start
+
+        content = yaml.safe_dump({'kind': 'MasterConfig'}, default_flow_style=False)
+        start = time.time()
+        batched = yaml.safe_load(content)
+        set_keys(batched, yaml_keys)
+        content = yaml.safe_dump(batched, default_flow_style=False)
+        batched_time = time.time() - start
+
+        self.assertEqual(single, batched)
+        sys.stderr.write('\nset_key %.4fs, set_keys %.4fs for %d keys\n' %
+                         (single_time, batched_time, len(yaml_keys)))